@@ -1,8 +1,19 @@
+from contextlib import contextmanager
+from sqlalchemy import text
 from sqlmodel import SQLModel, create_engine, Session
 
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, DDL is still idempotent
+    fcntl = None
+
 sqlite_file_name = "database.db"
 sqlite_url = f"sqlite:///{sqlite_file_name}"
 
+# Bump whenever a table or index is added to app/models.py, so existing
+# databases get them on the next start.
+SCHEMA_VERSION = 2
+
 engine = create_engine(
     sqlite_url,
     echo=True,
@@ -10,4 +21,50 @@ engine = create_engine(
 )
 def get_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+def schema_version(bind) -> int:
+    """Schema version stamped in the database file (0 for a new or unstamped one)"""
+    with bind.connect() as conn:
+        return conn.execute(text("PRAGMA user_version")).scalar_one()
+
+
+@contextmanager
+def _schema_lock(bind):
+    """Exclusive lock next to the database file, so only one process runs DDL"""
+    database = bind.url.database
+    if fcntl is None or not database or database == ":memory:":
+        yield
+        return
+    with open(f"{database}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def ensure_schema(bind=engine) -> bool:
+    """Create missing tables and indexes if the stored schema version is behind; returns whether DDL ran
+
+    When the schema is current this is a single PRAGMA read. Otherwise the
+    first process to take the lock creates what is missing and stamps the
+    version; the others wait for it and find nothing left to do.
+    """
+    if schema_version(bind) >= SCHEMA_VERSION:
+        return False
+    import app.models  # noqa: F401  (registers the tables on SQLModel.metadata)
+
+    with _schema_lock(bind):
+        if schema_version(bind) >= SCHEMA_VERSION:
+            return False
+        SQLModel.metadata.create_all(bind)
+        # create_all skips tables that exist, indexes included, so add those one by one
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind, checkfirst=True)
+        with bind.begin() as conn:
+            conn.execute(text(f"PRAGMA user_version = {int(SCHEMA_VERSION)}"))
+    print(f"Database schema updated to version {SCHEMA_VERSION}")
+    return True
@@ -2,206 +2,448 @@
 Minimal Chat Service - Just make it work
 Handles Gemini API calls with function calling for health metrics
 """
+import asyncio
 import os
-from datetime import date, timedelta
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import AsyncIterator, Optional
 from google import genai
 from google.genai import types
-from sqlmodel import Session, select, func
-from app.models import SleepEntry, ExerciseEntry, DietEntry
+from sqlmodel import Session
+from app.llm.intents import WEEKLY_SUMMARY, match_intent, render_answer, render_summary
 from app.llm.prompt import SYSTEM_PROMPT, TOOLS
+from app.llm.client import GEMINI_MODEL
+from app.llm.context_cache import context_cache
+from app.llm.resilience import LLMError, call_llm, classify, stream_llm
+from app.llm.telemetry import TurnStats
+from app.llm.response_cache import get_cached_response, snapshot_versions, store_response
+from app.llm.tool_cache import TOOL_CATEGORIES, tool_cache, tool_flights
+from app.services import metrics
+from app.services.analytics import METRICS, AnalyticsError, MetricQuery, run_metric_query, run_weekly_tool
+from app.services.cache import MISSING
+from app.services.data_versions import current_version
+from app.services.insights import get_insight, week_bounds
+
+FALLBACK_MESSAGE = "I'm not sure how to respond to that."
+
+# Parameterized tools answered by the aggregation engine
+ANALYTICS_TOOLS = {"get_metric_summary", "get_metric_trend"}
+
+# Answer recognised weekly questions from templates instead of calling Gemini
+CHAT_FAST_PATH = os.getenv("CHAT_FAST_PATH", "1") == "1"
+
+# Tool calls run off the event loop; several calls in one turn run in parallel
+TOOL_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CHAT_TOOL_WORKERS", "4")), thread_name_prefix="chat-tools"
+)
+
+# Whether the tool call last run on this thread was served from tool_cache
+_tool_cache_hit = threading.local()
+
+
+def _parts(response: types.GenerateContentResponse) -> list:
+    if response.candidates and response.candidates[0].content and response.candidates[0].content.parts:
+        return response.candidates[0].content.parts
+    return []
+
+
+def _function_calls(response: types.GenerateContentResponse) -> list[types.FunctionCall]:
+    return [part.function_call for part in _parts(response) if part.function_call and part.function_call.name]
+
+
+def _args(function_call: types.FunctionCall) -> dict:
+    return dict(function_call.args) if function_call.args else {}
+
+
+def _function_category(function_name: str, args: dict) -> Optional[str]:
+    """Category of data a tool call reads, if any"""
+    if function_name in TOOL_CATEGORIES:
+        return TOOL_CATEGORIES[function_name]
+    if function_name in ANALYTICS_TOOLS and args.get("metric") in METRICS:
+        return METRICS[args["metric"]][2]
+    return None
+
+
+def _text(response: types.GenerateContentResponse) -> str:
+    """Concatenate text parts (response.text warns when function calls are present)"""
+    return "".join(part.text for part in _parts(response) if part.text)
 
 
 class ChatService:
     """Minimal chat service with function calling"""
-    
-    def __init__(self, session: Session):
+
+    def __init__(self, session: Session, client: genai.Client, user_id: int):
         self.session = session
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
-        self.client = genai.Client(api_key=api_key)
-        self.model = "gemini-2.5-flash"
-    
+        self.client = client
+        self.user_id = user_id
+        self.model = GEMINI_MODEL
+        # Data categories read by tools during this service's turns
+        self.categories_used: set[str] = set()
+        # Measurements of the current turn
+        self.turn = TurnStats(user_id)
+
     def get_last_week_bounds(self) -> tuple[date, date]:
         """Get last week's Monday-Sunday"""
-        today = date.today()
-        days_since_monday = today.weekday()
-        last_monday = today - timedelta(days=days_since_monday + 7)
-        last_sunday = last_monday + timedelta(days=6)
-        return last_monday, last_sunday
-    
-    def execute_function(self, function_name: str) -> dict:
-        """Execute a function call and return result"""
+        return week_bounds(date.today())
+
+    def execute_function(self, function_name: str, args: Optional[dict] = None,
+                         session: Optional[Session] = None) -> dict:
+        """Execute a function call and return result (cached per user, data version and date range)"""
+        session = session or self.session
+        if function_name in ANALYTICS_TOOLS:
+            return self._run_analytics_function(function_name, args or {}, session)
+        if function_name not in TOOL_CATEGORIES:
+            return {"error": f"Unknown function: {function_name}"}
+
         start_date, end_date = self.get_last_week_bounds()
-        
-        if function_name == "get_sleep_last_week":
-            query = select(func.sum(SleepEntry.hours), func.count(SleepEntry.id)).where(  # type: ignore
-                SleepEntry.date >= start_date,
-                SleepEntry.date <= end_date
-            )
-            result = self.session.exec(query).first()
-            row = result or (0.0, 0)
-            total_hours = row[0] or 0.0
-            days = row[1] or 0
-            
-            return {
-                "total_hours": round(total_hours, 1),
-                "days_recorded": days,
-                "week": f"{start_date} to {end_date}"
-            }
-        
-        elif function_name == "get_steps_last_week":
-            query = select(func.avg(ExerciseEntry.steps), func.count(ExerciseEntry.id)).where(  # type: ignore
-                ExerciseEntry.date >= start_date,
-                ExerciseEntry.date <= end_date
-            )
-            result = self.session.exec(query).first()
-            row = result or (0.0, 0)
-            avg_steps = row[0] or 0.0
-            days = row[1] or 0
-            
-            return {
-                "average_steps": round(avg_steps, 0),
-                "days_recorded": days,
-                "week": f"{start_date} to {end_date}"
-            }
-        
-        elif function_name == "get_calories_last_week":
-            query = select(func.sum(DietEntry.calories), func.count(DietEntry.id)).where(  # type: ignore
-                DietEntry.date >= start_date,
-                DietEntry.date <= end_date
-            )
-            result = self.session.exec(query).first()
-            row = result or (0.0, 0)
-            total_calories = row[0] or 0.0
-            days = row[1] or 0
-            
-            return {
-                "total_calories": round(total_calories, 0),
-                "days_recorded": days,
-                "week": f"{start_date} to {end_date}"
-            }
-        
-        return {"error": f"Unknown function: {function_name}"}
-    
-    def chat(self, user_message: str, history: Optional[list] = None) -> dict:
+        category = TOOL_CATEGORIES[function_name]
+        version = current_version(session, self.user_id, category)
+        key = (self.user_id, category, version, start_date, end_date, function_name)
+        return self._cached(key, lambda: run_weekly_tool(session, self.user_id, function_name, start_date, end_date))
+
+    def _cached(self, key: tuple, compute) -> dict:
+        """Serve a tool result from tool_cache; on a miss, compute it once for all concurrent callers"""
+        result = tool_cache.get(key)
+        _tool_cache_hit.value = result is not MISSING
+        if result is MISSING:
+            def load() -> dict:
+                value = compute()
+                tool_cache.set(key, value)
+                return value
+            result = tool_flights.do(key, load)
+        return dict(result)
+
+    def _run_analytics_function(self, function_name: str, args: dict, session: Session) -> dict:
+        """Run get_metric_summary / get_metric_trend through the aggregation engine"""
+        if function_name == "get_metric_summary":
+            args = {**args, "bucket": "none"}
+        elif not args.get("bucket") or args.get("bucket") == "none":
+            return {"error": "get_metric_trend needs a bucket of day, week or month"}
+        try:
+            query = MetricQuery.from_args(args)
+        except AnalyticsError as e:
+            return {"error": str(e)}
+
+        version = current_version(session, self.user_id, query.category)
+        key = (self.user_id, query.category, version, query.start_date, query.end_date, query)
+        return self._cached(key, lambda: run_metric_query(session, self.user_id, query))
+
+    async def run_functions(self, calls: list[tuple[str, dict]]) -> list[dict]:
+        """Run (name, args) tool calls concurrently on the tool pool, one session per call"""
+        loop = asyncio.get_running_loop()
+        bind = self.session.get_bind()
+        for name, args in calls:
+            category = _function_category(name, args)
+            if category:
+                self.categories_used.add(category)
+
+        def run(name: str, args: dict) -> dict:
+            _tool_cache_hit.value = None
+            started = time.perf_counter()
+            with Session(bind) as session:
+                result = self.execute_function(name, args, session=session)
+            self.turn.record_tool(name, time.perf_counter() - started, _tool_cache_hit.value)
+            return result
+
+        return list(await asyncio.gather(
+            *(loop.run_in_executor(TOOL_EXECUTOR, run, name, args) for name, args in calls)
+        ))
+
+    async def _in_worker(self, read, *args):
+        """Run read(session, *args) on the tool pool with its own session"""
+        bind = self.session.get_bind()
+
+        def run():
+            with Session(bind) as session:
+                return read(session, *args)
+
+        return await asyncio.get_running_loop().run_in_executor(TOOL_EXECUTOR, run)
+
+    async def answer_locally(self, user_message: str) -> Optional[dict]:
+        """Answer common weekly questions without the model; None when the LLM is needed"""
+        if not CHAT_FAST_PATH:
+            return None
+        function_name = match_intent(user_message)
+        if function_name is None:
+            return None
+
+        metrics.inc("chat_fast_path_total", function=function_name)
+        self.turn.source = "fast_path"
+        names = list(TOOL_CATEGORIES) if function_name == WEEKLY_SUMMARY else [function_name]
+
+        # Prefer last week's precomputed insight over running the tools
+        start_date, _ = self.get_last_week_bounds()
+        insight = await self._in_worker(get_insight, self.user_id, start_date)
+        if insight and all(name in insight.results for name in names):
+            self.turn.source = "insight"
+            results = [insight.results[name] for name in names]
+        else:
+            insight = None
+            results = await self.run_functions([(name, {}) for name in names])
+
+        if function_name == WEEKLY_SUMMARY:
+            message = (insight and insight.narrative) or render_summary(dict(zip(names, results)))
+        else:
+            message = render_answer(function_name, results[0])
+        return {
+            "message": message,
+            "function_called": ", ".join(names)
+        }
+
+    def _build_contents(self, user_message: str, history: Optional[list]) -> list:
+        contents = []
+
+        # Add conversation history if provided
+        if history:
+            contents.extend(history)
+
+        # The model needs today's date to resolve periods like "in March"
+        contents.append({
+            "role": "user",
+            "parts": [
+                {"text": f"(Today is {date.today().isoformat()}.)"},
+                {"text": user_message}
+            ]
+        })
+        return contents
+
+    def _config(self, with_tools: bool, cached_content: Optional[str] = None) -> types.GenerateContentConfig:
+        if cached_content:
+            # The cached content already holds the system prompt (and tools)
+            return types.GenerateContentConfig(cached_content=cached_content, temperature=1.0)
+        return types.GenerateContentConfig(
+            system_instruction=SYSTEM_PROMPT,
+            tools=TOOLS if with_tools else None,
+            temperature=1.0
+        )
+
+    async def _generate_content(self, contents: list, with_tools: bool) -> types.GenerateContentResponse:
+        """One model call, using the cached prompt prefix when there is one"""
+        started = time.perf_counter()
+        cached_content = context_cache.name(with_tools)
+        try:
+            response = await call_llm(lambda: self.client.aio.models.generate_content(
+                model=self.model,
+                contents=contents,
+                config=self._config(with_tools, cached_content)
+            ))
+        except LLMError as e:
+            if cached_content is None or e.retryable:
+                raise
+            context_cache.discard(cached_content)
+            cached_content = None
+            response = await call_llm(lambda: self.client.aio.models.generate_content(
+                model=self.model,
+                contents=contents,
+                config=self._config(with_tools)
+            ))
+
+        self.turn.record_model_call(
+            time.perf_counter() - started, response.usage_metadata, with_tools, cached_content is not None
+        )
+        return response
+
+    async def _stream_content(self, contents: list, with_tools: bool) -> AsyncIterator[types.GenerateContentResponse]:
+        """Streaming counterpart of _generate_content"""
+        started = time.perf_counter()
+        cached_content = context_cache.name(with_tools)
+        usage = None
+        streaming = False
+        try:
+            async for chunk in stream_llm(lambda: self.client.aio.models.generate_content_stream(
+                model=self.model,
+                contents=contents,
+                config=self._config(with_tools, cached_content)
+            )):
+                streaming = True
+                usage = chunk.usage_metadata or usage
+                yield chunk
+        except LLMError as e:
+            if cached_content is None or e.retryable or streaming:
+                raise
+            context_cache.discard(cached_content)
+            cached_content = None
+            async for chunk in stream_llm(lambda: self.client.aio.models.generate_content_stream(
+                model=self.model,
+                contents=contents,
+                config=self._config(with_tools)
+            )):
+                usage = chunk.usage_metadata or usage
+                yield chunk
+
+        # Usage metadata arrives with the last chunks
+        self.turn.record_model_call(time.perf_counter() - started, usage, with_tools, cached_content is not None)
+
+    def _with_function_results(self, contents: list, function_calls: list[types.FunctionCall],
+                               results: list[dict]) -> list:
+        """Append the model's function calls and all our results to the conversation"""
+        new_contents = contents.copy()
+        new_contents.append({
+            "role": "model",
+            "parts": [
+                {"function_call": {"name": call.name, "args": _args(call)}}
+                for call in function_calls
+            ]
+        })
+        new_contents.append({
+            "role": "user",
+            "parts": [
+                {"function_response": {"name": call.name, "response": result}}
+                for call, result in zip(function_calls, results)
+            ]
+        })
+        return new_contents
+
+    async def _answer_function_calls(self, contents: list, function_calls: list[types.FunctionCall]) -> list:
+        """Run every requested tool concurrently and build the follow-up request"""
+        results = await self.run_functions([(call.name, _args(call)) for call in function_calls])
+        return self._with_function_results(contents, function_calls, results)
+
+    async def chat(self, user_message: str, history: Optional[list] = None) -> dict:
         """
         Main chat method - handles one turn of conversation
-        
+
         Returns:
             {"message": str, "function_called": str or None}
         """
+        self.turn = TurnStats(self.user_id)
         try:
-            # Build contents array for the request
-            contents = []
-            
-            # Add conversation history if provided
-            if history:
-                contents.extend(history)
-            
-            # Add current user message
-            contents.append({
-                "role": "user",
-                "parts": [{"text": user_message}]
-            })
-            
-            # Configure the request with system instruction and tools
-            config = types.GenerateContentConfig(
-                system_instruction=SYSTEM_PROMPT,
-                tools=TOOLS,
-                temperature=1.0
-            )
-            
-            # Call Gemini with function calling enabled
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=contents,
-                config=config
-            )
-            
-            # Check if model wants to call a function
-            function_called = None
-            
-            if response.candidates and response.candidates[0].content and response.candidates[0].content.parts:
-                for part in response.candidates[0].content.parts:
-                    # Check for function call
-                    if hasattr(part, 'function_call') and part.function_call and part.function_call.name:
-                        function_called = part.function_call.name
-                        
-                        # Execute the function
-                        function_result = self.execute_function(function_called)
-                        
-                        # Build new contents with function result
-                        new_contents = contents.copy()
-                        
-                        # Add model's function call to history
-                        new_contents.append({
-                            "role": "model",
-                            "parts": [{
-                                "function_call": {
-                                    "name": function_called,
-                                    "args": dict(part.function_call.args) if part.function_call.args else {}
-                                }
-                            }]
-                        })
-                        
-                        # Add function result
-                        new_contents.append({
-                            "role": "user",
-                            "parts": [{
-                                "function_response": {
-                                    "name": function_called,
-                                    "response": function_result
-                                }
-                            }]
-                        })
-                        
-                        # Get final response from model
-                        final_response = self.client.models.generate_content(
-                            model=self.model,
-                            contents=new_contents,
-                            config=types.GenerateContentConfig(
-                                system_instruction=SYSTEM_PROMPT,
-                                temperature=1.0
-                            )
-                        )
-                        
-                        # Extract text from final response
-                        if final_response.text:
-                            return {
-                                "message": final_response.text,
-                                "function_called": function_called
-                            }
-            
-            # No function call - return direct text response
-            if response.text:
+            result = await self._answer(user_message, history)
+            self.turn.function_called = result["function_called"]
+            return result
+
+        except Exception as e:
+            error = classify(e)
+            self.turn.record_error(type(error).__name__)
+            return {
+                "message": error.message,
+                "function_called": None
+            }
+        finally:
+            self.turn.finish()
+
+    async def _answer(self, user_message: str, history: Optional[list]) -> dict:
+        local_answer = await self.answer_locally(user_message)
+        if local_answer:
+            return local_answer
+
+        # Only context-free questions are cacheable
+        use_cache = not history
+        if use_cache:
+            versions = await self._in_worker(snapshot_versions, self.user_id)
+            cached = get_cached_response(self.user_id, user_message, versions)
+            if cached:
+                self.turn.source = "response_cache"
+                return cached
+
+        result = await self._generate(self._build_contents(user_message, history))
+        if use_cache and result["message"] != FALLBACK_MESSAGE:
+            store_response(self.user_id, user_message, result, self.categories_used, versions)
+        return result
+
+    async def _generate(self, contents: list) -> dict:
+        """Ask Gemini, running any tools it requests, and return the final answer"""
+        # Call Gemini with function calling enabled
+        response = await self._generate_content(contents, with_tools=True)
+
+        # Check if model wants to call functions; all of them are answered in one follow-up
+        function_calls = _function_calls(response)
+        if function_calls:
+            # Get final response from model
+            follow_up = await self._answer_function_calls(contents, function_calls)
+            final_response = await self._generate_content(follow_up, with_tools=False)
+
+            final_text = _text(final_response)
+            if final_text:
                 return {
-                    "message": response.text,
-                    "function_called": None
+                    "message": final_text,
+                    "function_called": ", ".join(call.name for call in function_calls)
                 }
-            
+
+        # No function call - return direct text response
+        text = _text(response)
+        if text:
             return {
-                "message": "I'm not sure how to respond to that.",
+                "message": text,
                 "function_called": None
             }
-        
+
+        return {
+            "message": FALLBACK_MESSAGE,
+            "function_called": None
+        }
+
+    async def chat_stream(self, user_message: str, history: Optional[list] = None) -> AsyncIterator[dict]:
+        """
+        Streaming variant of chat - yields events as the model produces them
+
+        Events:
+            {"type": "token", "text": str}
+            {"type": "function", "name": str}
+            {"type": "done", "function_called": str or None}
+            {"type": "error", "message": str}
+        """
+        function_called = None
+        self.turn = TurnStats(self.user_id, streaming=True)
+        try:
+            local_answer = await self.answer_locally(user_message)
+            if local_answer:
+                self.turn.function_called = local_answer["function_called"]
+                yield {"type": "function", "name": local_answer["function_called"]}
+                yield {"type": "token", "text": local_answer["message"]}
+                yield {"type": "done", "function_called": local_answer["function_called"]}
+                return
+
+            use_cache = not history
+            if use_cache:
+                versions = await self._in_worker(snapshot_versions, self.user_id)
+                cached = get_cached_response(self.user_id, user_message, versions)
+                if cached:
+                    self.turn.source = "response_cache"
+                    self.turn.function_called = cached["function_called"]
+                    yield {"type": "token", "text": cached["message"]}
+                    yield {"type": "done", "function_called": cached["function_called"]}
+                    return
+
+            contents = self._build_contents(user_message, history)
+
+            function_calls = []
+            answer = []
+            async for chunk in self._stream_content(contents, with_tools=True):
+                function_calls.extend(_function_calls(chunk))
+                text = _text(chunk)
+                if text:
+                    answer.append(text)
+                    yield {"type": "token", "text": text}
+
+            if function_calls:
+                function_called = ", ".join(call.name for call in function_calls)
+                self.turn.function_called = function_called
+                for call in function_calls:
+                    yield {"type": "function", "name": call.name}
+
+                follow_up = await self._answer_function_calls(contents, function_calls)
+                async for chunk in self._stream_content(follow_up, with_tools=False):
+                    text = _text(chunk)
+                    if text:
+                        answer.append(text)
+                        yield {"type": "token", "text": text}
+
+            if not answer:
+                yield {"type": "token", "text": FALLBACK_MESSAGE}
+            elif use_cache:
+                store_response(
+                    self.user_id, user_message,
+                    {"message": "".join(answer), "function_called": function_called},
+                    self.categories_used, versions
+                )
+            yield {"type": "done", "function_called": function_called}
+
         except Exception as e:
-            # User-friendly error messages
-            error_str = str(e).lower()
-            
-            if "429" in error_str or "quota" in error_str or "resource_exhausted" in error_str:
-                message = "I'm currently experiencing high demand. Please try again in a few moments."
-            elif "401" in error_str or "unauthorized" in error_str or "api key" in error_str:
-                message = "I'm having trouble connecting right now. Please contact support."
-            elif "timeout" in error_str:
-                message = "The request took too long. Please try asking a simpler question."
-            elif "network" in error_str or "connection" in error_str:
-                message = "I'm having trouble connecting. Please check your internet connection."
-            else:
-                message = "I'm having trouble processing your request right now. Please try again."
-            
-            return {
-                "message": message,
-                "function_called": None
-            }
\ No newline at end of file
+            error = classify(e)
+            self.turn.record_error(type(error).__name__)
+            yield {"type": "error", "message": error.message}
+        finally:
+            self.turn.finish()
@@ -0,0 +1,82 @@
+"""
+Process-wide Gemini client
+
+One genai.Client is created once and shared by every chat request,
+so requests reuse pooled keep-alive connections instead of paying client
+setup and a TLS handshake each time.
+
+LLM_BACKEND selects the implementation: "gemini" (default) or "fake", an
+offline deterministic stand-in for load tests (see fake_backend.py).
+
+The google-genai SDK is imported on first use rather than at module load,
+so starting the app (or a script) doesn't pay for it; see startup.py for
+the background warm-up.
+"""
+import os
+from typing import TYPE_CHECKING, Optional
+import httpx
+
+if TYPE_CHECKING:
+    from google import genai
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "20"))
+GEMINI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GEMINI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+GEMINI_KEEPALIVE_EXPIRY = float(os.getenv("GEMINI_KEEPALIVE_EXPIRY", "60"))  # seconds
+
+_client: Optional["genai.Client"] = None
+
+
+def create_client() -> "genai.Client":
+    """Build the configured backend; for Gemini, a client with a pooled keep-alive transport"""
+    if LLM_BACKEND == "fake":
+        from app.llm.fake_backend import FakeGeminiClient
+        return FakeGeminiClient()  # type: ignore[return-value]
+    if LLM_BACKEND != "gemini":
+        raise ValueError(f"Unknown LLM_BACKEND '{LLM_BACKEND}'; use 'gemini' or 'fake'")
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY not found in environment variables")
+
+    from google import genai
+    from google.genai import types
+
+    limits = httpx.Limits(
+        max_connections=GEMINI_MAX_CONNECTIONS,
+        max_keepalive_connections=GEMINI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=GEMINI_KEEPALIVE_EXPIRY,
+    )
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(
+            client_args={"limits": limits},
+            async_client_args={"limits": limits},
+        ),
+    )
+
+
+def init_client() -> Optional["genai.Client"]:
+    """Create the shared client at startup; Gemini chat stays unavailable without an API key"""
+    global _client
+    if _client is None and (LLM_BACKEND != "gemini" or os.getenv("GEMINI_API_KEY")):
+        _client = create_client()
+    return _client
+
+
+async def close_client() -> None:
+    """Release pooled connections at shutdown"""
+    global _client
+    if _client is not None:
+        await _client.aio.aclose()
+        _client.close()
+        _client = None
+
+
+def get_client() -> "genai.Client":
+    """FastAPI dependency returning the shared client (created on first use if needed)"""
+    global _client
+    if _client is None:
+        _client = create_client()
+    return _client
@@ -0,0 +1,91 @@
+"""
+Conversation context packing
+
+The prompt carries the most recent turns that fit both a turn limit and a
+token budget. Older turns are compacted into a short rolling summary that
+is stored on the conversation, so prompt size stays roughly constant
+however long the conversation gets. Compaction is deterministic and does
+not call the model.
+"""
+import os
+from sqlmodel import Session
+from app.models import ChatMessage, Conversation
+from app.services.conversations import save_summary, unsummarized_messages
+
+CHAT_HISTORY_MAX_TURNS = int(os.getenv("CHAT_HISTORY_MAX_TURNS", "6"))
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000"))
+CHAT_SUMMARY_TOKEN_BUDGET = int(os.getenv("CHAT_SUMMARY_TOKEN_BUDGET", "500"))
+
+# Longest excerpt of a single message kept in the summary
+SUMMARY_LINE_CHARS = 240
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+def split_recent(messages: list[ChatMessage], max_turns: int = CHAT_HISTORY_MAX_TURNS,
+                 token_budget: int = CHAT_HISTORY_TOKEN_BUDGET) -> tuple[list[ChatMessage], list[ChatMessage]]:
+    """
+    Split messages (oldest first) into (older, recent)
+
+    recent is the longest tail within max_turns question/answer pairs and
+    token_budget tokens, and always starts with a user message.
+    """
+    used = 0
+    start = len(messages)
+    while start > 0:
+        cost = estimate_tokens(messages[start - 1].content)
+        if len(messages) - start >= 2 * max_turns or used + cost > token_budget:
+            break
+        used += cost
+        start -= 1
+    while start < len(messages) and messages[start].role != "user":
+        start += 1
+    return messages[:start], messages[start:]
+
+
+def _clip(text: str) -> str:
+    text = " ".join(text.split())
+    if len(text) <= SUMMARY_LINE_CHARS:
+        return text
+    return text[:SUMMARY_LINE_CHARS - 3] + "..."
+
+
+def compact(summary: str, messages: list[ChatMessage], token_budget: int = CHAT_SUMMARY_TOKEN_BUDGET) -> str:
+    """Fold messages into summary, keeping the newest lines that fit token_budget"""
+    lines = summary.splitlines() if summary else []
+    for message in messages:
+        speaker = "User" if message.role == "user" else "Assistant"
+        lines.append(f"{speaker}: {_clip(message.content)}")
+
+    kept: list[str] = []
+    used = 0
+    for line in reversed(lines):
+        used += estimate_tokens(line)
+        if used > token_budget:
+            break
+        kept.append(line)
+    return "\n".join(reversed(kept))
+
+
+def to_contents(summary: str, messages: list[ChatMessage]) -> list:
+    """Build Gemini contents from a summary and recent messages"""
+    contents = [{"role": message.role, "parts": [{"text": message.content}]} for message in messages]
+    if summary:
+        note = {"text": f"(Summary of our earlier conversation:\n{summary})"}
+        if contents:
+            contents[0]["parts"].insert(0, note)
+        else:
+            contents.append({"role": "user", "parts": [note]})
+    return contents
+
+
+def pack_history(session: Session, conversation: Conversation) -> list:
+    """Prompt history for the next turn, compacting turns that no longer fit"""
+    older, recent = split_recent(unsummarized_messages(session, conversation))
+    if older:
+        assert older[-1].id is not None
+        save_summary(session, conversation, compact(conversation.summary, older), older[-1].id)
+    return to_contents(conversation.summary, recent)
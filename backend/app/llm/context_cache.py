@@ -0,0 +1,115 @@
+"""
+Gemini context caching for the static prompt prefix
+
+SYSTEM_PROMPT and the TOOLS declarations are identical on every call, so
+when GEMINI_CONTEXT_CACHE is on they are uploaded once at startup as
+cached content and each call references them by name instead of resending
+them. Two entries are kept: one with the tools (first call of a turn) and
+one without (the follow-up that answers from tool results). A background
+task extends their TTL before it runs out.
+
+Any failure (caching unsupported for the model, prefix below the minimum
+cacheable size, an entry gone upstream) drops that entry and calls fall
+back to sending the prompt inline.
+"""
+import asyncio
+import os
+import time
+from typing import Callable, Optional
+from google.genai import types
+from app.llm.prompt import SYSTEM_PROMPT, TOOLS
+from app.services import metrics
+
+GEMINI_CONTEXT_CACHE = os.getenv("GEMINI_CONTEXT_CACHE", "0") == "1"
+GEMINI_CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))  # seconds
+# Extend an entry's TTL once less than this much of it is left
+GEMINI_CONTEXT_CACHE_REFRESH = int(os.getenv("GEMINI_CONTEXT_CACHE_REFRESH", "600"))  # seconds
+
+# Stop using an entry this long before it expires, in case a refresh is late
+EXPIRY_MARGIN = 30  # seconds
+
+
+class ContextCache:
+    """Names of the cached prompt prefixes, keyed by whether they include the tools"""
+
+    def __init__(self, ttl: int = GEMINI_CONTEXT_CACHE_TTL, refresh_before: int = GEMINI_CONTEXT_CACHE_REFRESH,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.refresh_before = refresh_before
+        self.clock = clock
+        self._entries: dict[bool, tuple[str, float]] = {}  # with_tools -> (name, expires_at)
+
+    def name(self, with_tools: bool) -> Optional[str]:
+        """Cached content to reference, or None to send the prompt inline"""
+        entry = self._entries.get(with_tools)
+        if entry is None:
+            metrics.inc("llm_context_cache_total", result="inline")
+            return None
+        name, expires_at = entry
+        if self.clock() >= expires_at - EXPIRY_MARGIN:
+            self._entries.pop(with_tools, None)
+            metrics.inc("llm_context_cache_total", result="inline")
+            return None
+        metrics.inc("llm_context_cache_total", result="cached")
+        return name
+
+    def discard(self, name: str) -> None:
+        """Stop using an entry the API no longer accepts"""
+        for with_tools, (entry_name, _) in list(self._entries.items()):
+            if entry_name == name:
+                del self._entries[with_tools]
+                print(f"Context cache {name} rejected; sending the prompt inline")
+
+    async def start(self, client, model: str) -> None:
+        """Create both entries; an entry that can't be created is left out"""
+        for with_tools in (True, False):
+            try:
+                cached = await client.aio.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        display_name=f"wellgenie-prompt{'-tools' if with_tools else ''}",
+                        system_instruction=SYSTEM_PROMPT,
+                        tools=TOOLS if with_tools else None,
+                        ttl=f"{self.ttl}s",
+                    ),
+                )
+            except Exception as e:
+                print(f"Context caching unavailable, sending the prompt inline: {e}")
+                continue
+            self._entries[with_tools] = (cached.name, self.clock() + self.ttl)
+
+    async def refresh(self, client) -> None:
+        """Extend entries that are close to expiry"""
+        for with_tools, (name, expires_at) in list(self._entries.items()):
+            if expires_at - self.clock() > self.refresh_before:
+                continue
+            try:
+                await client.aio.caches.update(
+                    name=name, config=types.UpdateCachedContentConfig(ttl=f"{self.ttl}s")
+                )
+            except Exception as e:
+                print(f"Could not refresh context cache {name}: {e}")
+                self._entries.pop(with_tools, None)
+                continue
+            self._entries[with_tools] = (name, self.clock() + self.ttl)
+
+    async def run_refresher(self, client) -> None:
+        """Refresh entries until cancelled"""
+        while self._entries:
+            await asyncio.sleep(max(1, self.refresh_before // 2))
+            await self.refresh(client)
+
+    async def stop(self, client) -> None:
+        """Delete the entries so they stop accruing storage"""
+        for name, _ in list(self._entries.values()):
+            try:
+                await client.aio.caches.delete(name=name)
+            except Exception as e:
+                print(f"Could not delete context cache {name}: {e}")
+        self.clear()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+context_cache = ContextCache()
@@ -0,0 +1,141 @@
+"""
+Offline fake of the Gemini backend
+
+FakeGeminiClient implements the part of genai.Client that ChatService
+uses, so chat can be load-tested and benchmarked without an API key or
+network. Answers are deterministic: questions mentioning sleep, steps or
+calories get the matching weekly tool calls, follow-ups summarise the tool
+results, anything else gets a canned reply. Latency and upstream errors
+are injected according to the FAKE_LLM_* settings.
+
+Select it with LLM_BACKEND=fake.
+"""
+import asyncio
+import os
+import random
+from typing import AsyncIterator
+from google.genai import errors, types
+
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "300"))
+FAKE_LLM_JITTER_MS = float(os.getenv("FAKE_LLM_JITTER_MS", "0"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))  # 0..1
+FAKE_LLM_ERROR_CODE = int(os.getenv("FAKE_LLM_ERROR_CODE", "503"))
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "0"))
+
+# Keyword in the question -> weekly tool the fake asks for
+KEYWORD_TOOLS = {
+    "sleep": "get_sleep_last_week",
+    "step": "get_steps_last_week",
+    "active": "get_steps_last_week",
+    "calorie": "get_calories_last_week",
+    "eat": "get_calories_last_week",
+}
+
+# Words per streamed chunk
+STREAM_CHUNK_WORDS = 4
+
+
+def _get(obj, name: str):
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+def _response(parts: list[types.Part], prompt_tokens: int, output_tokens: int) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=parts))],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        ),
+    )
+
+
+class FakeGeminiClient:
+    """Deterministic stand-in for genai.Client with latency and error injection"""
+
+    def __init__(self, latency_ms: float = FAKE_LLM_LATENCY_MS, jitter_ms: float = FAKE_LLM_JITTER_MS,
+                 error_rate: float = FAKE_LLM_ERROR_RATE, error_code: int = FAKE_LLM_ERROR_CODE,
+                 seed: int = FAKE_LLM_SEED):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.calls = 0
+        self._random = random.Random(seed)
+        # Mirror genai.Client's client.aio.models.generate_content layout
+        self.aio = self
+        self.models = self
+
+    async def _wait(self, share: float = 1.0) -> None:
+        jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        delay = max(0.0, self.latency_ms + jitter) * share / 1000
+        if delay:
+            await asyncio.sleep(delay)
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate and self._random.random() < self.error_rate:
+            error_class = errors.ServerError if self.error_code >= 500 else errors.ClientError
+            raise error_class(self.error_code, {"error": {"code": self.error_code, "message": "injected failure"}})
+
+    def _answer(self, contents: list, config) -> types.GenerateContentResponse:
+        last = contents[-1]
+        parts = _get(last, "parts") or []
+        prompt_tokens = sum(
+            len(str(_get(part, "text") or _get(part, "function_response") or "")) // 4 + 1
+            for content in contents for part in (_get(content, "parts") or [])
+        )
+
+        results = [_get(part, "function_response") for part in parts if _get(part, "function_response")]
+        if results:
+            summary = "; ".join(
+                f"{_get(result, 'name')}: "
+                + ", ".join(f"{key}={value}" for key, value in (_get(result, "response") or {}).items())
+                for result in results
+            )
+            text = f"Here is what I found. {summary}."
+            return _response([types.Part(text=text)], prompt_tokens, len(text) // 4 + 1)
+
+        question = " ".join(str(_get(part, "text") or "") for part in parts).lower()
+        tools = []
+        if config is not None and _get(config, "tools"):
+            tools = list(dict.fromkeys(tool for word, tool in KEYWORD_TOOLS.items() if word in question))
+        if tools:
+            calls = [types.Part(function_call=types.FunctionCall(name=name, args={})) for name in tools]
+            return _response(calls, prompt_tokens, 10 * len(calls))
+
+        text = "I can help with questions about your sleep, activity and diet. What would you like to know?"
+        return _response([types.Part(text=text)], prompt_tokens, len(text) // 4 + 1)
+
+    async def generate_content(self, *, model: str, contents: list, config=None) -> types.GenerateContentResponse:
+        self.calls += 1
+        await self._wait()
+        self._maybe_fail()
+        return self._answer(contents, config)
+
+    async def generate_content_stream(self, *, model: str, contents: list,
+                                      config=None) -> AsyncIterator[types.GenerateContentResponse]:
+        self.calls += 1
+        # Time to first chunk is half the latency; the rest is spread across chunks
+        await self._wait(0.5)
+        self._maybe_fail()
+        response = self._answer(contents, config)
+        text = response.text if not response.function_calls else None
+
+        async def iterate():
+            if not text:
+                yield response
+                return
+            words = text.split(" ")
+            chunks = [" ".join(words[i:i + STREAM_CHUNK_WORDS]) for i in range(0, len(words), STREAM_CHUNK_WORDS)]
+            for index, chunk in enumerate(chunks):
+                if index:
+                    await self._wait(0.5 / len(chunks))
+                    chunk = " " + chunk
+                yield _response([types.Part(text=chunk)], 0, len(chunk) // 4 + 1)
+        return iterate()
+
+    async def aclose(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,113 @@
+"""
+Nightly batch pre-computation of weekly insights
+
+For every user with recent entries, run the weekly chat tools for last
+week on a worker pool and store the results as a WeeklyInsight. At peak
+time "how was last week?" is then answered from the stored row instead
+of aggregate queries and model calls. Optionally, a short narrative is
+written for each insight by the model, paced by a token bucket so the
+batch never spends more than its share of quota.
+
+Run it from cron via scripts/precompute_insights.py.
+"""
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from functools import partial
+from google.genai import types
+from sqlmodel import Session, col, select
+from app.llm.client import GEMINI_MODEL
+from app.llm.resilience import LLMError, LLMUnavailableError, call_llm
+from app.models import WeeklyInsight
+from app.services import metrics
+from app.services.analytics import WEEKLY_TOOLS, run_weekly_tool
+from app.services.insights import active_user_ids, save_insight, save_narrative, week_bounds
+from app.services.rate_limit import MemoryBucketStore, RateLimiter, Rule, parse_rule
+
+INSIGHTS_WORKERS = int(os.getenv("INSIGHTS_WORKERS", "4"))
+# Users with an entry in this many days count as active
+INSIGHTS_ACTIVE_DAYS = int(os.getenv("INSIGHTS_ACTIVE_DAYS", "28"))
+# Model calls the narrative pass may make, as "<requests>/<seconds>"
+INSIGHTS_NARRATIVE_RATE = parse_rule(os.getenv("INSIGHTS_NARRATIVE_RATE", "10/60"))
+
+NARRATIVE_PROMPT = """You are WellGenie, a friendly health assistant.
+Summarize the user's last week in two or three encouraging sentences using
+only the numbers given (sleep, steps, calories). Mention categories with no
+entries briefly. Do not give medical advice or invent numbers."""
+
+
+def compute_insight(bind, user_id: int) -> WeeklyInsight:
+    """Run every weekly tool for user_id and store the results"""
+    with Session(bind) as session:
+        start_date, end_date = week_bounds(date.today())
+        results = {
+            name: run_weekly_tool(session, user_id, name, start_date, end_date) for name in WEEKLY_TOOLS
+        }
+        return save_insight(session, user_id, start_date, end_date, results)
+
+
+def precompute_weekly_insights(bind, workers: int = INSIGHTS_WORKERS) -> dict:
+    """Compute last week's insight for every active user on a worker pool"""
+    since = date.today() - timedelta(days=INSIGHTS_ACTIVE_DAYS)
+    with Session(bind) as session:
+        user_ids = active_user_ids(session, since)
+
+    computed = failed = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="insights") as pool:
+        futures = {pool.submit(compute_insight, bind, user_id): user_id for user_id in user_ids}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                computed += 1
+            except Exception as e:
+                failed += 1
+                print(f"Could not compute insight for user {futures[future]}: {e}")
+
+    metrics.inc("insights_computed_total", computed)
+    if failed:
+        metrics.inc("insights_failed_total", failed)
+    return {"users": len(user_ids), "computed": computed, "failed": failed}
+
+
+async def write_narratives(bind, client, rule: Rule = INSIGHTS_NARRATIVE_RATE) -> int:
+    """Add a model-written narrative to last week's insights, at most rule's rate"""
+    limiter = RateLimiter({"narratives": rule}, MemoryBucketStore())
+    week_start, _ = week_bounds(date.today())
+    written = 0
+
+    with Session(bind) as session:
+        insights = session.exec(
+            select(WeeklyInsight)
+            .where(WeeklyInsight.week_start == week_start)
+            .where(col(WeeklyInsight.narrative).is_(None))
+        ).all()
+
+        for insight in insights:
+            decision = limiter.hit("narratives", "batch")
+            while decision is not None and not decision.allowed:
+                await asyncio.sleep(decision.retry_after)
+                decision = limiter.hit("narratives", "batch")
+
+            prompt = json.dumps(insight.results)
+            try:
+                response = await call_llm(partial(
+                    client.aio.models.generate_content,
+                    model=GEMINI_MODEL,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(system_instruction=NARRATIVE_PROMPT, temperature=0.7)
+                ))
+            except LLMUnavailableError:
+                print("Model unavailable; leaving the remaining insights without a narrative")
+                break
+            except LLMError as e:
+                print(f"Could not write narrative for user {insight.user_id}: {e}")
+                continue
+
+            if response.text:
+                save_narrative(session, insight, response.text.strip())
+                written += 1
+
+    metrics.inc("insights_narratives_total", written)
+    return written
@@ -0,0 +1,98 @@
+"""
+Deterministic fast path for common health questions
+
+Recognizes the questions we already have a weekly tool for ("How much
+sleep did I get last week?") and answers them from a template, so they
+don't need two Gemini round trips. Only the plain how much / how many /
+average / total phrasings match, as whole questions; anything that adds
+a day, a comparison or another measure goes to the model.
+"""
+import re
+from typing import Optional
+
+_WEEK = r"(?:the )?(?:last|previous) week"
+_STAT = r"(?:average |total )?(?:daily )?"
+# The steps tool only reports the daily average
+_AVERAGE = r"(?:average )?(?:daily )?"
+
+# The phrasings we answer from a template; each must match the whole question
+_QUESTIONS = {
+    "get_sleep_last_week": [
+        rf"how much sleep did i get {_WEEK}",
+        rf"how much did i sleep {_WEEK}",
+        rf"how many hours (?:of sleep )?did i (?:get|sleep) {_WEEK}",
+        rf"what was my {_STAT}sleep {_WEEK}",
+    ],
+    "get_steps_last_week": [
+        rf"how many steps did i (?:take|walk) {_WEEK}",
+        rf"how much did i walk {_WEEK}",
+        rf"what (?:was|were) my {_AVERAGE}(?:steps|step count) {_WEEK}",
+    ],
+    "get_calories_last_week": [
+        rf"how many calories did i (?:eat|have|consume) {_WEEK}",
+        rf"what (?:was|were) my {_STAT}(?:calories|calorie intake|calorie count) {_WEEK}",
+    ],
+}
+
+# "How was last week?" - answered with every weekly tool
+WEEKLY_SUMMARY = "weekly_summary"
+_SUMMARY = [
+    rf"how was (?:my )?{_WEEK}",
+    rf"how did i do {_WEEK}",
+    rf"(?:give me )?(?:a |my )?(?:summary|recap|overview) (?:of|for) (?:my )?{_WEEK}",
+    rf"summari[sz]e (?:my )?{_WEEK}",
+]
+
+_PATTERNS = [
+    (re.compile(pattern), name)
+    for name, patterns in [*_QUESTIONS.items(), (WEEKLY_SUMMARY, _SUMMARY)]
+    for pattern in patterns
+]
+
+
+def match_intent(message: str) -> Optional[str]:
+    """Return the weekly tool that fully answers message, WEEKLY_SUMMARY, or None"""
+    text = " ".join(message.lower().split()).rstrip("?.! ")
+    for pattern, name in _PATTERNS:
+        if pattern.fullmatch(text):
+            return name
+    return None
+
+
+def render_answer(function_name: str, result: dict) -> str:
+    """Phrase a weekly tool result the way the assistant would"""
+    days = result.get("days_recorded", 0)
+    week = result.get("week", "")
+
+    if function_name == "get_sleep_last_week":
+        if not days:
+            return f"I don't have any sleep entries for last week ({week})."
+        total = result["total_hours"]
+        return (
+            f"Last week ({week}) you slept {total:g} hours in total across {days} recorded "
+            f"{'night' if days == 1 else 'nights'}, about {total / days:.1f} hours per night."
+        )
+
+    if function_name == "get_steps_last_week":
+        if not days:
+            return f"I don't have any exercise entries for last week ({week})."
+        return (
+            f"Last week ({week}) you averaged {result['average_steps']:,.0f} steps per day "
+            f"across {days} recorded {'day' if days == 1 else 'days'}."
+        )
+
+    if function_name == "get_calories_last_week":
+        if not days:
+            return f"I don't have any diet entries for last week ({week})."
+        total = result["total_calories"]
+        return (
+            f"Last week ({week}) you ate {total:,.0f} calories in total across {days} recorded "
+            f"{'day' if days == 1 else 'days'}, about {total / days:,.0f} calories per day."
+        )
+
+    raise ValueError(f"No template for function: {function_name}")
+
+
+def render_summary(results: dict) -> str:
+    """Phrase the results of every weekly tool (tool name -> result) as one answer"""
+    return " ".join(render_answer(name, results[name]) for name in _QUESTIONS if name in results)
@@ -1,6 +1,7 @@
 """
 System prompts and tool definitions for WellGenie chat
 """
+from app.services.analytics import AGGREGATIONS, METRICS
 
 SYSTEM_PROMPT = """You are WellGenie, a health and wellness assistant.
 
@@ -12,10 +13,33 @@ Your role:
 CRITICAL RULES:
 1. Always use tools to get data - never guess or estimate
 2. "last week" means the most recent complete Monday-Sunday calendar week
-3. If you don't have a tool for something, explain what you CAN help with
+3. For any other period, metric or trend use get_metric_summary or get_metric_trend with explicit dates
+4. If you don't have a tool for something, explain what you CAN help with
 
 When you get data from tools, explain it clearly and conversationally to the user."""
 
+# Shared parameters of the analytics tools (see app/services/analytics.py)
+_METRIC_PROPERTIES = {
+    "metric": {
+        "type": "string",
+        "enum": list(METRICS),
+        "description": "Metric to aggregate"
+    },
+    "aggregation": {
+        "type": "string",
+        "enum": list(AGGREGATIONS),
+        "description": "How to combine daily entries"
+    },
+    "start_date": {
+        "type": "string",
+        "description": "First day of the range, YYYY-MM-DD"
+    },
+    "end_date": {
+        "type": "string",
+        "description": "Last day of the range, YYYY-MM-DD"
+    }
+}
+
 # Tool definitions for Gemini function calling
 # Format for models.generate_content API
 TOOLS = [
@@ -47,6 +71,31 @@ TOOLS = [
                     "properties": {},
                     "required": []
                 }
+            },
+            {
+                "name": "get_metric_summary",
+                "description": "Aggregate one metric over any date range into a single value, e.g. average sleep in March. Returns the value and days recorded.",
+                "parameters": {
+                    "type": "object",
+                    "properties": _METRIC_PROPERTIES,
+                    "required": ["metric", "aggregation", "start_date", "end_date"]
+                }
+            },
+            {
+                "name": "get_metric_trend",
+                "description": "Aggregate one metric over a date range per day, week or month, e.g. weekly protein over 90 days. Returns one value per period.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        **_METRIC_PROPERTIES,
+                        "bucket": {
+                            "type": "string",
+                            "enum": ["day", "week", "month"],
+                            "description": "Period to group by"
+                        }
+                    },
+                    "required": ["metric", "aggregation", "start_date", "end_date", "bucket"]
+                }
             }
         ]
     }
@@ -0,0 +1,261 @@
+"""
+Resilience layer for Gemini calls
+
+Every model call goes through call_llm (or stream_llm), which:
+- caps in-flight calls per worker with a semaphore,
+- gives each attempt a deadline,
+- retries retryable failures (429, 5xx, timeouts, connection errors)
+  with exponential backoff and full jitter,
+- fails fast through a circuit breaker while the upstream is unhealthy.
+
+Failures come out as LLMError subclasses chosen by exception type, each
+carrying the message we show the user.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+import httpx
+from google.genai import errors
+from app.services import metrics
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))  # seconds per attempt
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))  # seconds
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "4"))  # seconds
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))  # consecutive failures
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))  # seconds
+
+T = TypeVar("T")
+
+
+class LLMError(Exception):
+    """A model call failed; message is safe to show the user"""
+    message = "I'm having trouble processing your request right now. Please try again."
+    retryable = False
+
+
+class LLMRateLimitedError(LLMError):
+    message = "I'm currently experiencing high demand. Please try again in a few moments."
+    retryable = True
+
+
+class LLMAuthError(LLMError):
+    message = "I'm having trouble connecting right now. Please contact support."
+
+
+class LLMTimeoutError(LLMError):
+    message = "The request took too long. Please try asking a simpler question."
+    retryable = True
+
+
+class LLMConnectionError(LLMError):
+    message = "I'm having trouble connecting. Please check your internet connection."
+    retryable = True
+
+
+class LLMServerError(LLMError):
+    retryable = True
+
+
+class LLMUnavailableError(LLMError):
+    """Raised without calling the model while the circuit breaker is open"""
+    message = "The assistant is temporarily unavailable. Please try again in a few moments."
+
+
+def classify(error: BaseException) -> LLMError:
+    """Wrap an exception from the client in the matching LLMError"""
+    if isinstance(error, LLMError):
+        return error
+    if isinstance(error, errors.APIError):
+        if error.code == 429:
+            cls: type[LLMError] = LLMRateLimitedError
+        elif error.code in (401, 403):
+            cls = LLMAuthError
+        elif error.code in (408, 504):
+            cls = LLMTimeoutError
+        elif isinstance(error, errors.ServerError):
+            cls = LLMServerError
+        else:
+            cls = LLMError
+    elif isinstance(error, (TimeoutError, httpx.TimeoutException)):
+        cls = LLMTimeoutError
+    elif isinstance(error, (httpx.TransportError, ConnectionError)):
+        cls = LLMConnectionError
+    else:
+        cls = LLMError
+    wrapped = cls(str(error))
+    wrapped.__cause__ = error
+    return wrapped
+
+
+class CircuitBreaker:
+    """Opens after threshold consecutive upstream failures.
+
+    While open, calls are rejected until cooldown has passed; then a single
+    trial call is let through (half-open) and its outcome closes or reopens
+    the circuit.
+    """
+
+    def __init__(self, threshold: int = LLM_BREAKER_THRESHOLD, cooldown: float = LLM_BREAKER_COOLDOWN,
+                 clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._trial_running or self.clock() - self._opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Raise LLMUnavailableError unless a call may go through now; True if it is the half-open trial"""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if self._trial_running or self.clock() - self._opened_at < self.cooldown:
+                metrics.inc("llm_calls_rejected_total", reason="circuit_open")
+                raise LLMUnavailableError("circuit open")
+            self._trial_running = True
+            return True
+
+    def release_trial(self) -> None:
+        """Give up the trial slot without an outcome (the trial call was cancelled)"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+            self._report()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.threshold:
+                self._opened_at = self.clock()
+                self._trial_running = False
+            self._report()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at: Optional[float] = None
+            self._trial_running = False
+            self._report()
+
+    def _report(self) -> None:
+        metrics.set_gauge("llm_circuit_open", 0 if self._opened_at is None else 1)
+
+
+breaker = CircuitBreaker()
+
+# asyncio primitives belong to one event loop, so each loop gets its own
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return semaphore
+
+
+def _backoff(attempt: int) -> float:
+    """Full jitter: uniform between 0 and the capped exponential delay"""
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def _record(error: LLMError) -> None:
+    metrics.inc("llm_errors_total", error=type(error).__name__)
+    # Client mistakes (bad request, auth) say nothing about upstream health
+    if error.retryable:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+async def call_llm(make_call: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+    """Run make_call() with a deadline, retries, the breaker and the concurrency cap"""
+    timeout = LLM_TIMEOUT if timeout is None else timeout
+    attempt = 0
+    while True:
+        trial = breaker.allow()
+        try:
+            async with _semaphore():
+                async with asyncio.timeout(timeout):
+                    result = await make_call()
+        except Exception as e:
+            error = classify(e)
+            _record(error)
+            if not error.retryable or attempt >= LLM_MAX_RETRIES:
+                raise error
+        except BaseException:
+            # Cancelled: says nothing about upstream health, but the next call may try
+            if trial:
+                breaker.release_trial()
+            raise
+        else:
+            breaker.record_success()
+            return result
+        metrics.inc("llm_retries_total", error=type(error).__name__)
+        await asyncio.sleep(_backoff(attempt))
+        attempt += 1
+
+
+async def stream_llm(make_stream: Callable[[], Awaitable[AsyncIterator[T]]],
+                     timeout: Optional[float] = None) -> AsyncIterator[T]:
+    """
+    Streaming counterpart of call_llm
+
+    The deadline applies to opening the stream and to each chunk. Failures
+    are only retried before the first chunk is yielded.
+    """
+    timeout = LLM_TIMEOUT if timeout is None else timeout
+    attempt = 0
+    while True:
+        trial = breaker.allow()
+        started = False
+        try:
+            async with _semaphore():
+                async with asyncio.timeout(timeout):
+                    stream = await make_stream()
+                iterator = aiter(stream)
+                while True:
+                    try:
+                        async with asyncio.timeout(timeout):
+                            chunk = await anext(iterator)
+                    except StopAsyncIteration:
+                        break
+                    started = True
+                    yield chunk
+        except Exception as e:
+            error = classify(e)
+            _record(error)
+            if started or not error.retryable or attempt >= LLM_MAX_RETRIES:
+                raise error
+        except BaseException:
+            # Cancelled or closed early (GeneratorExit)
+            if trial:
+                breaker.release_trial()
+            raise
+        else:
+            breaker.record_success()
+            return
+        metrics.inc("llm_retries_total", error=type(error).__name__)
+        await asyncio.sleep(_backoff(attempt))
+        attempt += 1
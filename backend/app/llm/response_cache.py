@@ -0,0 +1,97 @@
+"""
+Cache of final chat answers
+
+Entries are keyed by (user_id, day, normalized question), since "last
+week" moves with the date, and remember the stored data version of every
+category the answer was built from. A lookup only hits while those
+versions are unchanged, so an upload or delete handled by any worker
+makes the answer stale; this worker's uploads/deletes also drop the
+user's affected entries eagerly. Bounded by entry count, memory and TTL.
+"""
+import os
+import re
+import sys
+from datetime import date
+from typing import Optional
+from sqlmodel import Session, select
+from app.models import DataVersion
+from app.services.cache import MISSING, LRUCache
+from app.services.data_events import on_data_changed
+
+CATEGORIES = ("sleep", "diet", "exercise")
+
+CHAT_RESPONSE_CACHE = os.getenv("CHAT_RESPONSE_CACHE", "1") == "1"
+CHAT_RESPONSE_CACHE_TTL = float(os.getenv("CHAT_RESPONSE_CACHE_TTL", "3600"))  # seconds
+CHAT_RESPONSE_CACHE_MAX_BYTES = int(os.getenv("CHAT_RESPONSE_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _sizeof(entry: dict) -> int:
+    response = entry["response"]
+    return (
+        sys.getsizeof(response["message"])
+        + sys.getsizeof(response.get("function_called") or "")
+        + 64 * (len(entry["versions"]) + 2)
+    )
+
+
+response_cache = LRUCache(
+    "chat_responses",
+    max_entries=100_000,
+    ttl=CHAT_RESPONSE_CACHE_TTL,
+    max_bytes=CHAT_RESPONSE_CACHE_MAX_BYTES,
+    sizeof=_sizeof,
+)
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivial rewordings share a key"""
+    text = _PUNCTUATION.sub(" ", message.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _key(user_id: int, message: str) -> tuple:
+    return user_id, date.today(), normalize_message(message)
+
+
+def snapshot_versions(session: Session, user_id: int) -> dict[str, int]:
+    """Stored data versions of every category, read once per turn before any data"""
+    query = select(DataVersion.category, DataVersion.version).where(
+        DataVersion.user_id == user_id, DataVersion.category.in_(CATEGORIES)  # type: ignore[attr-defined]
+    )
+    stored = dict(session.exec(query).all())
+    return {category: stored.get(category, 0) for category in CATEGORIES}
+
+
+def get_cached_response(user_id: int, message: str, versions: dict[str, int]) -> Optional[dict]:
+    """Cached answer, if the categories it used still have the versions in the snapshot"""
+    if not CHAT_RESPONSE_CACHE:
+        return None
+    entry = response_cache.get(_key(user_id, message))
+    if entry is MISSING:
+        return None
+    if any(versions[c] != v for c, v in entry["versions"].items()):
+        return None
+    return dict(entry["response"])
+
+
+def store_response(user_id: int, message: str, response: dict,
+                   categories: set[str], versions: dict[str, int]) -> None:
+    """Cache response, valid while the categories it used keep the given versions"""
+    if not CHAT_RESPONSE_CACHE:
+        return
+    response_cache.set(_key(user_id, message), {
+        "response": dict(response),
+        "versions": {category: versions[category] for category in categories},
+    })
+
+
+@on_data_changed
+def _invalidate_responses(user_id: int, category: str, start_date: date, end_date: date) -> None:
+    # Answers are not tied to date ranges, so drop all of the user's answers about this category
+    def is_stale(key, entry) -> bool:
+        return key[0] == user_id and category in entry["versions"]
+
+    response_cache.invalidate(is_stale)
@@ -0,0 +1,49 @@
+"""
+Background warm-up of the chat subsystem
+
+The app starts serving without importing the chat stack (the google-genai
+SDK is a large import tree). Once it is up, warm_up imports it on a
+thread, creates the shared client and, if enabled, the context cache, so
+the first chat request doesn't pay for any of it. With CHAT_WARMUP=0
+everything is loaded by the first chat request instead.
+"""
+import asyncio
+import importlib
+import os
+import time
+from typing import Any, Optional
+from app.llm.client import GEMINI_MODEL, close_client, init_client
+
+CHAT_WARMUP = os.getenv("CHAT_WARMUP", "1") == "1"
+
+# Context cache refresher task and the client it refreshes through
+_refresher: Optional[tuple[asyncio.Task, Any]] = None
+
+
+async def warm_up() -> None:
+    """Import the chat stack off the event loop, then create the client and context cache"""
+    global _refresher
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(importlib.import_module, "app.llm.chat_service")
+        client = init_client()
+        from app.llm.context_cache import GEMINI_CONTEXT_CACHE, context_cache
+        if client is not None and GEMINI_CONTEXT_CACHE:
+            await context_cache.start(client, GEMINI_MODEL)
+            _refresher = (asyncio.create_task(context_cache.run_refresher(client)), client)
+    except Exception as e:
+        print(f"Chat warm-up failed, chat will initialize on first use: {e}")
+        return
+    print(f"Chat subsystem ready in {time.perf_counter() - started:.2f} s")
+
+
+async def shutdown() -> None:
+    """Stop the refresher, delete cached prompts and close the client"""
+    global _refresher
+    if _refresher is not None:
+        task, client = _refresher
+        _refresher = None
+        task.cancel()
+        from app.llm.context_cache import context_cache
+        await context_cache.stop(client)
+    await close_client()
@@ -0,0 +1,83 @@
+"""
+Per-turn chat instrumentation
+
+A TurnStats collects what one chat turn spent: each model call's latency
+and token usage, each tool's run time and cache outcome, where the answer
+came from and the error class if it failed. Measurements go to the
+metrics registry as they happen; finish() adds the turn totals and prints
+one JSON log line per turn.
+"""
+import json
+import os
+import time
+from typing import Optional
+from app.services import metrics
+
+CHAT_TURN_LOG = os.getenv("CHAT_TURN_LOG", "1") == "1"
+
+
+class TurnStats:
+    def __init__(self, user_id: int, streaming: bool = False):
+        self.user_id = user_id
+        self.streaming = streaming
+        self.started = time.perf_counter()
+        self.source = "model"  # or fast_path / insight / response_cache
+        self.function_called: Optional[str] = None
+        self.error: Optional[str] = None
+        self.model_calls: list[dict] = []
+        self.tools: list[dict] = []
+
+    def record_model_call(self, seconds: float, usage, with_tools: bool, cached_prompt: bool) -> None:
+        """usage is the response's usage_metadata (None when the API sent none)"""
+        call = "tools" if with_tools else "answer"
+        self.model_calls.append({
+            "call": call,
+            "ms": round(seconds * 1000, 1),
+            "prompt_tokens": getattr(usage, "prompt_token_count", None) or 0,
+            "response_tokens": getattr(usage, "candidates_token_count", None) or 0,
+            "cached_tokens": getattr(usage, "cached_content_token_count", None) or 0,
+            "cached_prompt": cached_prompt,
+        })
+        metrics.observe("llm_call_seconds", seconds, call=call)
+
+    def record_tool(self, name: str, seconds: float, cache_hit: Optional[bool]) -> None:
+        """cache_hit is None when the tool doesn't go through the result cache"""
+        self.tools.append({"name": name, "ms": round(seconds * 1000, 1), "cache_hit": cache_hit})
+        metrics.observe("chat_tool_seconds", seconds, tool=name)
+        if cache_hit is not None:
+            metrics.inc("chat_tool_calls_total", tool=name, cache="hit" if cache_hit else "miss")
+
+    def record_error(self, error_class: str) -> None:
+        self.error = error_class
+        metrics.inc("chat_errors_total", error=error_class)
+
+    def finish(self) -> dict:
+        """Export the turn totals; returns the log record"""
+        seconds = time.perf_counter() - self.started
+        function = self.function_called or "none"
+        tokens = {
+            kind: sum(call[f"{kind}_tokens"] for call in self.model_calls)
+            for kind in ("prompt", "response", "cached")
+        }
+
+        metrics.observe("chat_turn_seconds", seconds, source=self.source)
+        metrics.inc("chat_turns_total", source=self.source, outcome="error" if self.error else "ok")
+        for kind, count in tokens.items():
+            if count:
+                metrics.inc("llm_tokens_total", count, kind=kind, function=function)
+
+        record = {
+            "event": "chat_turn",
+            "user_id": self.user_id,
+            "streaming": self.streaming,
+            "source": self.source,
+            "function_called": self.function_called,
+            "ms": round(seconds * 1000, 1),
+            "model_calls": self.model_calls,
+            "tools": self.tools,
+            **{f"{kind}_tokens": count for kind, count in tokens.items()},
+            "error": self.error,
+        }
+        if CHAT_TURN_LOG:
+            print(json.dumps(record))
+        return record
@@ -0,0 +1,41 @@
+"""
+Per-user cache for chat tool results
+
+Entries are keyed by (user_id, category, version, start_date, end_date,
+call) where version is the stored data version of the category and call
+identifies the tool and its arguments. An upload or delete by any worker
+bumps the version, so lookups move to a new key; this worker's changes
+also drop the entries for an overlapping date range right away. Repeat
+questions skip the aggregation (one indexed version read instead). Misses
+for the same key that run at the same time (two tabs asking at once)
+share one computation through tool_flights.
+"""
+import os
+from datetime import date
+from app.services.cache import LRUCache
+from app.services.data_events import on_data_changed
+from app.services.single_flight import SingleFlight
+
+# Category whose entries each weekly tool aggregates
+TOOL_CATEGORIES = {
+    "get_sleep_last_week": "sleep",
+    "get_steps_last_week": "exercise",
+    "get_calories_last_week": "diet",
+}
+
+tool_cache = LRUCache("chat_tools", max_entries=int(os.getenv("CHAT_TOOL_CACHE_SIZE", "4096")))
+tool_flights = SingleFlight("chat_tools")
+
+
+@on_data_changed
+def _invalidate_tool_results(user_id: int, category: str, start_date: date, end_date: date) -> None:
+    def is_stale(key, value) -> bool:
+        key_user, key_category, _, key_start, key_end, _ = key
+        return (
+            key_user == user_id
+            and key_category == category
+            and key_start <= end_date
+            and start_date <= key_end
+        )
+
+    tool_cache.invalidate(is_stale)
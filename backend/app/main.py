@@ -1,30 +1,42 @@
 from fastapi import FastAPI
-from sqlmodel import SQLModel
 from app.routers import sleep, diet, exercise, upload, auth
-from app.routers import chat
+from app.routers import chat, export, insights, metrics
+import asyncio
 from contextlib import asynccontextmanager
-from app.database import engine
+from app.database import ensure_schema
+from app.middleware import RateLimitMiddleware
+from app.llm.startup import CHAT_WARMUP, shutdown, warm_up
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup logic:
     print("Application startup: Initializing resources...")
-    SQLModel.metadata.create_all(engine)
+    # Constant-time version check; tables are only created when it is behind
+    ensure_schema()
+    # The chat stack loads in the background so startup doesn't wait for it
+    warmup = asyncio.create_task(warm_up()) if CHAT_WARMUP else None
     yield  # Application runs here
     # Shutdown logic:
-    # print("Application shutdown: Cleaning up resources...")
+    if warmup is not None:
+        warmup.cancel()
+    await shutdown()
 
 app = FastAPI(
     title="WellGenie API",
     lifespan=lifespan
 )
 
+app.add_middleware(RateLimitMiddleware)
+
 app.include_router(sleep.router, prefix="/api")
 app.include_router(diet.router, prefix="/api")
 app.include_router(exercise.router, prefix="/api")
 app.include_router(upload.router, prefix="/api")
 app.include_router(auth.router, prefix="/api")
 app.include_router(chat.router, prefix="/api", tags=["Chat"])
+app.include_router(insights.router, prefix="/api", tags=["Insights"])
+app.include_router(export.router, prefix="/api", tags=["Export"])
+app.include_router(metrics.router, prefix="/api", tags=["Metrics"])
 
 # --- Routes
 @app.get("/")
@@ -0,0 +1,78 @@
+"""
+ASGI middleware for WellGenie
+"""
+import json
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from app.services import rate_limit
+from app.services.sessions import get_session
+
+
+class RateLimitMiddleware:
+    """Applies the token-bucket limiter before a request reaches the routers.
+
+    Signed-in clients are limited per user, everyone else per IP. Login is
+    always limited per IP since the caller has no session yet. The IP is
+    taken from X-Forwarded-For only when the peer is a trusted proxy.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not rate_limit.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        group = rate_limit.route_group(scope["method"], scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = rate_limit.limiter
+        identity = self._identity(Request(scope), group)
+        if limiter.store.blocking:
+            decision = await run_in_threadpool(limiter.hit, group, identity)
+        else:
+            decision = limiter.hit(group, identity)
+        if decision is None:
+            await self.app(scope, receive, send)
+            return
+
+        rule = limiter.rules[group]
+        limit_headers = [
+            (b"x-ratelimit-limit", str(rule.capacity).encode()),
+            (b"x-ratelimit-remaining", str(decision.remaining).encode()),
+        ]
+
+        if not decision.allowed:
+            body = json.dumps({"detail": "Too many requests. Please slow down."}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(decision.retry_after).encode()),
+                    *limit_headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + limit_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    def _identity(request: Request, group: str) -> str:
+        if group != "auth":
+            token = request.cookies.get("session")
+            session = get_session(token) if token else None
+            if session:
+                return f"user:{session['user_id']}"
+        peer = request.client.host if request.client else None
+        return f"ip:{rate_limit.client_address(peer, request.headers.get('x-forwarded-for'))}"
@@ -1,7 +1,13 @@
+from sqlalchemy import JSON, Column, Index, UniqueConstraint
 from sqlmodel import Field, SQLModel, create_engine
-from datetime import date
+from datetime import date, datetime, timezone
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
 
 class SleepEntry(SQLModel, table=True):
+    __table_args__ = (Index("ix_sleepentry_user_id_date", "user_id", "date"),)
+
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id", index=True)  # add this
     date: date
@@ -9,6 +15,8 @@ class SleepEntry(SQLModel, table=True):
     quality: str
 
 class ExerciseEntry(SQLModel, table=True):
+    __table_args__ = (Index("ix_exerciseentry_user_id_date", "user_id", "date"),)
+
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id", index=True)  # add this
     date: date
@@ -17,6 +25,8 @@ class ExerciseEntry(SQLModel, table=True):
     calories_burned: float
 
 class DietEntry(SQLModel, table=True):
+    __table_args__ = (Index("ix_dietentry_user_id_date", "user_id", "date"),)
+
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id", index=True)  # add this
     date: date
@@ -29,4 +39,45 @@ class User(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
     username: str
     hashed_password: str
-    email: str | None = None
\ No newline at end of file
+    email: str | None = None
+
+class Conversation(SQLModel, table=True):
+    id: int | None = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
+    # Compacted text of older turns, covering messages up to summarized_through
+    summary: str = ""
+    summarized_through: int = 0
+
+class ChatMessage(SQLModel, table=True):
+    __table_args__ = (Index("ix_chatmessage_conversation_id_id", "conversation_id", "id"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    conversation_id: int = Field(foreign_key="conversation.id")
+    role: str  # "user" or "model"
+    content: str
+    function_called: str | None = None
+    created_at: datetime = Field(default_factory=utcnow)
+
+class WeeklyInsight(SQLModel, table=True):
+    """Precomputed weekly summary for one user, written by the nightly batch"""
+    __table_args__ = (UniqueConstraint("user_id", "week_start"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    week_start: date
+    week_end: date
+    # weekly tool name -> its result
+    results: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    narrative: str | None = None
+    computed_at: datetime = Field(default_factory=utcnow)
+
+class DataVersion(SQLModel, table=True):
+    """Change counter for one user's data in one category, used for ETags"""
+    __table_args__ = (UniqueConstraint("user_id", "category"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    category: str  # sleep / diet / exercise / insights
+    version: int = 0
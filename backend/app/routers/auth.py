@@ -4,7 +4,7 @@ from typing import Annotated, Optional
 import base64
 from app.database import get_session as get_db_session
 from app.models import User
-from app.services.auth import verify_password
+from app.services.auth import verify_and_update_password_async, HashingOverloadedError, HASH_RETRY_AFTER
 from app.services.sessions import create_session, get_session as get_user_session, delete_session
 from datetime import datetime
 
@@ -58,7 +58,18 @@ async def login(
     statement = select(User).where(User.username == username)
     user = db.exec(statement).first()
 
-    if not user or not verify_password(password, user.hashed_password):
+    password_ok, new_hash = False, None
+    try:
+        if user:
+            password_ok, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    except HashingOverloadedError:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts in progress. Please try again shortly.",
+            headers={"Retry-After": str(HASH_RETRY_AFTER)}
+        )
+
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
@@ -66,6 +77,12 @@ async def login(
     
     assert user.id is not None, "User ID should exist after database fetch"
     
+    # Stored hash predates the current Argon2 parameters; upgrade it transparently
+    if new_hash:
+        user.hashed_password = new_hash
+        db.add(user)
+        db.commit()
+    
     token = create_session(user.id)
     
     response.set_cookie(
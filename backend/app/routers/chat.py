@@ -1,30 +1,65 @@
 """
-Chat Router - Single endpoint
+Chat Router - chat, streaming chat and suggestions
 """
-from fastapi import APIRouter, Depends
+import json
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlmodel import Session
 from app.database import get_session
 from app.routers.auth import get_current_user, User
-from app.llm.chat_service import ChatService
+from app.llm.client import get_client
+from app.llm.context import pack_history
+from app.models import Conversation
+from app.services.conversations import (
+    add_turn,
+    create_conversation,
+    get_conversation,
+    latest_conversation,
+    list_messages,
+)
 
 router = APIRouter()
 
 
 class ChatRequest(BaseModel):
     message: str
+    conversation_id: int | None = None  # omit to start a new conversation
 
 
 class ChatResponse(BaseModel):
     message: str
     function_called: str | None = None
+    conversation_id: int
+
+
+def _chat_service(session: Session, client: Any, user_id: int):
+    # Imported here so the Gemini SDK loads on first use, not at app startup
+    from app.llm.chat_service import ChatService
+    return ChatService(session, client, user_id)
+
+
+def release_connection(session: Session) -> None:
+    """End the session's transaction so its pooled connection isn't held while we wait on the model"""
+    session.commit()
+
+
+def _conversation(session: Session, user_id: int, conversation_id: int | None) -> Conversation:
+    if conversation_id is None:
+        return create_conversation(session, user_id)
+    conversation = get_conversation(session, user_id, conversation_id)
+    if conversation is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return conversation
 
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    client: Any = Depends(get_client)
 ):
     """
     Chat endpoint - ask anything about your health data
@@ -34,15 +69,108 @@ async def chat(
     - "What was my average step count last week?"
     - "How many calories did I eat last week?"
     """
-    chat_service = ChatService(session)
-    result = chat_service.chat(request.message)
-    
+    assert current_user.id is not None
+    conversation = _conversation(session, current_user.id, request.conversation_id)
+    chat_service = _chat_service(session, client, current_user.id)
+    history = pack_history(session, conversation)
+    release_connection(session)
+    result = await chat_service.chat(request.message, history)
+    add_turn(session, conversation, request.message, result["message"], result.get("function_called"))
+
+    assert conversation.id is not None
     return ChatResponse(
         message=result["message"],
-        function_called=result.get("function_called")
+        function_called=result.get("function_called"),
+        conversation_id=conversation.id
+    )
+
+
+def format_sse(event: dict) -> str:
+    """Encode one chat event as a Server-Sent Events frame"""
+    payload = {k: v for k, v in event.items() if k != "type"}
+    return f"event: {event['type']}\ndata: {json.dumps(payload)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    client: Any = Depends(get_client)
+):
+    """
+    Streaming chat endpoint - answers arrive as Server-Sent Events
+
+    Event types: token (text chunk), function (tool being run),
+    done (end of answer, with the conversation_id) and error (friendly
+    error message).
+    """
+    assert current_user.id is not None
+    conversation = _conversation(session, current_user.id, request.conversation_id)
+    chat_service = _chat_service(session, client, current_user.id)
+    history = pack_history(session, conversation)
+    release_connection(session)
+
+    async def event_stream():
+        answer = []
+        async for event in chat_service.chat_stream(request.message, history):
+            if event["type"] == "token":
+                answer.append(event["text"])
+            elif event["type"] == "error":
+                answer.append(event["message"])
+            if event["type"] in ("done", "error"):
+                add_turn(session, conversation, request.message, "".join(answer), event.get("function_called"))
+            if event["type"] == "done":
+                event = {**event, "conversation_id": conversation.id}
+            yield format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
+@router.get("/chat/history")
+async def get_history(
+    conversation_id: int | None = None,
+    before: int | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Page through a conversation, newest messages first
+
+    Defaults to the most recently active conversation. Pass next_before
+    from a response as before to get the previous page.
+    """
+    assert current_user.id is not None
+    if conversation_id is None:
+        conversation = latest_conversation(session, current_user.id)
+        if conversation is None:
+            return {"conversation_id": None, "messages": [], "next_before": None}
+    else:
+        conversation = _conversation(session, current_user.id, conversation_id)
+
+    assert conversation.id is not None
+    messages, next_before = list_messages(session, conversation.id, before, limit)
+    return {
+        "conversation_id": conversation.id,
+        "messages": [
+            {
+                "id": message.id,
+                "role": message.role,
+                "content": message.content,
+                "function_called": message.function_called,
+                "created_at": message.created_at,
+            }
+            for message in messages
+        ],
+        "next_before": next_before,
+    }
+
+
 @router.get("/chat/suggestions")
 async def get_suggestions(current_user: User = Depends(get_current_user)):
     """Get suggested questions"""
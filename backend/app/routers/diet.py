@@ -1,22 +1,52 @@
 from datetime import date
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session, select
 from app.database import get_session
 from app.models import DietEntry
 from app.routers.auth import get_current_user, User
+from app.services.data_versions import cache_headers, current_version, not_modified, resource_etag
+from app.services.projection import Layout, ProjectionError, select_columns, value_column
+from app.services.query_cache import read_entries
 from app.services.delete import delete_diet_records
 
 router = APIRouter()
 
 @router.get("/diet")
 async def get_diet_entries(
+    request: Request,
     current_user: User = Depends(get_current_user),
     start_date: date | None = None,
     end_date: date | None = None,
     min_calories: float | None = None,
     max_calories:  float | None = None,
+    fields: str | None = None,
+    layout: Layout = "rows",
+    max_points: int | None = Query(None, ge=3),
     session: Session= Depends(get_session)):
-    query = select(DietEntry)
+    assert current_user.id is not None
+    try:
+        columns = select_columns(DietEntry, fields)
+    except ProjectionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if max_points is not None and value_column(columns) is None:
+        raise HTTPException(status_code=422, detail="max_points needs a numeric field to plot")
+
+    version = current_version(session, current_user.id, "diet")
+    etag = resource_etag(request, current_user.id, "diet", version)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+
+    filters = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "min_calories": min_calories,
+        "max_calories": max_calories,
+        "fields": fields,
+        "layout": layout,
+        "max_points": max_points,
+    }
+
+    query = select(*columns).where(DietEntry.user_id == current_user.id)
     
     if start_date:
         query = query.where(DietEntry.date >= start_date)
@@ -27,9 +57,13 @@ async def get_diet_entries(
     if max_calories:
         query = query.where(DietEntry.calories <= max_calories)
 
-    entries = session.exec(query).all()
-    
-    return {"items": entries}
+    if max_points is not None:
+        query = query.order_by(DietEntry.date, DietEntry.id)
+
+    # Already-encoded JSON, so FastAPI's per-row encoding and validation are skipped
+    body = await read_entries(session.get_bind(), current_user.id, "diet", version, filters, query,
+                              layout, max_points)
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag))
 
 
 @router.delete("/diet")
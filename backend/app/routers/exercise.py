@@ -1,15 +1,19 @@
 from datetime import date
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session, select
 from app.database import get_session
 from app.models import ExerciseEntry
 from app.routers.auth import get_current_user, User
+from app.services.data_versions import cache_headers, current_version, not_modified, resource_etag
+from app.services.projection import Layout, ProjectionError, select_columns, value_column
+from app.services.query_cache import read_entries
 from app.services.delete import delete_exercise_records
 
 router = APIRouter()
 
 @router.get("/exercise")
 async def get_exercise_entries(
+    request: Request,
     current_user: User = Depends(get_current_user),
     start_date: date | None = None,
     end_date: date | None = None,
@@ -17,8 +21,36 @@ async def get_exercise_entries(
     max_steps: int | None = None,
     duration_min: float | None = None,
     min_calories_burned: float | None = None,
+    fields: str | None = None,
+    layout: Layout = "rows",
+    max_points: int | None = Query(None, ge=3),
     session: Session= Depends(get_session)):
-    query = select(ExerciseEntry)
+    assert current_user.id is not None
+    try:
+        columns = select_columns(ExerciseEntry, fields)
+    except ProjectionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if max_points is not None and value_column(columns) is None:
+        raise HTTPException(status_code=422, detail="max_points needs a numeric field to plot")
+
+    version = current_version(session, current_user.id, "exercise")
+    etag = resource_etag(request, current_user.id, "exercise", version)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+
+    filters = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "min_steps": min_steps,
+        "max_steps": max_steps,
+        "duration_min": duration_min,
+        "min_calories_burned": min_calories_burned,
+        "fields": fields,
+        "layout": layout,
+        "max_points": max_points,
+    }
+
+    query = select(*columns).where(ExerciseEntry.user_id == current_user.id)
     
     if start_date:
         query = query.where(ExerciseEntry.date >= start_date)
@@ -32,9 +64,13 @@ async def get_exercise_entries(
         query = query.where(ExerciseEntry.duration_min >= duration_min)
     if min_calories_burned:
         query = query.where(ExerciseEntry.calories_burned >= min_calories_burned)
-    entries = session.exec(query).all()
-    
-    return {"items": entries}
+    if max_points is not None:
+        query = query.order_by(ExerciseEntry.date, ExerciseEntry.id)
+
+    # Already-encoded JSON, so FastAPI's per-row encoding and validation are skipped
+    body = await read_entries(session.get_bind(), current_user.id, "exercise", version, filters, query,
+                              layout, max_points)
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag))
 
 
 @router.delete("/exercise")
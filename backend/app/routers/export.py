@@ -0,0 +1,49 @@
+"""
+Export Router - full history downloads
+"""
+from datetime import date
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from app.database import get_session
+from app.routers.auth import get_current_user, User
+from app.services.export import EXPORT_MODELS, MEDIA_TYPES, export_entries
+
+router = APIRouter()
+
+
+@router.get("/{category}/export")
+async def export_category(
+    category: str,
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """
+    Download every sleep, diet or exercise entry as CSV or NDJSON
+
+    The file is streamed as it is read; gzip=true sends it gzip-compressed
+    (a .gz download).
+    """
+    if category not in EXPORT_MODELS:
+        raise HTTPException(status_code=404, detail=f"Unknown category: {category}")
+    assert current_user.id is not None
+
+    filename = f"wellgenie-{category}-{date.today().isoformat()}.{format}"
+    media_type = MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    # The rows are read on Starlette's thread pool with the generator's own session
+    rows = export_entries(session.get_bind(), category, current_user.id, format,
+                          start_date=start_date, end_date=end_date, compress=gzip)
+    return StreamingResponse(
+        rows,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,44 @@
+"""
+Insights Router - precomputed weekly summaries
+"""
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import Session
+from app.database import get_session
+from app.routers.auth import get_current_user, User
+from app.services.data_versions import cache_headers, current_version, not_modified, resource_etag
+from app.services.insights import get_insight
+
+router = APIRouter()
+
+
+@router.get("/insights/weekly")
+async def get_weekly_insight(
+    request: Request,
+    response: Response,
+    week_start: date | None = None,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Weekly summary computed by the nightly batch
+
+    Returns the week starting week_start (a Monday), or the latest one.
+    """
+    assert current_user.id is not None
+    version = current_version(session, current_user.id, "insights")
+    etag = resource_etag(request, current_user.id, "insights", version)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+
+    insight = get_insight(session, current_user.id, week_start)
+    if insight is None:
+        raise HTTPException(status_code=404, detail="No weekly insight available yet")
+    response.headers.update(cache_headers(etag))
+    return {
+        "week_start": insight.week_start,
+        "week_end": insight.week_end,
+        "results": insight.results,
+        "narrative": insight.narrative,
+        "computed_at": insight.computed_at,
+    }
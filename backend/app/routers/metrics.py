@@ -0,0 +1,14 @@
+"""
+Metrics Router - exposes the in-process metrics registry
+"""
+from fastapi import APIRouter, Depends
+from app.routers.auth import get_current_user, User
+from app.services import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics(current_user: User = Depends(get_current_user)):
+    """Snapshot of counters, gauges and histograms for this worker (signed-in users only)"""
+    return metrics.snapshot()
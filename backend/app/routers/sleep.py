@@ -1,23 +1,54 @@
 from datetime import date
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session, select
 from app.database import get_session
 from app.models import SleepEntry
 from app.routers.auth import get_current_user, User
+from app.services.data_versions import cache_headers, current_version, not_modified, resource_etag
+from app.services.projection import Layout, ProjectionError, select_columns, value_column
+from app.services.query_cache import read_entries
 from app.services.delete import delete_sleep_records
 
 router = APIRouter()
 
 @router.get("/sleep")
 async def get_sleep_entries(
+    request: Request,
     current_user: User = Depends(get_current_user),
     start_date: date | None = None,
     end_date: date | None = None,
     min_hours: float | None = None,
     max_hours: float | None = None,
     quality: str | None = None,
+    fields: str | None = None,
+    layout: Layout = "rows",
+    max_points: int | None = Query(None, ge=3),
     session: Session= Depends(get_session)):
-    query = select(SleepEntry)
+    assert current_user.id is not None
+    try:
+        columns = select_columns(SleepEntry, fields)
+    except ProjectionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if max_points is not None and value_column(columns) is None:
+        raise HTTPException(status_code=422, detail="max_points needs a numeric field to plot")
+
+    version = current_version(session, current_user.id, "sleep")
+    etag = resource_etag(request, current_user.id, "sleep", version)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+
+    filters = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "min_hours": min_hours,
+        "max_hours": max_hours,
+        "quality": quality,
+        "fields": fields,
+        "layout": layout,
+        "max_points": max_points,
+    }
+
+    query = select(*columns).where(SleepEntry.user_id == current_user.id)
     
     if start_date:
         query = query.where(SleepEntry.date >= start_date)
@@ -29,9 +60,13 @@ async def get_sleep_entries(
         query = query.where(SleepEntry.hours <= max_hours) 
     if quality:
         query = query.where(SleepEntry.quality == quality)
-    entries = session.exec(query).all()
-    
-    return {"items": entries}
+    if max_points is not None:
+        query = query.order_by(SleepEntry.date, SleepEntry.id)
+
+    # Already-encoded JSON, so FastAPI's per-row encoding and validation are skipped
+    body = await read_entries(session.get_bind(), current_user.id, "sleep", version, filters, query,
+                              layout, max_points)
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag))
 
 
 @router.delete("/sleep")
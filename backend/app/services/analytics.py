@@ -0,0 +1,166 @@
+"""
+Generic aggregation engine for health metrics.
+
+A MetricQuery (metric, aggregation, date range, bucket) compiles into a
+single SELECT ... GROUP BY over the metric's table, filtered on the
+(user_id, date) index, so the database does the aggregation and the
+result size is capped.
+"""
+from dataclasses import dataclass
+from datetime import date
+from sqlalchemy import func
+from sqlmodel import Session, select
+from app.models import DietEntry, ExerciseEntry, SleepEntry
+
+# metric name -> (model, column, category)
+METRICS = {
+    "sleep_hours": (SleepEntry, "hours", "sleep"),
+    "steps": (ExerciseEntry, "steps", "exercise"),
+    "exercise_minutes": (ExerciseEntry, "duration_min", "exercise"),
+    "calories_burned": (ExerciseEntry, "calories_burned", "exercise"),
+    "calories": (DietEntry, "calories", "diet"),
+    "protein_g": (DietEntry, "protein_g", "diet"),
+    "carbs_g": (DietEntry, "carbs_g", "diet"),
+    "fat_g": (DietEntry, "fat_g", "diet"),
+}
+
+AGGREGATIONS = {
+    "avg": func.avg,
+    "sum": func.sum,
+    "min": func.min,
+    "max": func.max,
+    "count": func.count,
+}
+
+BUCKETS = ("none", "day", "week", "month")
+
+# weekly chat tool -> (model, column, aggregation, result key, decimals)
+WEEKLY_TOOLS = {
+    "get_sleep_last_week": (SleepEntry, "hours", func.sum, "total_hours", 1),
+    "get_steps_last_week": (ExerciseEntry, "steps", func.avg, "average_steps", 0),
+    "get_calories_last_week": (DietEntry, "calories", func.sum, "total_calories", 0),
+}
+
+# Most buckets a single query may return
+MAX_BUCKETS = 400
+
+
+class AnalyticsError(ValueError):
+    """Raised for a query the engine cannot run"""
+
+
+@dataclass(frozen=True)
+class MetricQuery:
+    metric: str
+    aggregation: str
+    start_date: date
+    end_date: date
+    bucket: str = "none"
+
+    @property
+    def category(self) -> str:
+        return METRICS[self.metric][2]
+
+    @classmethod
+    def from_args(cls, args: dict) -> "MetricQuery":
+        """Validate loosely typed arguments (e.g. from a model function call)"""
+        metric = args.get("metric")
+        aggregation = args.get("aggregation", "avg")
+        bucket = args.get("bucket") or "none"
+        if metric not in METRICS:
+            raise AnalyticsError(f"Unknown metric '{metric}'. Choose one of: {', '.join(METRICS)}")
+        if aggregation not in AGGREGATIONS:
+            raise AnalyticsError(f"Unknown aggregation '{aggregation}'. Choose one of: {', '.join(AGGREGATIONS)}")
+        if bucket not in BUCKETS:
+            raise AnalyticsError(f"Unknown bucket '{bucket}'. Choose one of: {', '.join(BUCKETS)}")
+        try:
+            start_date = date.fromisoformat(str(args.get("start_date")))
+            end_date = date.fromisoformat(str(args.get("end_date")))
+        except ValueError:
+            raise AnalyticsError("start_date and end_date must be dates in YYYY-MM-DD format")
+        if start_date > end_date:
+            raise AnalyticsError("start_date must be on or before end_date")
+        return cls(metric, aggregation, start_date, end_date, bucket)
+
+
+def _bucket_expression(model, bucket: str):
+    if bucket == "day":
+        return func.strftime("%Y-%m-%d", model.date)
+    if bucket == "week":
+        # Monday of the entry's week
+        return func.date(model.date, "-6 days", "weekday 1")
+    return func.strftime("%Y-%m", model.date)
+
+
+def build_query(user_id: int, query: MetricQuery):
+    """Compile a MetricQuery into one aggregate SELECT"""
+    model, column_name, _ = METRICS[query.metric]
+    value = AGGREGATIONS[query.aggregation](getattr(model, column_name))
+    days = func.count(func.distinct(model.date))
+    filters = (
+        model.user_id == user_id,
+        model.date >= query.start_date,
+        model.date <= query.end_date,
+    )
+
+    if query.bucket == "none":
+        return select(value, days).where(*filters)
+
+    period = _bucket_expression(model, query.bucket).label("period")
+    return (
+        select(period, value, days)
+        .where(*filters)
+        .group_by(period)
+        .order_by(period)
+        .limit(MAX_BUCKETS + 1)
+    )
+
+
+def _round(value):
+    return round(value, 2) if isinstance(value, float) else value
+
+
+def run_metric_query(session: Session, user_id: int, query: MetricQuery) -> dict:
+    """Run a MetricQuery for one user and return a JSON-friendly result"""
+    result = {
+        "metric": query.metric,
+        "aggregation": query.aggregation,
+        "start_date": query.start_date.isoformat(),
+        "end_date": query.end_date.isoformat(),
+    }
+    rows = session.exec(build_query(user_id, query)).all()  # type: ignore[call-overload]
+
+    if query.bucket == "none":
+        value, days = rows[0] if rows else (None, 0)
+        result["value"] = _round(value)
+        result["days_recorded"] = days
+        return result
+
+    result["bucket"] = query.bucket
+    result["buckets"] = [
+        {"period": period, "value": _round(value), "days_recorded": days}
+        for period, value, days in rows[:MAX_BUCKETS]
+    ]
+    result["truncated"] = len(rows) > MAX_BUCKETS
+    return result
+
+
+def run_weekly_tool(session: Session, user_id: int, function_name: str,
+                    start_date: date, end_date: date) -> dict:
+    """Aggregate one user's entries for a weekly chat tool (chat and the insights batch)"""
+    if function_name not in WEEKLY_TOOLS:
+        return {"error": f"Unknown function: {function_name}"}
+
+    model, column_name, aggregation, key, decimals = WEEKLY_TOOLS[function_name]
+    query = select(aggregation(getattr(model, column_name)), func.count(model.id)).where(
+        model.user_id == user_id,
+        model.date >= start_date,
+        model.date <= end_date
+    )
+    row = session.exec(query).first() or (0.0, 0)  # type: ignore[call-overload]
+
+    return {
+        key: round(row[0] or 0.0, decimals),
+        "days_recorded": row[1] or 0,
+        "week": f"{start_date} to {end_date}"
+    }
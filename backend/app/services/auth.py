@@ -1,9 +1,114 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from passlib.context import CryptContext
+from app.services import metrics
+
+# Argon2 cost parameters. Tune them for the deployment hardware with
+# `python -m scripts.argon2_benchmark`; existing hashes are upgraded on the
+# next successful login.
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__rounds=ARGON2_TIME_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
+
+# Argon2 is CPU and memory heavy, so hashing runs in a small dedicated pool
+# instead of on the event loop. argon2-cffi releases the GIL while hashing,
+# which lets threads run in parallel.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hashes allowed to be running or queued at once; beyond that we shed load
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "32"))
+HASH_RETRY_AFTER = 1  # seconds
+
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="argon2")
+_hash_slots = threading.BoundedSemaphore(HASH_MAX_PENDING)
+_state_lock = threading.Lock()
+_admitted = 0
+_running = 0
+
+
+class HashingOverloadedError(Exception):
+    """Raised when too many password hashes are already queued"""
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify a password and return a fresh hash when the stored one uses stale parameters"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _update_gauges() -> None:
+    metrics.set_gauge("auth_hash_in_flight", _running)
+    metrics.set_gauge("auth_hash_queue_depth", _admitted - _running)
+
+
+def _release_slot(running: bool) -> None:
+    global _admitted, _running
+    with _state_lock:
+        if running:
+            _running -= 1
+        _admitted -= 1
+        _update_gauges()
+    _hash_slots.release()
+
+
+def _run_in_worker(fn, args: tuple, queued_at: float):
+    """Runs on a pool thread; releases the admission slot when done"""
+    global _running
+    metrics.observe("auth_hash_wait_seconds", time.perf_counter() - queued_at)
+    with _state_lock:
+        _running += 1
+        _update_gauges()
+    try:
+        return fn(*args)
+    finally:
+        _release_slot(running=True)
+
+
+def _release_if_cancelled(future: Future) -> None:
+    # A job cancelled while still queued never runs, so its slot is given back here
+    if future.cancelled():
+        _release_slot(running=False)
+
+
+async def _run_hash(fn, *args):
+    global _admitted
+    if not _hash_slots.acquire(blocking=False):
+        metrics.inc("auth_hash_rejected_total")
+        raise HashingOverloadedError("Too many password hashes in progress")
+    with _state_lock:
+        _admitted += 1
+        _update_gauges()
+    future = _hash_executor.submit(_run_in_worker, fn, args, time.perf_counter())
+    future.add_done_callback(_release_if_cancelled)
+    # Cancelling the await (client gone, timeout) cancels the job if it hasn't started
+    return await asyncio.wrap_future(future)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool. Raises HashingOverloadedError under overload."""
+    return await _run_hash(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """verify_and_update_password on the hashing pool. Raises HashingOverloadedError under overload."""
+    return await _run_hash(verify_and_update_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool. Raises HashingOverloadedError under overload."""
+    return await _run_hash(get_password_hash, password)
@@ -0,0 +1,100 @@
+"""
+Bounded in-process caches
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from app.services import metrics
+
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional TTL and memory budget.
+
+    When max_bytes is set, entries are sized with sizeof (an estimate is
+    fine) and the least recently used ones are evicted to stay within it.
+    Hits, misses, evictions and size are reported to the metrics registry
+    under the cache's name.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1024, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None, sizeof: Callable[[Any], int] = sys.getsizeof,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, Optional[float], int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at is None or expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    metrics.inc("cache_hits_total", cache=self.name)
+                    self._report_ratio()
+                    return value
+                self._remove(key)
+                self._report_size()
+            self.misses += 1
+            metrics.inc("cache_misses_total", cache=self.name)
+            self._report_ratio()
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # would evict everything else and still not fit
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                metrics.inc("cache_evictions_total", cache=self.name)
+            self._report_size()
+
+    def invalidate(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop every entry for which predicate(key, value) holds; returns how many were dropped"""
+        with self._lock:
+            stale = [key for key, (value, _, _) in self._entries.items() if predicate(key, value)]
+            for key in stale:
+                self._remove(key)
+            self._report_size()
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self._report_size()
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def _report_size(self) -> None:
+        metrics.set_gauge("cache_entries", len(self._entries), cache=self.name)
+        metrics.set_gauge("cache_bytes", self.bytes, cache=self.name)
+
+    def _report_ratio(self) -> None:
+        metrics.set_gauge("cache_hit_ratio", round(self.hits / (self.hits + self.misses), 4), cache=self.name)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,85 @@
+"""
+Per-user chat conversation store
+"""
+from typing import Optional
+from sqlmodel import Session, select
+from app.models import ChatMessage, Conversation, utcnow
+
+
+def get_conversation(session: Session, user_id: int, conversation_id: int) -> Optional[Conversation]:
+    """Get a conversation if it exists and belongs to user_id"""
+    conversation = session.get(Conversation, conversation_id)
+    if conversation is None or conversation.user_id != user_id:
+        return None
+    return conversation
+
+
+def latest_conversation(session: Session, user_id: int) -> Optional[Conversation]:
+    query = (
+        select(Conversation)
+        .where(Conversation.user_id == user_id)
+        .order_by(Conversation.updated_at.desc(), Conversation.id.desc())  # type: ignore[union-attr]
+        .limit(1)
+    )
+    return session.exec(query).first()
+
+
+def create_conversation(session: Session, user_id: int) -> Conversation:
+    conversation = Conversation(user_id=user_id)
+    session.add(conversation)
+    session.commit()
+    session.refresh(conversation)
+    return conversation
+
+
+def add_turn(session: Session, conversation: Conversation, user_message: str,
+             answer: str, function_called: Optional[str] = None) -> None:
+    """Append a question and its answer to the conversation"""
+    assert conversation.id is not None
+    session.add(ChatMessage(conversation_id=conversation.id, role="user", content=user_message))
+    session.add(ChatMessage(
+        conversation_id=conversation.id, role="model", content=answer, function_called=function_called
+    ))
+    conversation.updated_at = utcnow()
+    session.add(conversation)
+    session.commit()
+
+
+def unsummarized_messages(session: Session, conversation: Conversation) -> list[ChatMessage]:
+    """Messages not yet folded into the conversation summary, oldest first"""
+    query = (
+        select(ChatMessage)
+        .where(ChatMessage.conversation_id == conversation.id)
+        .where(ChatMessage.id > conversation.summarized_through)  # type: ignore[operator]
+        .order_by(ChatMessage.id)  # type: ignore[arg-type]
+    )
+    return list(session.exec(query).all())
+
+
+def save_summary(session: Session, conversation: Conversation, summary: str, through_id: int) -> None:
+    conversation.summary = summary
+    conversation.summarized_through = through_id
+    session.add(conversation)
+    session.commit()
+
+
+def list_messages(session: Session, conversation_id: int, before: Optional[int] = None,
+                  limit: int = 20) -> tuple[list[ChatMessage], Optional[int]]:
+    """
+    One page of messages, newest page first, each page in chronological order
+
+    Returns the messages and the cursor for the next (older) page, or None
+    when there are no older messages.
+    """
+    query = select(ChatMessage).where(ChatMessage.conversation_id == conversation_id)
+    if before is not None:
+        query = query.where(ChatMessage.id < before)  # type: ignore[operator]
+    query = query.order_by(ChatMessage.id.desc()).limit(limit + 1)  # type: ignore[union-attr]
+    messages = list(session.exec(query).all())
+
+    next_before = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        next_before = messages[-1].id
+    messages.reverse()
+    return messages, next_before
@@ -0,0 +1,28 @@
+"""
+Notifications about changes to a user's health data.
+
+Services that write entries (upload, delete) call notify_data_changed after
+committing; caches register listeners to drop what the change made stale.
+Listeners only hear about this worker's changes, so they free cache space
+early but can't tell an entry is current: for that, key or validate it on
+the stored data version (app/services/data_versions.py), which every
+worker's change bumps.
+"""
+from datetime import date
+from typing import Callable
+
+DataChangeListener = Callable[[int, str, date, date], None]
+
+_listeners: list[DataChangeListener] = []
+
+
+def on_data_changed(listener: DataChangeListener) -> DataChangeListener:
+    """Register a listener (usable as a decorator)"""
+    _listeners.append(listener)
+    return listener
+
+
+def notify_data_changed(user_id: int, category: str, start_date: date, end_date: date) -> None:
+    """Tell listeners that user_id's category entries between the dates changed"""
+    for listener in _listeners:
+        listener(user_id, category, start_date, end_date)
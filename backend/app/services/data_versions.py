@@ -0,0 +1,60 @@
+"""
+Stored per-(user, category) data versions for conditional GETs
+
+Uploads, deletes and insight writes bump the version in the same
+transaction as the change (the caller commits), so every worker agrees on
+it and it survives restarts. Read endpoints turn it into a strong ETag and
+answer a matching If-None-Match with 304 before running their query.
+
+Clients, which outlive a worker, and the server-side caches both rely on
+them, since a change made by any worker moves the version.
+"""
+import hashlib
+from fastapi import Request
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, select
+from app.models import DataVersion
+
+# Clients revalidate on every use, so a change shows up on the next poll
+CACHE_CONTROL = "private, no-cache"
+
+
+def current_version(session: Session, user_id: int, category: str) -> int:
+    query = select(DataVersion.version).where(
+        DataVersion.user_id == user_id, DataVersion.category == category
+    )
+    return session.exec(query).first() or 0
+
+
+def bump_version(session: Session, user_id: int, category: str) -> None:
+    """Increment the version atomically (caller commits)"""
+    statement = insert(DataVersion).values(user_id=user_id, category=category, version=1)
+    session.exec(statement.on_conflict_do_update(  # type: ignore[call-overload]
+        index_elements=["user_id", "category"],
+        set_={"version": DataVersion.version + 1},
+    ))
+
+
+def resource_etag(request: Request, user_id: int, category: str, version: int) -> str:
+    """Strong ETag for this user's category data as selected by the request's query string
+
+    Read the version before the data itself: a change landing in between
+    then costs the client one extra full response, never a stale 304.
+    """
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    variant = hashlib.sha1(f"{request.url.path}?{query}".encode()).hexdigest()[:12]
+    return f'"{category}-{user_id}-{version}-{variant}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether If-None-Match names etag (weak validators compare equal, as RFC 9110 specifies)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
@@ -1,6 +1,9 @@
 from datetime import date
 from sqlmodel import Session, select
 from app.models import DietEntry, ExerciseEntry, SleepEntry
+from app.services.data_events import notify_data_changed
+from app.services.data_versions import bump_version
+from app.services.insights import discard_insights
 
 
 def delete_diet_records(
@@ -16,7 +19,12 @@ def delete_diet_records(
     results = session.exec(query).all()
     for row in results:
         session.delete(row)
+    if results:
+        discard_insights(session, user_id, start_date, end_date)
+        bump_version(session, user_id, "diet")
     session.commit()
+    if results:
+        notify_data_changed(user_id, "diet", start_date, end_date)
     return len(results)
 
 
@@ -33,7 +41,12 @@ def delete_exercise_records(
     results = session.exec(query).all()
     for row in results:
         session.delete(row)
+    if results:
+        discard_insights(session, user_id, start_date, end_date)
+        bump_version(session, user_id, "exercise")
     session.commit()
+    if results:
+        notify_data_changed(user_id, "exercise", start_date, end_date)
     return len(results)
 
 
@@ -50,5 +63,10 @@ def delete_sleep_records(
     results = session.exec(query).all()
     for row in results:
         session.delete(row)
+    if results:
+        discard_insights(session, user_id, start_date, end_date)
+        bump_version(session, user_id, "sleep")
     session.commit()
+    if results:
+        notify_data_changed(user_id, "sleep", start_date, end_date)
     return len(results)
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Streaming export of a user's entries as CSV or NDJSON
+
+Rows are read in batches of EXPORT_BATCH_SIZE through a yield_per cursor
+and each batch is encoded and handed on as soon as it is read, so memory
+stays flat however long the history is and the first bytes go out
+immediately. With compression on, every batch is flushed through one
+gzip stream, which keeps both properties.
+"""
+import csv
+import io
+import os
+import zlib
+from collections.abc import Iterator
+from datetime import date
+from typing import Optional
+import orjson
+from sqlmodel import Session, select
+from app.models import DietEntry, ExerciseEntry, SleepEntry
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_MODELS = {"sleep": SleepEntry, "diet": DietEntry, "exercise": ExerciseEntry}
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def export_columns(category: str) -> list:
+    """Exported columns: everything but the owner"""
+    table = EXPORT_MODELS[category].__table__  # type: ignore[attr-defined]
+    return [column for column in table.columns if column.name != "user_id"]
+
+
+def _encode_csv(names: list[str], batch, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(names)
+    writer.writerows(batch)
+    return buffer.getvalue().encode()
+
+
+def _encode_ndjson(names: list[str], batch) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(names, row))) + b"\n" for row in batch)
+
+
+def export_entries(bind, category: str, user_id: int, fmt: str, start_date: Optional[date] = None,
+                   end_date: Optional[date] = None, compress: bool = False,
+                   batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Yield the encoded export one batch at a time (meant for a StreamingResponse)"""
+    model = EXPORT_MODELS[category]
+    columns = export_columns(category)
+    names = [column.name for column in columns]
+    query = select(*columns).where(model.user_id == user_id)
+    if start_date:
+        query = query.where(model.date >= start_date)
+    if end_date:
+        query = query.where(model.date <= end_date)
+    query = query.order_by(model.date, model.id)
+
+    gzip = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+
+    def emit(chunk: bytes) -> bytes:
+        # Z_SYNC_FLUSH pushes out everything so far without ending the stream
+        return gzip.compress(chunk) + gzip.flush(zlib.Z_SYNC_FLUSH) if gzip else chunk
+
+    with Session(bind) as session:
+        result = session.connection().execution_options(yield_per=batch_size).execute(query)
+        if fmt == "csv":
+            yield emit(_encode_csv(names, [], header=True))
+        for batch in result.partitions():
+            yield emit(_encode_csv(names, batch, header=False) if fmt == "csv" else _encode_ndjson(names, batch))
+    if gzip:
+        yield gzip.flush()
@@ -4,6 +4,9 @@ from fastapi import UploadFile
 from sqlmodel import Session
 
 from app.models import SleepEntry, DietEntry, ExerciseEntry
+from app.services.data_events import notify_data_changed
+from app.services.data_versions import bump_version
+from app.services.insights import discard_insights
 
 class IngestService:
     """Service for ingesting validated CSV data into the database."""
@@ -40,19 +43,24 @@ class IngestService:
         
         inserted_count = 0
         errors = []
+        inserted_dates = []
             
         for row_num, row in enumerate(reader, start=2):
             try:
                 cleaned_row = {k.strip().lower(): v.strip() for k, v in row.items()}
                 entry = self._row_to_model(cleaned_row, category, user_id)
                 session.add(entry)
+                inserted_dates.append(entry.date)
                 inserted_count += 1
                 
             except Exception as e:
                 errors.append(f"Row {row_num}: {str(e)}")
         
         if inserted_count > 0:
+            discard_insights(session, user_id, min(inserted_dates), max(inserted_dates))
+            bump_version(session, user_id, category)
             session.commit()
+            notify_data_changed(user_id, category, min(inserted_dates), max(inserted_dates))
         
         return {
             "inserted": inserted_count,
@@ -0,0 +1,70 @@
+"""
+Storage for precomputed weekly insights
+
+Insights are written by the nightly batch (app/llm/insights.py) and read
+by /api/insights and the chat fast path. Uploads and deletes discard the
+insights of the weeks they touch, so a stored insight always matches the
+data.
+"""
+from datetime import date, timedelta
+from typing import Optional
+from sqlmodel import Session, delete, select
+from app.models import DietEntry, ExerciseEntry, SleepEntry, WeeklyInsight, utcnow
+from app.services.data_versions import bump_version
+
+
+def active_user_ids(session: Session, since: date) -> list[int]:
+    """Users with any entry on or after since"""
+    user_ids: set[int] = set()
+    for model in (SleepEntry, ExerciseEntry, DietEntry):
+        query = select(model.user_id).where(model.date >= since).distinct()
+        user_ids.update(session.exec(query).all())
+    return sorted(user_ids)
+
+
+def get_insight(session: Session, user_id: int, week_start: Optional[date] = None) -> Optional[WeeklyInsight]:
+    """The user's insight for the week starting week_start, or their latest one"""
+    query = select(WeeklyInsight).where(WeeklyInsight.user_id == user_id)
+    if week_start is not None:
+        query = query.where(WeeklyInsight.week_start == week_start)
+    query = query.order_by(WeeklyInsight.week_start.desc()).limit(1)  # type: ignore[attr-defined]
+    return session.exec(query).first()
+
+
+def save_insight(session: Session, user_id: int, week_start: date, week_end: date, results: dict) -> WeeklyInsight:
+    """Create or replace the user's insight for a week (keeps no stale narrative)"""
+    insight = get_insight(session, user_id, week_start) or WeeklyInsight(
+        user_id=user_id, week_start=week_start, week_end=week_end
+    )
+    insight.results = results
+    insight.narrative = None
+    insight.computed_at = utcnow()
+    session.add(insight)
+    bump_version(session, user_id, "insights")
+    session.commit()
+    session.refresh(insight)
+    return insight
+
+
+def save_narrative(session: Session, insight: WeeklyInsight, narrative: str) -> None:
+    insight.narrative = narrative
+    session.add(insight)
+    bump_version(session, insight.user_id, "insights")
+    session.commit()
+
+
+def discard_insights(session: Session, user_id: int, start_date: date, end_date: date) -> None:
+    """Drop the user's insights for weeks overlapping the dates (caller commits)"""
+    session.exec(  # type: ignore[call-overload]
+        delete(WeeklyInsight)
+        .where(WeeklyInsight.user_id == user_id)  # type: ignore[arg-type]
+        .where(WeeklyInsight.week_start <= end_date)  # type: ignore[arg-type]
+        .where(WeeklyInsight.week_end >= start_date)  # type: ignore[arg-type]
+    )
+    bump_version(session, user_id, "insights")
+
+
+def week_bounds(day: date) -> tuple[date, date]:
+    """Monday and Sunday of the week before the one containing day"""
+    monday = day - timedelta(days=day.weekday() + 7)
+    return monday, monday + timedelta(days=6)
@@ -0,0 +1,75 @@
+"""
+In-process metrics registry: counters, gauges and histograms.
+
+Metric names follow the Prometheus convention and labels are folded into
+the key, e.g. ``rate_limit_rejected_total{group="chat"}``.
+"""
+import threading
+from typing import Dict
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+counters: Dict[str, float] = {}
+gauges: Dict[str, float] = {}
+histograms: Dict[str, dict] = {}
+
+
+def _key(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    inner = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return f"{name}{{{inner}}}"
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    """Increase a counter"""
+    key = _key(name, labels)
+    with _lock:
+        counters[key] = counters.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    """Set a gauge to an absolute value"""
+    with _lock:
+        gauges[_key(name, labels)] = value
+
+
+def observe(name: str, value: float, buckets: tuple = DEFAULT_BUCKETS, **labels) -> None:
+    """Record one observation in a histogram"""
+    key = _key(name, labels)
+    with _lock:
+        hist = histograms.get(key)
+        if hist is None:
+            hist = {"buckets": {b: 0 for b in buckets}, "count": 0, "sum": 0.0}
+            histograms[key] = hist
+        for bound in hist["buckets"]:
+            if value <= bound:
+                hist["buckets"][bound] += 1
+        hist["count"] += 1
+        hist["sum"] += value
+
+
+def snapshot() -> dict:
+    """Return a JSON-friendly copy of every metric"""
+    with _lock:
+        return {
+            "counters": dict(counters),
+            "gauges": dict(gauges),
+            "histograms": {
+                key: {
+                    "buckets": {str(b): n for b, n in hist["buckets"].items()},
+                    "count": hist["count"],
+                    "sum": round(hist["sum"], 6),
+                }
+                for key, hist in histograms.items()
+            },
+        }
+
+
+def reset() -> None:
+    """Clear every metric (used by tests)"""
+    with _lock:
+        counters.clear()
+        gauges.clear()
+        histograms.clear()
@@ -0,0 +1,38 @@
+"""
+Sparse field projection for the entry list endpoints
+
+fields=date,calories selects only those columns in SQL, so neither the
+database nor the encoder touches the rest. layout=columns returns them
+column-oriented ({"date": [...], "calories": [...]}), which is what chart
+libraries take and repeats no keys. With max_points, the rows are thinned
+out for charting by the first metric among them (see downsample.py).
+"""
+from typing import Literal, Optional
+
+Layout = Literal["rows", "columns"]
+
+
+class ProjectionError(ValueError):
+    pass
+
+
+def select_columns(model, fields: Optional[str]) -> list:
+    """Table columns named in the comma-separated fields, in that order (all columns when None)"""
+    table = model.__table__
+    if not fields:
+        return list(table.columns)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in table.columns]
+    if unknown or not names:
+        raise ProjectionError(
+            f"Unknown field(s) {', '.join(unknown) or '(none given)'}. Choose from: {', '.join(table.columns.keys())}"
+        )
+    return [table.columns[name] for name in dict.fromkeys(names)]
+
+
+def value_column(columns) -> Optional[str]:
+    """The metric a chart of these columns plots: the first numeric one that isn't a key"""
+    for column in columns:
+        if column.name not in ("id", "user_id") and column.type.python_type in (int, float):
+            return column.name
+    return None
@@ -0,0 +1,257 @@
+"""
+Cache of entry-list query results, stored as encoded response bodies
+
+Entries are keyed by (user_id, category, data version, filters), where the
+data version is the stored one the list endpoints already read for their
+ETag. Any committed upload or delete, from any worker, therefore moves
+lookups to a new key; the data-change listener also drops the user's
+entries for the category right away so they stop taking up the budget.
+
+Results live in process memory (an LRU with a byte budget) by default, or
+in a SQLite file shared by every worker on the host with
+QUERY_CACHE_BACKEND=sqlite, so a result one worker computed warms the
+others. Hits, misses, hit ratio, entries and bytes are reported to the
+metrics registry under cache="entry_queries".
+
+read_entries puts the cache in front of the database and coalesces
+identical concurrent misses (several dashboard tabs, duplicate requests)
+into one query through the "entry_reads" single-flight group. A miss runs
+the query as Core rows (no ORM objects, no Pydantic) and encodes them with
+orjson, so a hit is served without any per-row work at all.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Optional
+import orjson
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+from app.services import metrics
+from app.services.cache import MISSING, LRUCache
+from app.services.data_events import on_data_changed
+from app.services.projection import Layout, value_column
+from app.services.single_flight import SingleFlight
+
+QUERY_CACHE = os.getenv("QUERY_CACHE", "1") == "1"
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "600"))  # seconds
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+CACHE_NAME = "entry_queries"
+
+def normalize_filters(filters: dict[str, Any]) -> str:
+    """Stable text form of the filters that were given (order and unset ones don't matter)"""
+    given = {name: value for name, value in filters.items() if value is not None}
+    return json.dumps(given, sort_keys=True, default=str)
+
+
+class MemoryResultStore:
+    """Results in this worker's memory"""
+    blocking = False
+
+    def __init__(self, max_bytes: int = QUERY_CACHE_MAX_BYTES, ttl: float = QUERY_CACHE_TTL):
+        self._cache = LRUCache(CACHE_NAME, max_entries=100_000, ttl=ttl, max_bytes=max_bytes, sizeof=len)
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        body = self._cache.get(key)
+        return None if body is MISSING else body
+
+    def set(self, key: tuple, body: bytes) -> None:
+        self._cache.set(key, body)
+
+    def invalidate(self, user_id: int, category: str) -> int:
+        return self._cache.invalidate(lambda key, _: key[0] == user_id and key[1] == category)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+class SQLiteResultStore:
+    """Results in a SQLite file shared by every worker on the host"""
+    blocking = True
+
+    def __init__(self, path: str, max_bytes: int = QUERY_CACHE_MAX_BYTES, ttl: float = QUERY_CACHE_TTL,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS query_results ("
+            "user_id INTEGER NOT NULL, category TEXT NOT NULL, key TEXT NOT NULL, "
+            "body BLOB NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL, "
+            "PRIMARY KEY (user_id, category, key))"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        user_id, category, *rest = key
+        conn = self._connect()
+        now = self.clock()
+        row = conn.execute(
+            "SELECT body FROM query_results WHERE user_id = ? AND category = ? AND key = ? AND expires_at > ?",
+            (user_id, category, json.dumps(rest), now),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            metrics.inc("cache_misses_total", cache=CACHE_NAME)
+            self._report_ratio()
+            return None
+        conn.execute(
+            "UPDATE query_results SET used_at = ? WHERE user_id = ? AND category = ? AND key = ?",
+            (now, user_id, category, json.dumps(rest)),
+        )
+        self.hits += 1
+        metrics.inc("cache_hits_total", cache=CACHE_NAME)
+        self._report_ratio()
+        return row[0]
+
+    def set(self, key: tuple, body: bytes) -> None:
+        user_id, category, *rest = key
+        if len(body) > self.max_bytes:
+            return
+        now = self.clock()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO query_results (user_id, category, key, body, expires_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, category, json.dumps(rest), body, now + self.ttl, now),
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._report_size(conn)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired results, then least recently used ones until within the budget"""
+        conn.execute("DELETE FROM query_results WHERE expires_at <= ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM query_results").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = conn.execute(
+                "SELECT rowid, LENGTH(body) FROM query_results ORDER BY used_at LIMIT 1"
+            ).fetchone()
+            conn.execute("DELETE FROM query_results WHERE rowid = ?", (oldest[0],))
+            total -= oldest[1]
+            metrics.inc("cache_evictions_total", cache=CACHE_NAME)
+
+    def invalidate(self, user_id: int, category: str) -> int:
+        conn = self._connect()
+        dropped = conn.execute(
+            "DELETE FROM query_results WHERE user_id = ? AND category = ?", (user_id, category)
+        ).rowcount
+        self._report_size(conn)
+        return dropped
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM query_results")
+
+    def _report_size(self, conn: sqlite3.Connection) -> None:
+        entries, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM query_results"
+        ).fetchone()
+        metrics.set_gauge("cache_entries", entries, cache=CACHE_NAME)
+        metrics.set_gauge("cache_bytes", size, cache=CACHE_NAME)
+
+    def _report_ratio(self) -> None:
+        metrics.set_gauge("cache_hit_ratio", round(self.hits / (self.hits + self.misses), 4), cache=CACHE_NAME)
+
+
+class QueryCache:
+    def __init__(self, store, enabled: bool = QUERY_CACHE):
+        self.store = store
+        self.enabled = enabled
+
+    def get(self, user_id: int, category: str, version: int, filters: dict[str, Any]) -> Optional[bytes]:
+        """Cached body for the query, or None; version is the stored data version read for the request"""
+        if not self.enabled:
+            return None
+        return self.store.get((user_id, category, version, normalize_filters(filters)))
+
+    def set(self, user_id: int, category: str, version: int, filters: dict[str, Any], body: bytes) -> None:
+        if self.enabled:
+            self.store.set((user_id, category, version, normalize_filters(filters)), body)
+
+    def invalidate(self, user_id: int, category: str) -> int:
+        return self.store.invalidate(user_id, category)
+
+    def clear(self) -> None:
+        self.store.clear()
+
+
+def build_store():
+    if os.getenv("QUERY_CACHE_BACKEND", "memory") == "sqlite":
+        return SQLiteResultStore(os.getenv("QUERY_CACHE_SQLITE_PATH", "querycache.db"))
+    return MemoryResultStore()
+
+
+query_cache = QueryCache(build_store())
+entry_reads = SingleFlight("entry_reads")
+
+
+def encode_items(bind, query, layout: Layout = "rows", max_points: Optional[int] = None) -> bytes:
+    """query's rows encoded straight from Core rows
+
+    As {"items": [{column: value}, ...]}, or with layout="columns" as
+    {"columns": {column: [values]}}. With max_points, query must be ordered
+    by date and the rows are downsampled to at most that many.
+    """
+    with Session(bind) as session:
+        result = session.connection().execute(query)
+        columns = list(result.keys())
+        rows = result.all()
+    if max_points is not None:
+        from app.services.downsample import downsample_rows  # loads NumPy on first use
+
+        y_name = value_column(query.selected_columns)
+        assert y_name is not None
+        x_index = columns.index("date") if "date" in columns else None
+        rows = downsample_rows(rows, x_index, columns.index(y_name), max_points)
+    if layout == "columns":
+        values = list(zip(*rows)) or [()] * len(columns)
+        return orjson.dumps({"columns": {name: list(column) for name, column in zip(columns, values)}})
+    return orjson.dumps({"items": [dict(zip(columns, row)) for row in rows]})
+
+
+async def read_entries(bind, user_id: int, category: str, version: int, filters: dict[str, Any], query,
+                       layout: Layout = "rows", max_points: Optional[int] = None) -> bytes:
+    """JSON body listing query's rows: from the cache, a concurrent identical read, or the database
+
+    The query runs on a worker thread with its own session, so the event
+    loop isn't blocked and a waiting request doesn't depend on the
+    session of the one that started it. A lookup in the SQLite store is
+    file I/O, so it goes to the thread pool too.
+    """
+    if query_cache.store.blocking:
+        body = await run_in_threadpool(query_cache.get, user_id, category, version, filters)
+    else:
+        body = query_cache.get(user_id, category, version, filters)
+    if body is not None:
+        return body
+
+    def load() -> bytes:
+        body = encode_items(bind, query, layout, max_points)
+        query_cache.set(user_id, category, version, filters, body)
+        return body
+
+    return await entry_reads.run((user_id, category, version, normalize_filters(filters)), load)
+
+
+@on_data_changed
+def _invalidate_queries(user_id: int, category: str, start_date: date, end_date: date) -> None:
+    query_cache.invalidate(user_id, category)
@@ -0,0 +1,227 @@
+"""
+Token-bucket rate limiting per route group.
+
+Each (group, client) pair owns a bucket holding up to ``capacity`` tokens
+that refills at ``capacity / period`` tokens per second; a request spends
+one token. Buckets live in process memory by default, or in a shared SQLite
+file (RATE_LIMIT_BACKEND=sqlite) so several workers enforce one budget.
+
+Behind a reverse proxy every request comes from the proxy's address, so
+clients limited by IP would share one bucket. Proxies listed in
+RATE_LIMIT_TRUSTED_PROXIES are looked through using X-Forwarded-For.
+"""
+import ipaddress
+import math
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+from app.services import metrics
+
+
+@dataclass(frozen=True)
+class Rule:
+    capacity: int  # burst size
+    period: float  # seconds to refill a full bucket
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    remaining: int
+    retry_after: int  # whole seconds until a token is available (0 when allowed)
+
+
+DEFAULT_RULES = {
+    "auth": Rule(10, 60),
+    "upload": Rule(5, 60),
+    "chat": Rule(10, 60),
+    "reads": Rule(120, 60),
+}
+
+
+def parse_rule(value: str) -> Rule:
+    """Parse "<requests>/<seconds>", e.g. "10/60" """
+    requests, seconds = value.split("/", 1)
+    return Rule(int(requests), float(seconds))
+
+
+def load_rules() -> dict[str, Rule]:
+    """Default rules, overridable per group with RATE_LIMIT_<GROUP>=<requests>/<seconds>"""
+    rules = {}
+    for group, default in DEFAULT_RULES.items():
+        override = os.getenv(f"RATE_LIMIT_{group.upper()}")
+        rules[group] = parse_rule(override) if override else default
+    return rules
+
+
+def _refill(tokens: float, updated_at: float, rule: Rule, now: float) -> float:
+    return min(rule.capacity, tokens + max(0.0, now - updated_at) * rule.rate)
+
+
+def _spend(tokens: float, rule: Rule) -> tuple[float, Decision]:
+    if tokens >= 1:
+        tokens -= 1
+        return tokens, Decision(True, int(tokens), 0)
+    retry_after = math.ceil((1 - tokens) / rule.rate)
+    return tokens, Decision(False, 0, max(1, retry_after))
+
+
+class MemoryBucketStore:
+    """Buckets in a dict; enough for a single worker"""
+    blocking = False
+    max_keys = 10_000
+
+    def __init__(self):
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rule: Rule, now: float) -> Decision:
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (rule.capacity, now))
+            tokens, decision = _spend(_refill(tokens, updated_at, rule, now), rule)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return decision
+
+    def _prune(self, now: float) -> None:
+        # Buckets idle for an hour are full again under any sane rule
+        stale = [k for k, (_, updated_at) in self._buckets.items() if now - updated_at > 3600]
+        for key in stale:
+            del self._buckets[key]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBucketStore:
+    """Buckets in a SQLite file shared by every worker on the host"""
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, rule: Rule, now: float) -> Decision:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated_at = row if row else (rule.capacity, now)
+            tokens, decision = _spend(_refill(tokens, updated_at, rule, now), rule)
+            conn.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (key, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return decision
+
+    def reset(self) -> None:
+        self._connect().execute("DELETE FROM rate_limit_buckets")
+
+
+class RateLimiter:
+    def __init__(self, rules: dict[str, Rule], store, clock=time.time):
+        self.rules = rules
+        self.store = store
+        self.clock = clock
+
+    def hit(self, group: str, identity: str) -> Optional[Decision]:
+        """Spend one token for identity in group; None when the group is unlimited"""
+        rule = self.rules.get(group)
+        if rule is None:
+            return None
+        decision = self.store.take(f"{group}:{identity}", rule, self.clock())
+        if decision.allowed:
+            metrics.inc("rate_limit_allowed_total", group=group)
+        else:
+            metrics.inc("rate_limit_rejected_total", group=group)
+        return decision
+
+    def reset(self) -> None:
+        self.store.reset()
+
+
+def route_group(method: str, path: str) -> Optional[str]:
+    """Map a request onto its rate limit group"""
+    if path == "/api/login":
+        return "auth"
+    if path == "/api/upload":
+        return "upload"
+    # Only the model calls spend the chat budget; history and suggestions are plain reads
+    if method == "POST" and path in ("/api/chat", "/api/chat/stream"):
+        return "chat"
+    if method == "GET" and path.startswith(
+        ("/api/sleep", "/api/diet", "/api/exercise", "/api/me", "/api/insights", "/api/chat/")
+    ):
+        return "reads"
+    return None
+
+
+def _parse_networks(value: str) -> list:
+    return [ipaddress.ip_network(item.strip()) for item in value.split(",") if item.strip()]
+
+
+# Proxies (addresses or CIDR ranges) whose X-Forwarded-For is believed
+RATE_LIMIT_TRUSTED_PROXIES = _parse_networks(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", ""))
+
+
+def _trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in RATE_LIMIT_TRUSTED_PROXIES)
+
+
+def client_address(peer: Optional[str], forwarded_for: Optional[str]) -> str:
+    """Address to limit a request by
+
+    The peer itself, unless it is a trusted proxy: then the nearest
+    untrusted hop in X-Forwarded-For (hops further left can be forged).
+    """
+    address = peer or "unknown"
+    if not forwarded_for or not _trusted(address):
+        return address
+    for hop in reversed([hop.strip() for hop in forwarded_for.split(",") if hop.strip()]):
+        address = hop
+        if not _trusted(hop):
+            break
+    return address
+
+
+def build_store():
+    if os.getenv("RATE_LIMIT_BACKEND", "memory") == "sqlite":
+        return SQLiteBucketStore(os.getenv("RATE_LIMIT_SQLITE_PATH", "ratelimit.db"))
+    return MemoryBucketStore()
+
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+
+limiter = RateLimiter(load_rules(), build_store())
@@ -0,0 +1,78 @@
+"""
+Request coalescing ("single flight")
+
+While a load for a key is running, further callers asking for the same key
+wait for it and share its result (or exception) instead of running it
+again. Nothing is kept once the load finishes; pair it with a cache for
+that. Each group reports executions and shared results under its name, so
+singleflight_shared_total is the number of executions saved.
+"""
+import asyncio
+import threading
+from typing import Any, Callable, Hashable
+from app.services import metrics
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, _Call] = {}
+        self._tasks: dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Run load once per key across threads; concurrent callers block and share its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        assert call is not None
+
+        if not leader:
+            call.done.wait()
+            metrics.inc("singleflight_shared_total", group=self.name)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        metrics.inc("singleflight_executions_total", group=self.name)
+        try:
+            call.result = load()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def run(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Run the blocking load once per key on a worker thread; concurrent awaiters share it
+
+        The load runs as its own task, so a caller that is cancelled (e.g. the
+        client went away) doesn't fail the others waiting on it.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            metrics.inc("singleflight_executions_total", group=self.name)
+            task = asyncio.ensure_future(asyncio.to_thread(load))
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            metrics.inc("singleflight_shared_total", group=self.name)
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every awaiter was cancelled
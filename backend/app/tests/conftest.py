@@ -7,8 +7,26 @@ from sqlmodel.pool import StaticPool
 from app.main import app
 from app.database import get_session
 from app.models import SleepEntry, ExerciseEntry, DietEntry
+from app.services import rate_limit
+from app.services.query_cache import query_cache
+from app.llm.tool_cache import tool_cache
+from app.llm.response_cache import response_cache
+from app.llm import resilience
+from app.llm.context_cache import context_cache
 
 
+@pytest.fixture(autouse=True)
+def reset_process_state(monkeypatch):
+    """Clear in-process state that would otherwise leak between tests"""
+    rate_limit.limiter.reset()
+    tool_cache.clear()
+    query_cache.clear()
+    response_cache.clear()
+    resilience.breaker.reset()
+    context_cache.clear()
+    monkeypatch.setattr(resilience, "LLM_RETRY_BASE_DELAY", 0)
+    yield
+
 @pytest.fixture(name="session")
 def session_fixture():
     """Create a fresh test database for each test"""
@@ -218,4 +236,123 @@ def authenticated_client_fixture(client: TestClient, session: Session):
     )
     
     # The session cookie is automatically stored in the TestClient
-    return client
\ No newline at end of file
+    return client
+
+# Chat Testing Fixtures
+
+def text_response(text: str):
+    """Build a Gemini response holding a single text part"""
+    from google.genai import types
+    return types.GenerateContentResponse(candidates=[types.Candidate(
+        content=types.Content(role="model", parts=[types.Part(text=text)])
+    )])
+
+
+def function_call_response(name: str, args: dict | None = None):
+    """Build a Gemini response asking for one function call"""
+    from google.genai import types
+    return types.GenerateContentResponse(candidates=[types.Candidate(
+        content=types.Content(role="model", parts=[
+            types.Part(function_call=types.FunctionCall(name=name, args=args or {}))
+        ])
+    )])
+
+
+def function_calls_response(*calls: tuple[str, dict]):
+    """Build a Gemini response asking for several function calls at once"""
+    from google.genai import types
+    return types.GenerateContentResponse(candidates=[types.Candidate(
+        content=types.Content(role="model", parts=[
+            types.Part(function_call=types.FunctionCall(name=name, args=args)) for name, args in calls
+        ])
+    )])
+
+
+class FakeGenAIClient:
+    """Stand-in for genai.Client that replays queued responses.
+
+    Queue a response (or an exception) per model call; for streaming calls
+    queue a list of chunks.
+    """
+
+    def __init__(self):
+        self.responses = []
+        self.calls = []
+        self.aio = self
+        self.models = self
+
+    def queue(self, *responses):
+        self.responses.extend(responses)
+
+    def _next(self, kwargs):
+        self.calls.append(kwargs)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def generate_content(self, **kwargs):
+        return self._next(kwargs)
+
+    async def generate_content_stream(self, **kwargs):
+        chunks = self._next(kwargs)
+
+        async def iterate():
+            for chunk in chunks:
+                yield chunk
+        return iterate()
+
+
+@pytest.fixture(name="fake_genai")
+def fake_genai_fixture(client: TestClient):
+    """Route chat requests to a FakeGenAIClient"""
+    from app.llm.client import get_client
+
+    fake = FakeGenAIClient()
+    app.dependency_overrides[get_client] = lambda: fake
+    return fake
+
+
+# Shared Test Helpers
+
+class FakeClock:
+    """Clock whose time only moves when a test sets `now`"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(name="clock")
+def clock_fixture():
+    return FakeClock()
+
+
+@pytest.fixture(name="make_service")
+def make_service_fixture(session: Session):
+    """Build ChatServices on the test session; no model client unless one is given"""
+    from app.llm.chat_service import ChatService
+
+    def make(client=None, user_id: int = 1) -> ChatService:
+        return ChatService(session, client, user_id=user_id)  # type: ignore[arg-type]
+    return make
+
+
+@pytest.fixture(name="add_sleep")
+def add_sleep_fixture(session: Session):
+    """Add one sleep entry for a user"""
+
+    def add(day: date, hours: float, user_id: int = 1):
+        session.add(SleepEntry(date=day, hours=hours, quality="good", user_id=user_id))
+        session.commit()
+    return add
+
+
+@pytest.fixture(name="no_shared_client")
+def no_shared_client_fixture(monkeypatch):
+    """Start without a cached Gemini client"""
+    from app.llm import client as llm_client
+
+    monkeypatch.setattr(llm_client, "_client", None)
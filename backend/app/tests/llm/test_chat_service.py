@@ -0,0 +1,18 @@
+import threading
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_run_functions_executes_calls_concurrently(monkeypatch, make_service):
+    service = make_service()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def execute_function(name, args=None, session=None):
+        barrier.wait()  # only passes when both calls are running at once
+        return {"name": name}
+
+    monkeypatch.setattr(service, "execute_function", execute_function)
+
+    results = await service.run_functions([("get_sleep_last_week", {}), ("get_steps_last_week", {})])
+
+    assert results == [{"name": "get_sleep_last_week"}, {"name": "get_steps_last_week"}]
@@ -0,0 +1,62 @@
+import pytest
+from app.llm import client as llm_client
+
+
+pytestmark = pytest.mark.usefixtures("no_shared_client")
+
+
+def test_create_client_requires_api_key(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+
+    with pytest.raises(ValueError):
+        llm_client.create_client()
+
+
+def test_create_client_applies_pool_limits(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(llm_client, "GEMINI_MAX_CONNECTIONS", 7)
+
+    client = llm_client.create_client()
+
+    assert client._api_client._httpx_client._transport._pool._max_connections == 7
+    assert client._api_client._async_httpx_client._transport._pool._max_connections == 7
+
+
+def test_get_client_returns_shared_instance(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+
+    assert llm_client.get_client() is llm_client.get_client()
+
+
+def test_init_client_skips_without_api_key(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+
+    llm_client.init_client()
+
+    assert llm_client._client is None
+
+
+@pytest.mark.asyncio
+async def test_close_client_drops_shared_instance(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    llm_client.init_client()
+
+    await llm_client.close_client()
+
+    assert llm_client._client is None
+
+
+def test_fake_backend_needs_no_api_key(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setattr(llm_client, "LLM_BACKEND", "fake")
+
+    llm_client.init_client()
+
+    assert type(llm_client._client).__name__ == "FakeGeminiClient"
+
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_BACKEND", "nope")
+
+    with pytest.raises(ValueError):
+        llm_client.create_client()
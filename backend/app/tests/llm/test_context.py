@@ -0,0 +1,48 @@
+from sqlmodel import Session
+from app.llm.context import compact, estimate_tokens, pack_history, split_recent
+from app.models import ChatMessage
+from app.services.conversations import add_turn, create_conversation
+
+
+def messages(*texts: str) -> list[ChatMessage]:
+    return [
+        ChatMessage(id=i + 1, conversation_id=1, role="user" if i % 2 == 0 else "model", content=text)
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_keeps_last_turns():
+    older, recent = split_recent(messages("q1", "a1", "q2", "a2", "q3", "a3"), max_turns=2)
+
+    assert [m.content for m in older] == ["q1", "a1"]
+    assert [m.content for m in recent] == ["q2", "a2", "q3", "a3"]
+
+
+def test_respects_token_budget_and_starts_with_user():
+    history = messages("q1", "a1", "q2", "x" * 400)
+
+    older, recent = split_recent(history, max_turns=10, token_budget=estimate_tokens("x" * 400))
+
+    assert [m.content for m in older] == ["q1", "a1", "q2", "x" * 400]
+    assert recent == []
+
+
+def test_compact_keeps_newest_lines_within_budget():
+    summary = compact("", messages(*(f"message {i}" for i in range(100))), token_budget=20)
+
+    assert summary.endswith("Assistant: message 99")
+    assert "message 0" not in summary
+    assert sum(estimate_tokens(line) for line in summary.splitlines()) <= 20
+
+
+def test_prompt_size_stays_bounded(session: Session):
+    conversation = create_conversation(session, user_id=1)
+    sizes = []
+    for i in range(40):
+        add_turn(session, conversation, f"question {i} " + "word " * 30, f"answer {i} " + "word " * 60)
+        contents = pack_history(session, conversation)
+        sizes.append(sum(len(part["text"]) for c in contents for part in c["parts"]))
+
+    assert conversation.summarized_through > 0
+    assert contents[0]["parts"][0]["text"].startswith("(Summary of our earlier conversation:")
+    assert max(sizes[20:]) - min(sizes[20:]) < 0.2 * max(sizes)
@@ -0,0 +1,108 @@
+import pytest
+from google.genai import errors, types
+from app.llm.context_cache import ContextCache, context_cache
+from app.tests.conftest import FakeGenAIClient, text_response
+
+
+class FakeCaches:
+    """Stand-in for client.aio.caches"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.created = []
+        self.updated = []
+        self.deleted = []
+
+    async def create(self, *, model, config):
+        if self.fail:
+            raise errors.ClientError(400, {"error": {"message": "Cached content is too small"}})
+        self.created.append(config)
+        return types.CachedContent(name=f"cachedContents/{len(self.created)}")
+
+    async def update(self, *, name, config):
+        self.updated.append((name, config.ttl))
+        return types.CachedContent(name=name)
+
+    async def delete(self, *, name):
+        self.deleted.append(name)
+
+
+def client_with_caches(fail: bool = False) -> FakeGenAIClient:
+    client = FakeGenAIClient()
+    client.caches = FakeCaches(fail)  # type: ignore[attr-defined]
+    return client
+
+
+@pytest.mark.asyncio
+async def test_start_caches_prompt_with_and_without_tools():
+    client = client_with_caches()
+    cache = ContextCache()
+
+    await cache.start(client, "gemini-test")
+
+    assert [bool(config.tools) for config in client.caches.created] == [True, False]
+    assert cache.name(True) == "cachedContents/1"
+    assert cache.name(False) == "cachedContents/2"
+
+
+@pytest.mark.asyncio
+async def test_falls_back_when_caching_is_unavailable():
+    cache = ContextCache()
+
+    await cache.start(client_with_caches(fail=True), "gemini-test")
+
+    assert cache.name(True) is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_extends_entries_near_expiry(clock):
+    client = client_with_caches()
+    cache = ContextCache(ttl=3600, refresh_before=600, clock=clock)
+    await cache.start(client, "gemini-test")
+
+    clock.now = 2000
+    await cache.refresh(client)
+    assert client.caches.updated == []
+
+    clock.now = 3100
+    await cache.refresh(client)
+    assert client.caches.updated == [("cachedContents/1", "3600s"), ("cachedContents/2", "3600s")]
+    clock.now = 6000
+    assert cache.name(True) == "cachedContents/1"
+
+
+@pytest.mark.asyncio
+async def test_unrefreshed_entry_is_not_used_past_expiry(clock):
+    cache = ContextCache(ttl=3600, clock=clock)
+    await cache.start(client_with_caches(), "gemini-test")
+
+    clock.now = 3590
+
+    assert cache.name(True) is None
+
+
+@pytest.mark.asyncio
+async def test_chat_references_cached_prompt(make_service):
+    client = client_with_caches()
+    await context_cache.start(client, "gemini-test")
+    client.queue(text_response("Hello!"))
+
+    await make_service(client).chat("hi")
+
+    config = client.calls[0]["config"]
+    assert config.cached_content == "cachedContents/1"
+    assert config.system_instruction is None
+    assert config.tools is None
+
+
+@pytest.mark.asyncio
+async def test_chat_retries_inline_when_cache_is_rejected(make_service):
+    client = client_with_caches()
+    await context_cache.start(client, "gemini-test")
+    client.queue(errors.ClientError(404, {"error": {"message": "CachedContent not found"}}), text_response("Hello!"))
+
+    result = await make_service(client).chat("hi")
+
+    assert result["message"] == "Hello!"
+    assert client.calls[1]["config"].system_instruction is not None
+    assert context_cache.name(True) is None
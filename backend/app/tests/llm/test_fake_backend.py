@@ -0,0 +1,36 @@
+import pytest
+from google.genai import errors
+from app.llm.fake_backend import FakeGeminiClient
+
+
+@pytest.mark.asyncio
+async def test_calls_tools_named_in_the_question(make_service):
+    result = await make_service(FakeGeminiClient(latency_ms=0)).chat("Compare my sleep and calories please")
+
+    assert result["function_called"] == "get_sleep_last_week, get_calories_last_week"
+    assert "total_hours=0" in result["message"]
+
+
+@pytest.mark.asyncio
+async def test_answers_other_questions_with_text(make_service):
+    result = await make_service(FakeGeminiClient(latency_ms=0)).chat("hello")
+
+    assert result["function_called"] is None
+    assert "sleep, activity and diet" in result["message"]
+
+
+@pytest.mark.asyncio
+async def test_streams_text_in_chunks(make_service):
+    events = [event async for event in make_service(FakeGeminiClient(latency_ms=0)).chat_stream("hello")]
+
+    tokens = [event["text"] for event in events if event["type"] == "token"]
+    assert len(tokens) > 1
+    assert "".join(tokens).startswith("I can help")
+
+
+@pytest.mark.asyncio
+async def test_injects_errors():
+    client = FakeGeminiClient(latency_ms=0, error_rate=1.0, error_code=429)
+
+    with pytest.raises(errors.ClientError):
+        await client.generate_content(model="fake", contents=[{"role": "user", "parts": [{"text": "hi"}]}])
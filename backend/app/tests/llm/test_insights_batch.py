@@ -0,0 +1,56 @@
+import pytest
+from datetime import date, timedelta
+from sqlmodel import Session, SQLModel, create_engine, select
+from app.llm.insights import precompute_weekly_insights, write_narratives
+from app.models import WeeklyInsight
+from app.services.insights import week_bounds
+from app.tests.conftest import FakeGenAIClient, text_response
+
+
+@pytest.fixture(name="session")
+def session_fixture(tmp_path):
+    """File-backed database: the batch's worker threads each need their own connection"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'insights.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def test_precomputes_active_users(session: Session, add_sleep):
+    monday, _ = week_bounds(date.today())
+    add_sleep(monday, 7.0, user_id=1)
+    add_sleep(monday, 8.0, user_id=2)
+    add_sleep(monday - timedelta(days=90), 6.0, user_id=3)  # inactive
+
+    summary = precompute_weekly_insights(session.get_bind(), workers=2)
+
+    assert summary == {"users": 2, "computed": 2, "failed": 0}
+    insights = {i.user_id: i for i in session.exec(select(WeeklyInsight)).all()}
+    assert set(insights) == {1, 2}
+    assert insights[2].results["get_sleep_last_week"]["total_hours"] == 8.0
+    assert insights[2].week_start == monday
+
+
+def test_rerun_replaces_the_weeks_insight(session: Session, add_sleep):
+    monday, _ = week_bounds(date.today())
+    add_sleep(monday, 7.0, user_id=1)
+    precompute_weekly_insights(session.get_bind())
+    precompute_weekly_insights(session.get_bind())
+
+    assert len(session.exec(select(WeeklyInsight)).all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_narratives(session: Session, add_sleep):
+    monday, _ = week_bounds(date.today())
+    add_sleep(monday, 7.0, user_id=1)
+    precompute_weekly_insights(session.get_bind())
+    client = FakeGenAIClient()
+    client.queue(text_response("  A restful week!  "))
+
+    written = await write_narratives(session.get_bind(), client)
+
+    assert written == 1
+    assert '"total_hours": 7.0' in client.calls[0]["contents"]
+    session.expire_all()
+    assert session.exec(select(WeeklyInsight)).one().narrative == "A restful week!"
@@ -0,0 +1,62 @@
+import pytest
+from app.llm.intents import WEEKLY_SUMMARY, match_intent, render_answer
+
+
+@pytest.mark.parametrize("message,function_name", [
+    ("How much sleep did I get last week?", "get_sleep_last_week"),
+    ("how many hours did I sleep last week", "get_sleep_last_week"),
+    ("What was my average step count last week?", "get_steps_last_week"),
+    ("How much did I walk last week?", "get_steps_last_week"),
+    ("How many calories did I eat last week?", "get_calories_last_week"),
+    ("What was my calorie intake the previous week?", "get_calories_last_week"),
+    ("How was last week?", WEEKLY_SUMMARY),
+    ("Give me a recap of last week", WEEKLY_SUMMARY),
+])
+def test_matches_weekly_questions(message, function_name):
+    assert match_intent(message) == function_name
+
+
+@pytest.mark.parametrize("message", [
+    "How much sleep did I get?",
+    "Compare my sleep and calories last week",
+    "How many calories did I burn last week?",
+    "Did I sleep more than the week before last week?",
+    "Why was my sleep bad last week?",
+    "How was my sleep compared to last week?",
+    "How much protein did I eat last week?",
+    "What was my sleep quality last week?",
+    "Which day did I sleep the least last week?",
+    "How many steps did I take on Tuesday last week?",
+    "How many nights under 6 hours last week?",
+    "What was my total steps last week?",
+    "Hello!",
+])
+def test_leaves_other_questions_to_the_model(message):
+    assert match_intent(message) is None
+
+
+def test_renders_sleep_answer():
+    answer = render_answer("get_sleep_last_week", {
+        "total_hours": 49.0, "days_recorded": 7, "week": "2024-01-01 to 2024-01-07"
+    })
+
+    assert answer == (
+        "Last week (2024-01-01 to 2024-01-07) you slept 49 hours in total across "
+        "7 recorded nights, about 7.0 hours per night."
+    )
+
+
+def test_renders_steps_answer():
+    answer = render_answer("get_steps_last_week", {
+        "average_steps": 8500.0, "days_recorded": 1, "week": "2024-01-01 to 2024-01-07"
+    })
+
+    assert answer == "Last week (2024-01-01 to 2024-01-07) you averaged 8,500 steps per day across 1 recorded day."
+
+
+def test_renders_missing_data():
+    answer = render_answer("get_calories_last_week", {
+        "total_calories": 0, "days_recorded": 0, "week": "2024-01-01 to 2024-01-07"
+    })
+
+    assert answer == "I don't have any diet entries for last week (2024-01-01 to 2024-01-07)."
@@ -0,0 +1,214 @@
+import asyncio
+import httpx
+import pytest
+from google.genai import errors
+from app.llm import resilience
+from app.llm.resilience import (
+    CircuitBreaker,
+    LLMAuthError,
+    LLMConnectionError,
+    LLMError,
+    LLMRateLimitedError,
+    LLMServerError,
+    LLMTimeoutError,
+    LLMUnavailableError,
+    call_llm,
+    classify,
+    stream_llm,
+)
+
+
+def failing_then(result, *failures):
+    """Return a make_call that raises each failure in turn, then returns result"""
+    remaining = list(failures)
+    calls = []
+
+    async def make_call():
+        calls.append(1)
+        if remaining:
+            raise remaining.pop(0)
+        return result
+    make_call.calls = calls  # type: ignore[attr-defined]
+    return make_call
+
+
+@pytest.mark.parametrize("error, expected", [
+    (errors.ClientError(429, {}), LLMRateLimitedError),
+    (errors.ClientError(401, {}), LLMAuthError),
+    (errors.ClientError(400, {}), LLMError),
+    (errors.ServerError(503, {}), LLMServerError),
+    (TimeoutError(), LLMTimeoutError),
+    (httpx.ConnectError("reset"), LLMConnectionError),
+    (ValueError("bug"), LLMError),
+])
+def test_classifies_by_type(error, expected):
+    assert type(classify(error)) is expected
+
+
+@pytest.mark.asyncio
+async def test_retries_retryable_errors():
+    make_call = failing_then("ok", errors.ServerError(503, {}), errors.ClientError(429, {}))
+
+    assert await call_llm(make_call) == "ok"
+    assert len(make_call.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_errors():
+    make_call = failing_then("ok", errors.ClientError(400, {}))
+
+    with pytest.raises(LLMError):
+        await call_llm(make_call)
+    assert len(make_call.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    make_call = failing_then("ok", *[errors.ClientError(429, {})] * (resilience.LLM_MAX_RETRIES + 1))
+
+    with pytest.raises(LLMRateLimitedError):
+        await call_llm(make_call)
+
+
+@pytest.mark.asyncio
+async def test_deadline_applies_to_each_attempt(monkeypatch):
+    monkeypatch.setattr(resilience, "LLM_MAX_RETRIES", 0)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    with pytest.raises(LLMTimeoutError):
+        await call_llm(hang, timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast(monkeypatch):
+    monkeypatch.setattr(resilience, "LLM_MAX_RETRIES", 0)
+    for _ in range(resilience.breaker.threshold):
+        with pytest.raises(LLMServerError):
+            await call_llm(failing_then("ok", errors.ServerError(500, {})))
+
+    make_call = failing_then("ok")
+    with pytest.raises(LLMUnavailableError):
+        await call_llm(make_call)
+    assert make_call.calls == []
+
+
+def test_breaker_lets_one_trial_through_after_cooldown(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=10, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 10
+    breaker.allow()
+    with pytest.raises(LLMUnavailableError):
+        breaker.allow()  # the trial is still running
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failed_trial_reopens_circuit(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=10, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 10
+    breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+
+
+def half_open_breaker(monkeypatch, clock) -> CircuitBreaker:
+    breaker = CircuitBreaker(threshold=1, cooldown=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    monkeypatch.setattr(resilience, "breaker", breaker)
+    return breaker
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_frees_the_trial_slot(monkeypatch, clock):
+    breaker = half_open_breaker(monkeypatch, clock)
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.sleep(10)
+
+    trial = asyncio.create_task(call_llm(hang))
+    await started.wait()
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    assert breaker.state == "half_open"
+    assert await call_llm(failing_then("ok")) == "ok"
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_closed_trial_stream_frees_the_trial_slot(monkeypatch, clock):
+    breaker = half_open_breaker(monkeypatch, clock)
+
+    stream = stream_llm(chunks_then_failure("a", "b"))
+    assert await anext(stream) == "a"
+    await stream.aclose()
+
+    assert breaker.state == "half_open"
+    breaker.allow()  # a new trial may go through
+
+
+@pytest.mark.asyncio
+async def test_caps_concurrent_calls(monkeypatch):
+    monkeypatch.setattr(resilience, "LLM_MAX_CONCURRENCY", 2)
+    monkeypatch.setattr(resilience, "_semaphores", type(resilience._semaphores)())
+    running = 0
+    peak = 0
+
+    async def make_call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(call_llm(make_call) for _ in range(6)))
+
+    assert peak == 2
+
+
+def chunks_then_failure(*chunks, failure=None):
+    async def make_stream():
+        async def iterate():
+            for chunk in chunks:
+                yield chunk
+            if failure:
+                raise failure
+        return iterate()
+    return make_stream
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_before_first_chunk():
+    attempts = [errors.ServerError(503, {})]
+
+    async def make_stream():
+        if attempts:
+            raise attempts.pop()
+        return await chunks_then_failure("a", "b")()
+
+    assert [chunk async for chunk in stream_llm(make_stream)] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_stream_does_not_retry_after_first_chunk():
+    received = []
+
+    with pytest.raises(LLMServerError):
+        async for chunk in stream_llm(chunks_then_failure("a", failure=errors.ServerError(503, {}))):
+            received.append(chunk)
+
+    assert received == ["a"]
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import date
+from app.llm import response_cache
+from app.llm.response_cache import (
+    get_cached_response,
+    normalize_message,
+    snapshot_versions,
+    store_response,
+)
+from app.services.data_events import notify_data_changed
+from app.services.data_versions import bump_version
+from app.tests.conftest import FakeGenAIClient, text_response
+
+ANSWER = {"message": "You slept well.", "function_called": "get_sleep_last_week"}
+DAY = date(2024, 1, 1)
+
+
+def test_normalize_ignores_case_punctuation_and_spacing():
+    assert normalize_message("  How did I SLEEP?? ") == normalize_message("how did i sleep")
+
+
+def test_hit_for_same_user_only(session):
+    versions = snapshot_versions(session, 1)
+    store_response(1, "How did I sleep?", ANSWER, {"sleep"}, versions)
+
+    assert get_cached_response(1, "how did i sleep", versions) == ANSWER
+    assert get_cached_response(2, "how did i sleep", snapshot_versions(session, 2)) is None
+
+
+def test_change_to_used_category_invalidates(session):
+    store_response(1, "How did I sleep?", ANSWER, {"sleep"}, snapshot_versions(session, 1))
+
+    notify_data_changed(1, "sleep", DAY, DAY)
+
+    assert get_cached_response(1, "How did I sleep?", snapshot_versions(session, 1)) is None
+
+
+def test_change_to_other_category_keeps_entry(session):
+    store_response(1, "How did I sleep?", ANSWER, {"sleep"}, snapshot_versions(session, 1))
+
+    bump_version(session, 1, "diet")
+    bump_version(session, 2, "sleep")
+    session.commit()
+    notify_data_changed(1, "diet", DAY, DAY)
+    notify_data_changed(2, "sleep", DAY, DAY)
+
+    assert get_cached_response(1, "How did I sleep?", snapshot_versions(session, 1)) == ANSWER
+
+
+def test_change_from_another_worker_is_not_served(session):
+    store_response(1, "How did I sleep?", ANSWER, {"sleep"}, snapshot_versions(session, 1))
+
+    # Committed elsewhere: the stored version moves, but no listener runs here
+    bump_version(session, 1, "sleep")
+    session.commit()
+
+    assert get_cached_response(1, "How did I sleep?", snapshot_versions(session, 1)) is None
+
+
+def test_change_racing_with_the_answer_is_not_served(session):
+    versions = snapshot_versions(session, 1)
+    bump_version(session, 1, "sleep")  # lands while the answer is being generated
+    session.commit()
+
+    store_response(1, "How did I sleep?", ANSWER, {"sleep"}, versions)
+
+    assert get_cached_response(1, "How did I sleep?", snapshot_versions(session, 1)) is None
+
+
+def test_answers_expire_with_the_day(session, monkeypatch):
+    versions = snapshot_versions(session, 1)
+    store_response(1, "How did I sleep?", ANSWER, {"sleep"}, versions)
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.fromordinal(date.today().toordinal() + 1)
+    monkeypatch.setattr(response_cache, "date", Tomorrow)
+
+    assert get_cached_response(1, "How did I sleep?", versions) is None
+
+
+def test_answers_with_history_are_not_cached(session, make_service):
+    client = FakeGenAIClient()
+    client.queue(text_response("First."), text_response("Second."))
+    service = make_service(client)
+    history = [{"role": "user", "parts": [{"text": "hi"}]}, {"role": "model", "parts": [{"text": "Hello!"}]}]
+
+    asyncio.run(service.chat("And then?", history))
+    result = asyncio.run(service.chat("And then?", history))
+
+    assert result["message"] == "Second."
+    assert get_cached_response(1, "And then?", snapshot_versions(session, 1)) is None
@@ -0,0 +1,71 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from app.llm import client as llm_client
+from app.llm import startup
+from app.llm.context_cache import context_cache
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+
+@pytest.fixture(autouse=True)
+def no_refresher(no_shared_client, monkeypatch):
+    monkeypatch.setattr(startup, "_refresher", None)
+
+
+def test_app_import_does_not_load_genai():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print('google.genai' in sys.modules)"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+
+    assert result.stdout.strip() == "False"
+
+
+@pytest.mark.asyncio
+async def test_warm_up_loads_chat_stack_and_client(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_BACKEND", "fake")
+
+    await startup.warm_up()
+
+    assert "app.llm.chat_service" in sys.modules
+    assert llm_client._client is not None
+    await startup.shutdown()
+    assert llm_client._client is None
+
+
+@pytest.mark.asyncio
+async def test_warm_up_without_api_key_leaves_chat_lazy(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_BACKEND", "gemini")
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+
+    await startup.warm_up()
+
+    assert llm_client._client is None
+    assert startup._refresher is None
+
+
+@pytest.mark.asyncio
+async def test_warm_up_failure_is_not_raised(monkeypatch):
+    def broken():
+        raise ValueError("bad backend")
+    monkeypatch.setattr(startup, "init_client", broken)
+
+    await startup.warm_up()
+
+    assert startup._refresher is None
+
+
+@pytest.mark.asyncio
+async def test_shutdown_stops_context_cache(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_BACKEND", "fake")
+    monkeypatch.setattr("app.llm.context_cache.GEMINI_CONTEXT_CACHE", True)
+
+    await startup.warm_up()
+    assert startup._refresher is not None
+
+    await startup.shutdown()
+
+    assert startup._refresher is None
+    assert context_cache.name(True) is None
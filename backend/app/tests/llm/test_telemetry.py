@@ -0,0 +1,87 @@
+import json
+import pytest
+from google.genai import errors, types
+from app.services import metrics
+from app.tests.conftest import FakeGenAIClient, function_call_response, text_response
+
+
+def with_usage(response: types.GenerateContentResponse, prompt: int, output: int):
+    response.usage_metadata = types.GenerateContentResponseUsageMetadata(
+        prompt_token_count=prompt, candidates_token_count=output
+    )
+    return response
+
+
+def turn_log(capsys) -> dict:
+    lines = [line for line in capsys.readouterr().out.splitlines() if '"event": "chat_turn"' in line]
+    assert len(lines) == 1
+    return json.loads(lines[0])
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+
+
+@pytest.mark.asyncio
+async def test_logs_model_calls_tokens_and_tools(capsys, make_service):
+    client = FakeGenAIClient()
+    client.queue(
+        with_usage(function_call_response("get_sleep_last_week"), 100, 5),
+        with_usage(text_response("You slept well."), 150, 20),
+    )
+    service = make_service(client)
+
+    await service.chat("Tell me about my sleep")
+
+    record = turn_log(capsys)
+    assert record["source"] == "model"
+    assert record["function_called"] == "get_sleep_last_week"
+    assert [call["call"] for call in record["model_calls"]] == ["tools", "answer"]
+    assert (record["prompt_tokens"], record["response_tokens"]) == (250, 25)
+    assert record["tools"][0]["name"] == "get_sleep_last_week"
+    assert record["tools"][0]["cache_hit"] is False
+    assert record["error"] is None
+
+    counters = metrics.snapshot()["counters"]
+    assert counters['llm_tokens_total{function="get_sleep_last_week",kind="prompt"}'] == 250
+    assert counters['chat_tool_calls_total{cache="miss",tool="get_sleep_last_week"}'] == 1
+    assert counters['chat_turns_total{outcome="ok",source="model"}'] == 1
+
+
+@pytest.mark.asyncio
+async def test_records_tool_cache_hits(capsys, make_service):
+    service = make_service(FakeGenAIClient())
+    await service.chat("How much sleep did I get last week?")
+    capsys.readouterr()
+
+    await service.chat("How much sleep did I get last week?")
+
+    record = turn_log(capsys)
+    assert record["source"] == "fast_path"
+    assert record["tools"][0]["cache_hit"] is True
+    assert record["model_calls"] == []
+
+
+@pytest.mark.asyncio
+async def test_records_error_class(capsys, make_service):
+    client = FakeGenAIClient()
+    client.queue(*[errors.ClientError(429, {})] * 3)
+
+    await make_service(client).chat("hi")
+
+    assert turn_log(capsys)["error"] == "LLMRateLimitedError"
+    assert metrics.snapshot()["counters"]['chat_errors_total{error="LLMRateLimitedError"}'] == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_records_one_turn(capsys, make_service):
+    client = FakeGenAIClient()
+    client.queue([text_response("Hel"), with_usage(text_response("lo"), 40, 2)])
+
+    [event async for event in make_service(client).chat_stream("hi")]
+
+    record = turn_log(capsys)
+    assert record["streaming"] is True
+    assert record["prompt_tokens"] == 40
+    assert 'llm_call_seconds{call="tools"}' in metrics.snapshot()["histograms"]
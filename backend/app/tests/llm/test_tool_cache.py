@@ -0,0 +1,88 @@
+from datetime import timedelta
+from sqlmodel import Session
+from app.llm.tool_cache import tool_cache
+from app.services.data_events import notify_data_changed
+from app.services.data_versions import bump_version
+
+
+def test_weekly_tools_only_count_the_users_rows(make_service, add_sleep):
+    service = make_service()
+    monday, _ = service.get_last_week_bounds()
+    add_sleep(monday, 7.0, user_id=1)
+    add_sleep(monday, 9.0, user_id=2)
+
+    result = service.execute_function("get_sleep_last_week")
+
+    assert result["total_hours"] == 7.0
+    assert result["days_recorded"] == 1
+
+
+def test_repeat_calls_are_served_from_cache(make_service, add_sleep):
+    service = make_service()
+    monday, _ = service.get_last_week_bounds()
+    add_sleep(monday, 7.0)
+    service.execute_function("get_sleep_last_week")
+
+    # Written behind the service's back: the cached answer is still served
+    add_sleep(monday + timedelta(days=1), 8.0)
+
+    assert service.execute_function("get_sleep_last_week")["total_hours"] == 7.0
+
+
+def test_data_change_in_the_week_invalidates(make_service, add_sleep):
+    service = make_service()
+    monday, _ = service.get_last_week_bounds()
+    add_sleep(monday, 7.0)
+    service.execute_function("get_sleep_last_week")
+    add_sleep(monday + timedelta(days=1), 8.0)
+
+    notify_data_changed(1, "sleep", monday + timedelta(days=1), monday + timedelta(days=1))
+
+    assert service.execute_function("get_sleep_last_week")["total_hours"] == 15.0
+
+
+def test_change_from_another_worker_is_not_served(session: Session, make_service, add_sleep):
+    service = make_service()
+    monday, _ = service.get_last_week_bounds()
+    add_sleep(monday, 7.0)
+    service.execute_function("get_sleep_last_week")
+
+    # Committed by another worker: the stored version moves, but no listener runs here
+    add_sleep(monday + timedelta(days=1), 8.0)
+    bump_version(session, 1, "sleep")
+    session.commit()
+
+    assert service.execute_function("get_sleep_last_week")["total_hours"] == 15.0
+
+
+def test_unrelated_changes_keep_the_entry(make_service):
+    service = make_service()
+    monday, _ = service.get_last_week_bounds()
+    service.execute_function("get_sleep_last_week")
+
+    notify_data_changed(2, "sleep", monday, monday)
+    notify_data_changed(1, "diet", monday, monday)
+    notify_data_changed(1, "sleep", monday - timedelta(days=30), monday - timedelta(days=8))
+
+    assert len(tool_cache) == 1
+
+
+def test_upload_and_delete_invalidate(client, make_service):
+    service = make_service()
+    monday, sunday = service.get_last_week_bounds()
+    assert service.execute_function("get_calories_last_week")["total_calories"] == 0
+
+    csv_content = f"date,calories,protein_g,carbs_g,fat_g\n{monday},2000,100,250,70\n"
+    client.post("/api/upload", files={"file": ("diet.csv", csv_content.encode(), "text/csv")})
+    assert service.execute_function("get_calories_last_week")["total_calories"] == 2000
+
+    client.delete(f"/api/diet?start_date={monday}&end_date={sunday}")
+    assert service.execute_function("get_calories_last_week")["total_calories"] == 0
+
+
+def test_unknown_function_is_not_cached(make_service):
+    result = make_service().execute_function("get_mood_last_week")
+
+    assert result == {"error": "Unknown function: get_mood_last_week"}
+    assert len(tool_cache) == 0
+
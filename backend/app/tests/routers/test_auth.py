@@ -92,6 +92,35 @@ class TestLogin:
         
         assert response.status_code == 400
         assert "detail" in response.json()
+    
+    def test_login_returns_429_when_hashing_is_saturated(self, auth_client: TestClient, monkeypatch):
+        """Test login sheds load with 429 when the hash queue is full."""
+        import threading
+        from app.services import auth as auth_service
+        monkeypatch.setattr(auth_service, "_hash_slots", threading.BoundedSemaphore(0))
+        
+        response = auth_client.post("/api/login", auth=("testuser", "testpassword"))
+        
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        assert "session" not in response.cookies
+
+    
+    def test_login_rehashes_password_with_stale_parameters(self, auth_client: TestClient, auth_session: Session):
+        """Test successful login upgrades a hash created with old Argon2 parameters."""
+        from passlib.context import CryptContext
+        from app.services.auth import pwd_context
+        old_context = CryptContext(schemes=["argon2"], argon2__memory_cost=8192, argon2__rounds=1)
+        user = User(username="legacy", hashed_password=old_context.hash("legacypass"))
+        auth_session.add(user)
+        auth_session.commit()
+        
+        response = auth_client.post("/api/login", auth=("legacy", "legacypass"))
+        
+        assert response.status_code == 200
+        auth_session.refresh(user)
+        assert not pwd_context.needs_update(user.hashed_password)
+        assert pwd_context.verify("legacypass", user.hashed_password)
 
 
 class TestProtectedEndpoints:
@@ -103,6 +132,12 @@ class TestProtectedEndpoints:
         
         assert response.status_code == 401
         assert response.json()["detail"] == "Not authenticated"
+
+    def test_metrics_require_auth(self, auth_client: TestClient):
+        """Test /api/metrics is not served to anonymous clients."""
+        response = auth_client.get("/api/metrics")
+
+        assert response.status_code == 401
     
     def test_access_protected_route_with_auth(self, auth_client: TestClient):
         """Test accessing a protected route after logging in."""
@@ -0,0 +1,292 @@
+import json
+import httpx
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from google.genai import errors
+from sqlmodel import Session
+from app.llm import resilience
+from app.models import SleepEntry
+from app.tests.conftest import function_call_response, function_calls_response, text_response
+
+
+def last_monday() -> date:
+    today = date.today()
+    return today - timedelta(days=today.weekday() + 7)
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestChat:
+    """Test POST /api/chat"""
+
+    def test_returns_direct_text_answer(self, client: TestClient, fake_genai):
+        fake_genai.queue(text_response("Hello! Ask me about your health data."))
+
+        response = client.post("/api/chat", json={"message": "hi"})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "message": "Hello! Ask me about your health data.",
+            "function_called": None,
+            "conversation_id": 1,
+        }
+
+    def test_runs_requested_function(self, client: TestClient, fake_genai, session: Session):
+        session.add(SleepEntry(date=last_monday(), hours=7.5, quality="good", user_id=1))
+        session.commit()
+        fake_genai.queue(
+            function_call_response("get_sleep_last_week"),
+            text_response("You slept 7.5 hours last week."),
+        )
+
+        response = client.post("/api/chat", json={"message": "Tell me about my sleep"})
+
+        assert response.json() == {
+            "message": "You slept 7.5 hours last week.",
+            "function_called": "get_sleep_last_week",
+            "conversation_id": 1,
+        }
+        function_response = fake_genai.calls[1]["contents"][-1]["parts"][0]["function_response"]
+        assert function_response["response"]["total_hours"] == 7.5
+
+    def test_returns_friendly_message_on_quota_error(self, client: TestClient, fake_genai):
+        # The first attempt and every retry are rate limited
+        fake_genai.queue(*[errors.ClientError(429, {"error": {"status": "RESOURCE_EXHAUSTED"}})] * 3)
+
+        response = client.post("/api/chat", json={"message": "hi"})
+
+        assert response.status_code == 200
+        assert "high demand" in response.json()["message"]
+
+    def test_fails_fast_while_upstream_is_unhealthy(self, client: TestClient, fake_genai):
+        for _ in range(resilience.breaker.threshold):
+            resilience.breaker.record_failure()
+
+        response = client.post("/api/chat", json={"message": "hi"})
+
+        assert "temporarily unavailable" in response.json()["message"]
+        assert fake_genai.calls == []
+
+
+class TestParallelFunctionCalls:
+    """Test several tool calls in one turn cost a single follow-up request"""
+
+    def test_answers_every_call_in_one_follow_up(self, client: TestClient, fake_genai, session: Session):
+        session.add(SleepEntry(date=last_monday(), hours=7.5, quality="good", user_id=1))
+        session.commit()
+        fake_genai.queue(
+            function_calls_response(("get_sleep_last_week", {}), ("get_calories_last_week", {})),
+            text_response("You slept 7.5 hours and logged no meals."),
+        )
+
+        response = client.post("/api/chat", json={"message": "Compare my sleep and calories"})
+
+        assert response.json() == {
+            "message": "You slept 7.5 hours and logged no meals.",
+            "function_called": "get_sleep_last_week, get_calories_last_week",
+            "conversation_id": 1,
+        }
+        assert len(fake_genai.calls) == 2
+        contents = fake_genai.calls[1]["contents"]
+        assert len(contents[-2]["parts"]) == 2
+        responses = [part["function_response"] for part in contents[-1]["parts"]]
+        assert [r["name"] for r in responses] == ["get_sleep_last_week", "get_calories_last_week"]
+        assert responses[0]["response"]["total_hours"] == 7.5
+
+    def test_streams_one_function_event_per_call(self, client: TestClient, fake_genai):
+        fake_genai.queue(
+            [function_calls_response(("get_sleep_last_week", {}), ("get_steps_last_week", {}))],
+            [text_response("Both were quiet.")],
+        )
+
+        response = client.post("/api/chat/stream", json={"message": "Compare sleep and steps"})
+
+        assert [name for name, _ in parse_sse(response.text)] == ["function", "function", "token", "done"]
+
+
+class TestChatFastPath:
+    """Test suggested questions are answered without calling Gemini"""
+
+    def test_answers_suggestion_locally(self, client: TestClient, fake_genai, session: Session):
+        session.add(SleepEntry(date=last_monday(), hours=7.5, quality="good", user_id=1))
+        session.add(SleepEntry(date=last_monday() + timedelta(days=1), hours=8.5, quality="good", user_id=1))
+        session.commit()
+
+        response = client.post("/api/chat", json={"message": "How much sleep did I get last week?"})
+
+        assert response.json()["function_called"] == "get_sleep_last_week"
+        assert "16 hours in total across 2 recorded nights" in response.json()["message"]
+        assert fake_genai.calls == []
+
+    def test_open_ended_question_goes_to_model(self, client: TestClient, fake_genai):
+        fake_genai.queue(text_response("Try a consistent bedtime."))
+
+        response = client.post("/api/chat", json={"message": "How can I improve my sleep from last week?"})
+
+        assert response.json()["message"] == "Try a consistent bedtime."
+        assert len(fake_genai.calls) == 1
+
+    def test_streams_local_answer(self, client: TestClient, fake_genai):
+        response = client.post("/api/chat/stream", json={"message": "How many calories did I eat last week?"})
+
+        events = parse_sse(response.text)
+        assert [name for name, _ in events] == ["function", "token", "done"]
+        assert "diet entries" in events[1][1]["text"]
+        assert fake_genai.calls == []
+
+
+class TestChatStream:
+    """Test POST /api/chat/stream"""
+
+    def test_streams_tokens_as_sse(self, client: TestClient, fake_genai):
+        fake_genai.queue([text_response("Hello"), text_response(" there")])
+
+        response = client.post("/api/chat/stream", json={"message": "hi"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert parse_sse(response.text) == [
+            ("token", {"text": "Hello"}),
+            ("token", {"text": " there"}),
+            ("done", {"function_called": None, "conversation_id": 1}),
+        ]
+
+    def test_streams_answer_after_function_call(self, client: TestClient, fake_genai):
+        fake_genai.queue(
+            [function_call_response("get_steps_last_week")],
+            [text_response("You averaged "), text_response("0 steps.")],
+        )
+
+        response = client.post("/api/chat/stream", json={"message": "How active was I?"})
+
+        assert parse_sse(response.text) == [
+            ("function", {"name": "get_steps_last_week"}),
+            ("token", {"text": "You averaged "}),
+            ("token", {"text": "0 steps."}),
+            ("done", {"function_called": "get_steps_last_week", "conversation_id": 1}),
+        ]
+
+    def test_streams_error_event(self, client: TestClient, fake_genai):
+        fake_genai.queue(*[httpx.ConnectError("connection reset")] * 3)
+
+        response = client.post("/api/chat/stream", json={"message": "hi"})
+
+        events = parse_sse(response.text)
+        assert events[-1][0] == "error"
+        assert "trouble connecting" in events[-1][1]["message"]
+
+
+class TestChatResponseCache:
+    """Test repeat questions are answered from the response cache"""
+
+    def test_repeat_question_skips_model(self, client: TestClient, fake_genai):
+        fake_genai.queue(
+            function_call_response("get_steps_last_week"),
+            text_response("You averaged 0 steps."),
+        )
+
+        first = client.post("/api/chat", json={"message": "How active was I?"})
+        second = client.post("/api/chat", json={"message": "how ACTIVE was i"})
+
+        assert second.json()["message"] == first.json()["message"]
+        assert second.json()["conversation_id"] != first.json()["conversation_id"]
+        assert len(fake_genai.calls) == 2
+
+    def test_upload_invalidates_answer(self, client: TestClient, fake_genai, valid_exercise_csv):
+        fake_genai.queue(
+            function_call_response("get_steps_last_week"),
+            text_response("You averaged 0 steps."),
+            function_call_response("get_steps_last_week"),
+            text_response("You averaged 10000 steps."),
+        )
+        client.post("/api/chat", json={"message": "How active was I?"})
+
+        client.post("/api/upload", files={"file": ("exercise.csv", valid_exercise_csv, "text/csv")})
+        response = client.post("/api/chat", json={"message": "How active was I?"})
+
+        assert response.json()["message"] == "You averaged 10000 steps."
+        assert len(fake_genai.calls) == 4
+
+    def test_stream_serves_cached_answer(self, client: TestClient, fake_genai):
+        fake_genai.queue([text_response("Hello"), text_response(" there")])
+
+        client.post("/api/chat/stream", json={"message": "hi"})
+        response = client.post("/api/chat/stream", json={"message": "hi"})
+
+        assert parse_sse(response.text) == [
+            ("token", {"text": "Hello there"}),
+            ("done", {"function_called": None, "conversation_id": 2}),
+        ]
+        assert len(fake_genai.calls) == 1
+
+
+class TestConversations:
+    """Test multi-turn conversations and GET /api/chat/history"""
+
+    def test_follow_up_sends_earlier_turns(self, client: TestClient, fake_genai):
+        fake_genai.queue(text_response("Hello!"), text_response("Sure."))
+        first = client.post("/api/chat", json={"message": "hi"})
+
+        client.post("/api/chat", json={
+            "message": "Can you help?", "conversation_id": first.json()["conversation_id"]
+        })
+
+        contents = fake_genai.calls[1]["contents"]
+        assert [c["role"] for c in contents] == ["user", "model", "user"]
+        assert contents[1]["parts"][0]["text"] == "Hello!"
+
+    def test_follow_up_is_not_answered_from_cache(self, client: TestClient, fake_genai):
+        fake_genai.queue(text_response("Hello!"), text_response("Hi again!"))
+        first = client.post("/api/chat", json={"message": "hi"})
+
+        second = client.post("/api/chat", json={
+            "message": "hi", "conversation_id": first.json()["conversation_id"]
+        })
+
+        assert second.json()["message"] == "Hi again!"
+
+    def test_unknown_conversation_returns_404(self, client: TestClient, fake_genai):
+        response = client.post("/api/chat", json={"message": "hi", "conversation_id": 99})
+
+        assert response.status_code == 404
+
+    def test_history_pages_newest_first(self, client: TestClient, fake_genai):
+        fake_genai.queue(text_response("One."), text_response("Two."))
+        conversation_id = client.post("/api/chat", json={"message": "first"}).json()["conversation_id"]
+        client.post("/api/chat", json={"message": "second", "conversation_id": conversation_id})
+
+        page = client.get("/api/chat/history", params={"limit": 3}).json()
+        older = client.get("/api/chat/history", params={
+            "conversation_id": conversation_id, "limit": 3, "before": page["next_before"]
+        }).json()
+
+        assert page["conversation_id"] == conversation_id
+        assert [m["content"] for m in page["messages"]] == ["One.", "second", "Two."]
+        assert [m["content"] for m in older["messages"]] == ["first"]
+        assert older["next_before"] is None
+
+    def test_history_is_empty_without_conversations(self, client: TestClient):
+        response = client.get("/api/chat/history")
+
+        assert response.json() == {"conversation_id": None, "messages": [], "next_before": None}
+
+    def test_stream_records_turn(self, client: TestClient, fake_genai):
+        fake_genai.queue([text_response("Hello"), text_response(" there")])
+
+        client.post("/api/chat/stream", json={"message": "hi"})
+
+        messages = client.get("/api/chat/history").json()["messages"]
+        assert [(m["role"], m["content"]) for m in messages] == [("user", "hi"), ("model", "Hello there")]
+
+
+def test_suggestions(client: TestClient):
+    response = client.get("/api/chat/suggestions")
+
+    assert response.status_code == 200
+    assert len(response.json()["suggestions"]) == 3
@@ -169,3 +169,37 @@ class TestDeleteDietEntries:
         assert "2024-01-03" not in returned_dates
         assert "2024-01-04" not in returned_dates
         assert "2024-01-05" not in returned_dates
+
+
+class TestDietFieldProjection:
+    """Test fields= and layout= on GET /api/diet"""
+    def test_returns_only_requested_fields(self, client: TestClient, diet_entries):
+        response = client.get("/api/diet?fields=date,calories")
+
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert items[0] == {"date": "2024-01-01", "calories": 1500.0}
+        assert len(items) == len(diet_entries)
+
+    def test_column_layout(self, client: TestClient, diet_entries):
+        response = client.get("/api/diet?fields=date,calories&layout=columns&start_date=2024-01-06")
+
+        assert response.json() == {"columns": {"date": ["2024-01-06", "2024-01-07"], "calories": [2500.0, 2800.0]}}
+
+    def test_column_layout_without_rows(self, client: TestClient):
+        response = client.get("/api/diet?fields=date,calories&layout=columns")
+
+        assert response.json() == {"columns": {"date": [], "calories": []}}
+
+    def test_unknown_field_is_rejected(self, client: TestClient, diet_entries):
+        response = client.get("/api/diet?fields=date,password")
+
+        assert response.status_code == 422
+        assert "password" in response.json()["detail"]
+
+    def test_projection_does_not_reuse_full_rows_from_cache(self, client: TestClient, diet_entries):
+        full = client.get("/api/diet").json()["items"]
+        projected = client.get("/api/diet?fields=calories").json()["items"]
+
+        assert set(full[0]) > {"calories"}
+        assert set(projected[0]) == {"calories"}
@@ -1,4 +1,6 @@
+from datetime import date, timedelta
 from fastapi.testclient import TestClient
+from app.models import ExerciseEntry
 
 
 class TestGetExerciseEntriesNoFilters:
@@ -198,3 +200,32 @@ class TestGetExerciseEntriesWithMultipleFilters:
             assert entry["steps"] >= 8000
             assert entry["duration_min"] >= 45
             assert entry["calories_burned"] >= 400
+
+
+class TestExerciseDownsampling:
+    """Test max_points on GET /api/exercise"""
+    def test_downsamples_to_max_points(self, client: TestClient, session, exercise_entries):
+        start = date(2024, 2, 1)
+        for day in range(400):
+            session.add(ExerciseEntry(date=start + timedelta(days=day), steps=8000 + day % 7 * 500,
+                                      duration_min=30.0, calories_burned=300.0, user_id=1))
+        session.commit()
+
+        response = client.get("/api/exercise?fields=date,steps&max_points=50")
+
+        items = response.json()["items"]
+        assert len(items) == 50
+        assert items[0]["date"] == "2024-01-01"
+        assert items[-1]["date"] == (start + timedelta(days=399)).isoformat()
+        assert [item["date"] for item in items] == sorted(item["date"] for item in items)
+
+    def test_fewer_rows_than_max_points_returns_all(self, client: TestClient, exercise_entries):
+        response = client.get("/api/exercise?max_points=100&layout=columns&fields=date,steps")
+
+        assert response.json()["columns"]["steps"] == [entry.steps for entry in exercise_entries]
+
+    def test_needs_a_numeric_field(self, client: TestClient, exercise_entries):
+        assert client.get("/api/exercise?fields=date&max_points=10").status_code == 422
+
+    def test_max_points_lower_bound(self, client: TestClient):
+        assert client.get("/api/exercise?max_points=2").status_code == 422
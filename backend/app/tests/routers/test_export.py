@@ -0,0 +1,82 @@
+import csv
+import gzip
+import io
+import json
+import zlib
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.models import SleepEntry
+from app.services.export import export_entries
+
+
+class TestExport:
+    """Test GET /api/{category}/export"""
+
+    def test_csv_export(self, client: TestClient, sleep_entries):
+        response = client.get("/api/sleep/export")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.headers["content-disposition"].startswith('attachment; filename="wellgenie-sleep-')
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == len(sleep_entries)
+        assert rows[0] == {"id": str(sleep_entries[0].id), "date": "2024-01-01", "hours": "5.5", "quality": "poor"}
+
+    def test_ndjson_export(self, client: TestClient, diet_entries):
+        response = client.get("/api/diet/export?format=ndjson")
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == len(diet_entries)
+        assert rows[-1]["calories"] == 2800.0
+        assert "user_id" not in rows[0]
+
+    def test_gzip_export(self, client: TestClient, exercise_entries):
+        response = client.get("/api/exercise/export?format=ndjson&gzip=true")
+
+        assert response.headers["content-type"] == "application/gzip"
+        assert response.headers["content-disposition"].endswith('.ndjson.gz"')
+        lines = gzip.decompress(response.content).decode().splitlines()
+        assert len(lines) == len(exercise_entries)
+
+    def test_date_range(self, client: TestClient, sleep_entries):
+        response = client.get("/api/sleep/export?start_date=2024-01-03&end_date=2024-01-05&format=ndjson")
+
+        assert [json.loads(line)["date"] for line in response.text.splitlines()] == [
+            "2024-01-03", "2024-01-04", "2024-01-05",
+        ]
+
+    def test_exports_only_current_users_entries(self, client: TestClient, session: Session, sleep_entries):
+        session.add(SleepEntry(date=date(2024, 1, 8), hours=6.0, quality="fair", user_id=2))
+        session.commit()
+
+        response = client.get("/api/sleep/export?format=ndjson")
+
+        assert len(response.text.splitlines()) == len(sleep_entries)
+
+    def test_empty_csv_has_header_only(self, client: TestClient):
+        response = client.get("/api/sleep/export")
+
+        assert response.text == "id,date,hours,quality\n"
+
+    def test_unknown_category(self, client: TestClient):
+        assert client.get("/api/chat/export").status_code == 404
+
+    def test_unknown_format(self, client: TestClient):
+        assert client.get("/api/sleep/export?format=xml").status_code == 422
+
+
+def test_export_yields_one_chunk_per_batch(session: Session, sleep_entries):
+    chunks = list(export_entries(session.get_bind(), "sleep", 1, "ndjson", batch_size=3))
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [3, 3, 1]
+
+
+def test_gzip_chunks_decompress_as_they_arrive(session: Session, sleep_entries):
+    decompressor = zlib.decompressobj(wbits=31)
+    chunks = export_entries(session.get_bind(), "sleep", 1, "csv", batch_size=2, compress=True)
+
+    header = decompressor.decompress(next(chunks))
+
+    assert header == b"id,date,hours,quality\n"
@@ -0,0 +1,74 @@
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.llm.insights import precompute_weekly_insights
+from app.models import SleepEntry
+from app.services.insights import get_insight, save_narrative, week_bounds
+
+
+def precompute(session: Session):
+    monday, _ = week_bounds(date.today())
+    session.add(SleepEntry(date=monday, hours=7.5, quality="good", user_id=1))
+    session.commit()
+    precompute_weekly_insights(session.get_bind())
+
+
+class TestWeeklyInsight:
+    """Test GET /api/insights/weekly"""
+
+    def test_returns_404_before_the_batch_ran(self, client: TestClient):
+        response = client.get("/api/insights/weekly")
+
+        assert response.status_code == 404
+
+    def test_returns_stored_insight(self, client: TestClient, session: Session):
+        precompute(session)
+
+        response = client.get("/api/insights/weekly")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["week_start"] == week_bounds(date.today())[0].isoformat()
+        assert data["results"]["get_sleep_last_week"]["total_hours"] == 7.5
+
+    def test_upload_discards_the_weeks_insight(self, client: TestClient, session: Session):
+        precompute(session)
+        monday, _ = week_bounds(date.today())
+        csv = f"date,hours,quality\n{monday.isoformat()},6.0,poor\n"
+
+        client.post("/api/upload", files={"file": ("sleep.csv", csv.encode(), "text/csv")})
+
+        assert client.get("/api/insights/weekly").status_code == 404
+
+    def test_conditional_get_until_the_narrative_is_written(self, client: TestClient, session: Session):
+        precompute(session)
+        etag = client.get("/api/insights/weekly").headers["etag"]
+
+        assert client.get("/api/insights/weekly", headers={"If-None-Match": etag}).status_code == 304
+
+        save_narrative(session, get_insight(session, 1), "A restful week.")
+        response = client.get("/api/insights/weekly", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["narrative"] == "A restful week."
+
+
+class TestChatFromInsight:
+    """Test the chat fast path answers from the stored insight"""
+
+    def test_weekly_summary_question(self, client: TestClient, fake_genai, session: Session):
+        precompute(session)
+
+        response = client.post("/api/chat", json={"message": "How was last week?"})
+
+        assert "you slept 7.5 hours" in response.json()["message"]
+        assert "I don't have any exercise entries" in response.json()["message"]
+        assert fake_genai.calls == []
+
+    def test_single_metric_question(self, client: TestClient, fake_genai, session: Session):
+        precompute(session)
+        session.add(SleepEntry(date=week_bounds(date.today())[0], hours=9.0, quality="good", user_id=1))
+        session.commit()  # bypasses upload, so the stored insight is still served
+
+        response = client.post("/api/chat", json={"message": "How much sleep did I get last week?"})
+
+        assert "7.5 hours" in response.json()["message"]
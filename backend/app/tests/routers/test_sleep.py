@@ -1,4 +1,6 @@
+from datetime import date
 from fastapi.testclient import TestClient
+from app.models import SleepEntry
 
 
 class TestGetSleepEntriesNoFilters:
@@ -187,4 +189,74 @@ class TestDeleteSleepEntries:
         returned_dates = {entry["date"] for entry in data["items"]}
         assert "2024-01-03" not in returned_dates
         assert "2024-01-04" not in returned_dates
-        assert "2024-01-05" not in returned_dates
\ No newline at end of file
+        assert "2024-01-05" not in returned_dates
+
+class TestConditionalGetSleepEntries:
+    """Test ETag / If-None-Match on GET /api/sleep"""
+    def test_returns_etag(self, client: TestClient, sleep_entries):
+        response = client.get("/api/sleep")
+
+        assert response.headers["etag"].startswith('"sleep-1-')
+        assert response.headers["cache-control"] == "private, no-cache"
+
+    def test_matching_etag_returns_304(self, client: TestClient, sleep_entries):
+        etag = client.get("/api/sleep").headers["etag"]
+
+        response = client.get("/api/sleep", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_filters_change_the_etag(self, client: TestClient, sleep_entries):
+        all_entries = client.get("/api/sleep").headers["etag"]
+        filtered = client.get("/api/sleep?quality=good").headers["etag"]
+
+        assert filtered != all_entries
+        response = client.get("/api/sleep?quality=good", headers={"If-None-Match": all_entries})
+        assert response.status_code == 200
+
+    def test_delete_invalidates_etag(self, client: TestClient, sleep_entries):
+        etag = client.get("/api/sleep").headers["etag"]
+
+        client.delete("/api/sleep?start_date=2024-01-03&end_date=2024-01-05")
+        response = client.get("/api/sleep", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 4
+        assert response.headers["etag"] != etag
+
+    def test_upload_invalidates_etag(self, client: TestClient, sleep_entries, valid_sleep_csv):
+        etag = client.get("/api/sleep").headers["etag"]
+
+        client.post("/api/upload", files={"file": ("sleep.csv", valid_sleep_csv, "text/csv")})
+        response = client.get("/api/sleep", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == len(sleep_entries) + 3
+
+    def test_lists_only_current_users_entries(self, client: TestClient, session, sleep_entries):
+        session.add(SleepEntry(date=date(2024, 1, 8), hours=6.0, quality="fair", user_id=2))
+        session.commit()
+
+        response = client.get("/api/sleep")
+
+        assert len(response.json()["items"]) == len(sleep_entries)
+
+
+class TestSleepQueryCache:
+    """Test the query result cache behind GET /api/sleep"""
+    def test_repeat_query_is_served_from_cache(self, client: TestClient, session, sleep_entries):
+        first = client.get("/api/sleep?quality=excellent").json()
+        # Written behind the app's back: no version bump, so the cached result stays
+        session.add(SleepEntry(date=date(2024, 1, 8), hours=9.5, quality="excellent", user_id=1))
+        session.commit()
+
+        assert client.get("/api/sleep?quality=excellent").json() == first
+
+    def test_upload_invalidates_cached_results(self, client: TestClient, sleep_entries, valid_sleep_csv):
+        client.get("/api/sleep")
+
+        client.post("/api/upload", files={"file": ("sleep.csv", valid_sleep_csv, "text/csv")})
+
+        assert len(client.get("/api/sleep").json()["items"]) == len(sleep_entries) + 3
@@ -0,0 +1,136 @@
+import pytest
+from datetime import date
+from sqlmodel import Session
+from app.models import DietEntry, SleepEntry
+from app.services import analytics
+from app.services.analytics import AnalyticsError, MetricQuery, build_query, run_metric_query, run_weekly_tool
+
+
+@pytest.fixture(name="march_sleep")
+def march_sleep_fixture(session: Session):
+    """Sleep for user 1 across two months, plus one row for user 2"""
+    entries = [
+        SleepEntry(date=date(2024, 2, 28), hours=5.0, quality="poor", user_id=1),
+        SleepEntry(date=date(2024, 3, 4), hours=7.0, quality="good", user_id=1),
+        SleepEntry(date=date(2024, 3, 5), hours=8.0, quality="good", user_id=1),
+        SleepEntry(date=date(2024, 3, 12), hours=9.0, quality="excellent", user_id=1),
+        SleepEntry(date=date(2024, 3, 12), hours=12.0, quality="excellent", user_id=2),
+    ]
+    session.add_all(entries)
+    session.commit()
+    return entries
+
+
+class TestSummary:
+    """Test single-value aggregation"""
+
+    def test_average_over_range(self, session: Session, march_sleep):
+        query = MetricQuery("sleep_hours", "avg", date(2024, 3, 1), date(2024, 3, 31))
+
+        result = run_metric_query(session, 1, query)
+
+        assert result["value"] == 8.0
+        assert result["days_recorded"] == 3
+
+    def test_sum_only_counts_the_users_rows(self, session: Session, march_sleep):
+        query = MetricQuery("sleep_hours", "sum", date(2024, 3, 12), date(2024, 3, 12))
+
+        assert run_metric_query(session, 1, query)["value"] == 9.0
+        assert run_metric_query(session, 2, query)["value"] == 12.0
+
+    def test_empty_range_returns_no_value(self, session: Session):
+        query = MetricQuery("calories", "avg", date(2024, 3, 1), date(2024, 3, 31))
+
+        result = run_metric_query(session, 1, query)
+
+        assert result["value"] is None
+        assert result["days_recorded"] == 0
+
+
+class TestTrend:
+    """Test bucketed aggregation"""
+
+    def test_groups_by_week_starting_monday(self, session: Session, march_sleep):
+        query = MetricQuery("sleep_hours", "max", date(2024, 2, 1), date(2024, 3, 31), bucket="week")
+
+        result = run_metric_query(session, 1, query)
+
+        assert result["buckets"] == [
+            {"period": "2024-02-26", "value": 5.0, "days_recorded": 1},
+            {"period": "2024-03-04", "value": 8.0, "days_recorded": 2},
+            {"period": "2024-03-11", "value": 9.0, "days_recorded": 1},
+        ]
+        assert result["truncated"] is False
+
+    def test_groups_by_month(self, session: Session, march_sleep):
+        query = MetricQuery("sleep_hours", "count", date(2024, 1, 1), date(2024, 12, 31), bucket="month")
+
+        result = run_metric_query(session, 1, query)
+
+        assert [(b["period"], b["value"]) for b in result["buckets"]] == [("2024-02", 1), ("2024-03", 3)]
+
+    def test_caps_number_of_buckets(self, session: Session, march_sleep, monkeypatch):
+        monkeypatch.setattr(analytics, "MAX_BUCKETS", 2)
+        query = MetricQuery("sleep_hours", "avg", date(2024, 1, 1), date(2024, 12, 31), bucket="day")
+
+        result = run_metric_query(session, 1, query)
+
+        assert len(result["buckets"]) == 2
+        assert result["truncated"] is True
+
+    def test_compiles_to_one_grouped_query(self):
+        query = MetricQuery("protein_g", "avg", date(2024, 1, 1), date(2024, 3, 31), bucket="week")
+
+        sql = str(build_query(1, query)).upper()
+
+        assert "GROUP BY" in sql
+        assert "AVG(DIETENTRY.PROTEIN_G)" in sql
+
+
+class TestFromArgs:
+    """Test validation of loosely typed arguments"""
+
+    def test_parses_valid_arguments(self):
+        query = MetricQuery.from_args({
+            "metric": "protein_g", "aggregation": "avg",
+            "start_date": "2024-01-01", "end_date": "2024-03-31", "bucket": "week",
+        })
+
+        assert query == MetricQuery("protein_g", "avg", date(2024, 1, 1), date(2024, 3, 31), "week")
+        assert query.category == "diet"
+
+    @pytest.mark.parametrize("args", [
+        {"metric": "mood", "aggregation": "avg", "start_date": "2024-01-01", "end_date": "2024-01-31"},
+        {"metric": "steps", "aggregation": "median", "start_date": "2024-01-01", "end_date": "2024-01-31"},
+        {"metric": "steps", "aggregation": "avg", "start_date": "January", "end_date": "2024-01-31"},
+        {"metric": "steps", "aggregation": "avg", "start_date": "2024-02-01", "end_date": "2024-01-31"},
+        {"metric": "steps", "aggregation": "avg", "start_date": "2024-01-01", "end_date": "2024-01-31", "bucket": "year"},
+    ])
+    def test_rejects_invalid_arguments(self, args):
+        with pytest.raises(AnalyticsError):
+            MetricQuery.from_args(args)
+
+
+def test_weekly_tool_aggregates_the_users_week(session: Session, march_sleep):
+    result = run_weekly_tool(session, 1, "get_sleep_last_week", date(2024, 3, 4), date(2024, 3, 10))
+
+    assert result == {"total_hours": 15.0, "days_recorded": 2, "week": "2024-03-04 to 2024-03-10"}
+    assert run_weekly_tool(session, 1, "get_mood_last_week", date(2024, 3, 4), date(2024, 3, 10)) == {
+        "error": "Unknown function: get_mood_last_week"
+    }
+
+
+def test_chat_tools_use_the_engine(session: Session, make_service):
+    session.add(DietEntry(date=date(2024, 1, 2), calories=2000, protein_g=100, carbs_g=200, fat_g=50, user_id=1))
+    session.commit()
+    service = make_service()
+
+    summary = service.execute_function("get_metric_summary", {
+        "metric": "protein_g", "aggregation": "sum", "start_date": "2024-01-01", "end_date": "2024-01-31",
+    })
+    trend = service.execute_function("get_metric_trend", {
+        "metric": "protein_g", "aggregation": "sum", "start_date": "2024-01-01", "end_date": "2024-01-31",
+    })
+
+    assert summary["value"] == 100.0
+    assert "error" in trend
@@ -1,5 +1,18 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pytest
-from app.services.auth import verify_password, get_password_hash
+from passlib.context import CryptContext
+from app.services import auth as auth_service
+from app.services import metrics
+from app.services.auth import (
+    HashingOverloadedError,
+    get_password_hash,
+    get_password_hash_async,
+    verify_and_update_password,
+    verify_password,
+    verify_password_async,
+)
 
 def test_get_password_hash():
     password = "securepassword"
@@ -13,4 +26,87 @@ def test_verify_password():
     hashed_password = get_password_hash(password)
 
     assert verify_password(password, hashed_password)  # Ensure the password matches the hash
-    assert not verify_password("wrongpassword", hashed_password)  # Ensure a wrong password does not match
\ No newline at end of file
+    assert not verify_password("wrongpassword", hashed_password)  # Ensure a wrong password does not match
+
+@pytest.mark.asyncio
+async def test_verify_password_async():
+    hashed_password = get_password_hash("securepassword")
+
+    assert await verify_password_async("securepassword", hashed_password)
+    assert not await verify_password_async("wrongpassword", hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_get_password_hash_async():
+    hashed_password = await get_password_hash_async("securepassword")
+
+    assert verify_password("securepassword", hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_verifications_release_slots():
+    hashed_password = get_password_hash("securepassword")
+
+    results = await asyncio.gather(
+        *(verify_password_async("securepassword", hashed_password) for _ in range(6))
+    )
+
+    assert all(results)
+    assert metrics.gauges["auth_hash_in_flight"] == 0
+    assert metrics.gauges["auth_hash_queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_hash_gives_its_slot_back(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(auth_service, "_hash_executor", ThreadPoolExecutor(max_workers=1))
+    slots = threading.BoundedSemaphore(2)
+    monkeypatch.setattr(auth_service, "_hash_slots", slots)
+
+    running = asyncio.create_task(auth_service._run_hash(release.wait))
+    queued = asyncio.create_task(auth_service._run_hash(release.wait))
+    await asyncio.sleep(0.05)
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    release.set()
+    await running
+
+    assert auth_service._admitted == 0
+    assert slots.acquire(blocking=False) and slots.acquire(blocking=False)
+    assert metrics.gauges["auth_hash_queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full(monkeypatch):
+    monkeypatch.setattr(auth_service, "_hash_slots", threading.BoundedSemaphore(0))
+    before = metrics.counters.get("auth_hash_rejected_total", 0)
+
+    with pytest.raises(HashingOverloadedError):
+        await verify_password_async("securepassword", "irrelevant")
+
+    assert metrics.counters["auth_hash_rejected_total"] == before + 1
+
+
+def test_verify_and_update_keeps_current_hash():
+    hashed_password = get_password_hash("securepassword")
+
+    assert verify_and_update_password("securepassword", hashed_password) == (True, None)
+
+
+def test_verify_and_update_rehashes_stale_parameters():
+    old_context = CryptContext(schemes=["argon2"], argon2__memory_cost=8192, argon2__rounds=1)
+    stale_hash = old_context.hash("securepassword")
+
+    ok, new_hash = verify_and_update_password("securepassword", stale_hash)
+
+    assert ok
+    assert new_hash is not None
+    assert verify_password("securepassword", new_hash)
+
+
+def test_verify_and_update_wrong_password_never_rehashes():
+    old_context = CryptContext(schemes=["argon2"], argon2__memory_cost=8192, argon2__rounds=1)
+    stale_hash = old_context.hash("securepassword")
+
+    assert verify_and_update_password("wrongpassword", stale_hash) == (False, None)
@@ -0,0 +1,96 @@
+from app.services import metrics
+from app.services.cache import MISSING, LRUCache
+
+
+def test_get_returns_stored_value():
+    cache = LRUCache("test")
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+
+
+def test_get_returns_missing_for_unknown_key():
+    cache = LRUCache("test")
+
+    assert cache.get("a") is MISSING
+    assert cache.get("a", None) is None
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache("test", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is MISSING
+    assert cache.get("c") == 3
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUCache("test", ttl=10, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 9
+    assert cache.get("a") == 1
+    clock.now = 11
+    assert cache.get("a") is MISSING
+    assert len(cache) == 0
+
+
+def test_invalidate_drops_matching_keys():
+    cache = LRUCache("test")
+    cache.set((1, "x"), "user 1")
+    cache.set((2, "x"), "user 2")
+
+    dropped = cache.invalidate(lambda key, value: key[0] == 1)
+
+    assert dropped == 1
+    assert cache.get((1, "x")) is MISSING
+    assert cache.get((2, "x")) == "user 2"
+
+
+def test_reports_hits_and_misses():
+    metrics.reset()
+    cache = LRUCache("test")
+    cache.set("a", 1)
+
+    cache.get("a")
+    cache.get("b")
+
+    assert metrics.counters['cache_hits_total{cache="test"}'] == 1
+    assert metrics.counters['cache_misses_total{cache="test"}'] == 1
+
+
+def test_evicts_to_stay_within_byte_budget():
+    cache = LRUCache("test", max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "yyyy")
+
+    cache.set("c", "zzzz")
+
+    assert cache.get("a") is MISSING
+    assert cache.get("c") == "zzzz"
+    assert cache.bytes == 8
+
+
+def test_skips_values_larger_than_budget():
+    cache = LRUCache("test", max_bytes=4, sizeof=len)
+    cache.set("a", "xx")
+
+    cache.set("b", "too large")
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == "xx"
+
+
+def test_reports_hit_ratio():
+    metrics.reset()
+    cache = LRUCache("ratio")
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+
+    assert metrics.snapshot()["gauges"]['cache_hit_ratio{cache="ratio"}'] == 0.5
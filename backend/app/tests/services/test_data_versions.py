@@ -0,0 +1,45 @@
+from starlette.requests import Request
+from sqlmodel import Session
+from app.services.data_versions import bump_version, current_version, not_modified, resource_etag
+
+
+def make_request(query: str = "", if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/api/sleep",
+                    "query_string": query.encode(), "headers": headers})
+
+
+def test_version_starts_at_zero(session: Session):
+    assert current_version(session, 1, "sleep") == 0
+
+
+def test_bump_is_per_user_and_category(session: Session):
+    bump_version(session, 1, "sleep")
+    bump_version(session, 1, "sleep")
+    bump_version(session, 2, "sleep")
+    session.commit()
+
+    assert current_version(session, 1, "sleep") == 2
+    assert current_version(session, 2, "sleep") == 1
+    assert current_version(session, 1, "diet") == 0
+
+
+def test_etag_ignores_query_parameter_order():
+    first = resource_etag(make_request("start_date=2024-01-01&quality=good"), 1, "sleep", 0)
+    second = resource_etag(make_request("quality=good&start_date=2024-01-01"), 1, "sleep", 0)
+
+    assert first == second
+
+
+def test_etag_changes_with_version():
+    assert resource_etag(make_request(), 1, "sleep", 1) != resource_etag(make_request(), 1, "sleep", 2)
+
+
+def test_not_modified_matching():
+    etag = '"sleep-1-3-abc"'
+
+    assert not_modified(make_request(if_none_match=etag), etag)
+    assert not_modified(make_request(if_none_match=f'"other", W/{etag}'), etag)
+    assert not_modified(make_request(if_none_match="*"), etag)
+    assert not not_modified(make_request(if_none_match='"sleep-1-2-abc"'), etag)
+    assert not not_modified(make_request(), etag)
@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+import numpy as np
+from app.services.downsample import downsample_rows, lttb_indices
+
+
+def test_short_series_is_unchanged():
+    x = np.arange(5.0)
+
+    assert list(lttb_indices(x, x, 10)) == [0, 1, 2, 3, 4]
+
+
+def test_keeps_endpoints_and_requested_count():
+    x = np.arange(1000.0)
+    y = np.sin(x / 50)
+
+    kept = lttb_indices(x, y, 100)
+
+    assert len(kept) == 100
+    assert kept[0] == 0 and kept[-1] == 999
+    assert np.all(np.diff(kept) > 0)
+
+
+def test_keeps_spikes():
+    x = np.arange(500.0)
+    y = np.zeros(500)
+    y[137] = 50.0
+    y[402] = -30.0
+
+    kept = lttb_indices(x, y, 20)
+
+    assert 137 in kept and 402 in kept
+
+
+def test_one_point_per_bucket():
+    x = np.arange(102.0)
+    y = np.random.default_rng(1).normal(size=102)
+
+    kept = lttb_indices(x, y, 12)
+
+    # 100 interior points in 10 buckets of 10
+    assert [int(i - 1) // 10 for i in kept[1:-1]] == list(range(10))
+
+
+def test_downsample_rows_uses_dates_as_x():
+    start = date(2020, 1, 1)
+    rows = [(start + timedelta(days=i), 8000 + (5000 if i == 300 else 0)) for i in range(1800)]
+
+    kept = downsample_rows(rows, x_index=0, y_index=1, max_points=200)
+
+    assert len(kept) == 200
+    assert kept[0] == rows[0] and kept[-1] == rows[-1]
+    assert rows[300] in kept
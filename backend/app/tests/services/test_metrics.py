@@ -0,0 +1,50 @@
+import pytest
+from app.services import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_inc_accumulates_counter():
+    metrics.inc("requests_total")
+    metrics.inc("requests_total", 2)
+
+    assert metrics.counters["requests_total"] == 3
+
+
+def test_labels_are_part_of_the_key():
+    metrics.inc("rejected_total", group="chat")
+    metrics.inc("rejected_total", group="auth")
+
+    assert metrics.counters['rejected_total{group="chat"}'] == 1
+    assert metrics.counters['rejected_total{group="auth"}'] == 1
+
+
+def test_set_gauge_overwrites():
+    metrics.set_gauge("queue_depth", 5)
+    metrics.set_gauge("queue_depth", 2)
+
+    assert metrics.gauges["queue_depth"] == 2
+
+
+def test_observe_fills_cumulative_buckets():
+    metrics.observe("latency_seconds", 0.02, buckets=(0.01, 0.05, 0.1))
+    metrics.observe("latency_seconds", 0.07, buckets=(0.01, 0.05, 0.1))
+
+    hist = metrics.snapshot()["histograms"]["latency_seconds"]
+    assert hist["buckets"] == {"0.01": 0, "0.05": 1, "0.1": 2}
+    assert hist["count"] == 2
+    assert hist["sum"] == pytest.approx(0.09)
+
+
+def test_metrics_endpoint_returns_snapshot(client):
+    metrics.inc("requests_total")
+
+    response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.json()["counters"]["requests_total"] == 1
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+from datetime import date
+import orjson
+import pytest
+from sqlmodel import Session, select
+from app.models import SleepEntry
+from app.services import metrics
+from app.services.data_events import notify_data_changed
+from app.services.query_cache import (
+    MemoryResultStore, QueryCache, SQLiteResultStore, encode_items, normalize_filters, query_cache, read_entries,
+)
+
+BODY = b'{"items":[{"id":1,"user_id":1,"date":"2024-01-01","hours":7.5,"quality":"good"}]}'
+
+
+def test_normalize_filters_ignores_order_and_unset_filters():
+    assert normalize_filters({"quality": "good", "start_date": date(2024, 1, 1), "end_date": None}) == \
+        normalize_filters({"start_date": date(2024, 1, 1), "quality": "good"})
+
+
+def test_hit_requires_same_version_and_filters():
+    cache = QueryCache(MemoryResultStore())
+    cache.set(1, "sleep", 3, {"quality": "good"}, BODY)
+
+    assert cache.get(1, "sleep", 3, {"quality": "good"}) == BODY
+    assert cache.get(1, "sleep", 4, {"quality": "good"}) is None
+    assert cache.get(1, "sleep", 3, {}) is None
+    assert cache.get(2, "sleep", 3, {"quality": "good"}) is None
+
+
+def test_invalidate_drops_only_that_user_and_category():
+    cache = QueryCache(MemoryResultStore())
+    cache.set(1, "sleep", 0, {}, BODY)
+    cache.set(1, "diet", 0, {}, BODY)
+    cache.set(2, "sleep", 0, {}, BODY)
+
+    assert cache.invalidate(1, "sleep") == 1
+
+    assert cache.get(1, "sleep", 0, {}) is None
+    assert cache.get(1, "diet", 0, {}) == BODY
+    assert cache.get(2, "sleep", 0, {}) == BODY
+
+
+def test_data_change_invalidates_shared_cache():
+    query_cache.set(1, "sleep", 0, {}, BODY)
+
+    notify_data_changed(1, "sleep", date(2024, 1, 1), date(2024, 1, 1))
+
+    assert query_cache.get(1, "sleep", 0, {}) is None
+
+
+def test_memory_store_reports_metrics():
+    metrics.reset()
+    cache = QueryCache(MemoryResultStore())
+    cache.set(1, "sleep", 0, {}, BODY)
+    cache.get(1, "sleep", 0, {})
+    cache.get(1, "sleep", 1, {})
+
+    assert metrics.gauges['cache_hit_ratio{cache="entry_queries"}'] == 0.5
+    assert metrics.gauges['cache_bytes{cache="entry_queries"}'] > 0
+    metrics.reset()
+
+
+def test_disabled_cache_never_hits():
+    cache = QueryCache(MemoryResultStore(), enabled=False)
+    cache.set(1, "sleep", 0, {}, BODY)
+
+    assert cache.get(1, "sleep", 0, {}) is None
+
+
+class TestSQLiteResultStore:
+    def test_entries_are_shared_between_workers(self, tmp_path):
+        path = str(tmp_path / "queries.db")
+        first = QueryCache(SQLiteResultStore(path))
+        second = QueryCache(SQLiteResultStore(path))
+
+        first.set(1, "sleep", 2, {"quality": "good"}, BODY)
+
+        assert second.get(1, "sleep", 2, {"quality": "good"}) == BODY
+        second.invalidate(1, "sleep")
+        assert first.get(1, "sleep", 2, {"quality": "good"}) is None
+
+    def test_expired_entries_miss(self, tmp_path):
+        now = [1000.0]
+        cache = QueryCache(SQLiteResultStore(str(tmp_path / "queries.db"), ttl=10, clock=lambda: now[0]))
+        cache.set(1, "sleep", 0, {}, BODY)
+
+        now[0] += 11
+
+        assert cache.get(1, "sleep", 0, {}) is None
+
+    def test_evicts_least_recently_used_beyond_budget(self, tmp_path):
+        now = [1000.0]
+        size = len(BODY)
+        store = SQLiteResultStore(str(tmp_path / "queries.db"), max_bytes=2 * size + 10, clock=lambda: now[0])
+        cache = QueryCache(store)
+        for version in range(3):
+            now[0] += 1
+            cache.set(1, "sleep", version, {}, BODY)
+            if version == 1:
+                now[0] += 1
+                cache.get(1, "sleep", 0, {})
+
+        assert cache.get(1, "sleep", 0, {}) == BODY
+        assert cache.get(1, "sleep", 1, {}) is None
+        assert cache.get(1, "sleep", 2, {}) == BODY
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_reads_share_one_query(session: Session, sleep_entries):
+    metrics.reset()
+    query = select(SleepEntry).where(SleepEntry.user_id == 1)
+
+    results = await asyncio.gather(*(
+        read_entries(session.get_bind(), 1, "sleep", 0, {}, query) for _ in range(3)
+    ))
+
+    assert all(body == results[0] for body in results)
+    assert len(orjson.loads(results[0])["items"]) == len(sleep_entries)
+    assert metrics.counters['singleflight_executions_total{group="entry_reads"}'] == 1
+    assert metrics.counters['singleflight_shared_total{group="entry_reads"}'] == 2
+    # Stored by the one execution, so the next read is a cache hit
+    assert query_cache.get(1, "sleep", 0, {}) == results[0]
+    metrics.reset()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_lookups_run_off_the_event_loop(session: Session, sleep_entries, tmp_path, monkeypatch):
+    threads = []
+
+    class RecordingStore(SQLiteResultStore):
+        def get(self, key):
+            threads.append(threading.get_ident())
+            return super().get(key)
+
+    monkeypatch.setattr(query_cache, "store", RecordingStore(str(tmp_path / "queries.db")))
+    query = select(SleepEntry).where(SleepEntry.user_id == 1)
+
+    first = await read_entries(session.get_bind(), 1, "sleep", 0, {}, query)
+    second = await read_entries(session.get_bind(), 1, "sleep", 0, {}, query)
+
+    assert first == second
+    assert len(threads) == 2 and threading.get_ident() not in threads
+
+
+def test_encoded_items_match_the_model_serialization(session: Session, sleep_entries):
+    body = encode_items(session.get_bind(), select(SleepEntry).where(SleepEntry.user_id == 1))
+
+    assert orjson.loads(body) == {"items": [entry.model_dump(mode="json") for entry in sleep_entries]}
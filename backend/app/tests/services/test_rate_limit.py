@@ -0,0 +1,144 @@
+import pytest
+from io import BytesIO
+from fastapi.testclient import TestClient
+from app.services import metrics, rate_limit
+from app.services.rate_limit import (
+    MemoryBucketStore,
+    RateLimiter,
+    Rule,
+    SQLiteBucketStore,
+    parse_rule,
+    route_group,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteBucketStore(str(tmp_path / "ratelimit.db"))
+    return MemoryBucketStore()
+
+
+class TestTokenBucket:
+    """Test bucket accounting for both backends"""
+
+    def test_allows_burst_up_to_capacity(self, store, clock):
+        limiter = RateLimiter({"chat": Rule(3, 60)}, store, clock=clock)
+
+        decisions = [limiter.hit("chat", "user:1") for _ in range(4)]
+
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+        assert [d.remaining for d in decisions[:3]] == [2, 1, 0]
+
+    def test_retry_after_matches_refill_rate(self, store, clock):
+        limiter = RateLimiter({"chat": Rule(2, 60)}, store, clock=clock)
+        limiter.hit("chat", "user:1")
+        limiter.hit("chat", "user:1")
+
+        decision = limiter.hit("chat", "user:1")
+
+        assert not decision.allowed
+        assert decision.retry_after == 30
+
+    def test_refills_over_time(self, store, clock):
+        limiter = RateLimiter({"chat": Rule(2, 60)}, store, clock=clock)
+        limiter.hit("chat", "user:1")
+        limiter.hit("chat", "user:1")
+
+        clock.now += 30
+
+        assert limiter.hit("chat", "user:1").allowed
+        assert not limiter.hit("chat", "user:1").allowed
+
+    def test_identities_have_separate_buckets(self, store, clock):
+        limiter = RateLimiter({"chat": Rule(1, 60)}, store, clock=clock)
+
+        assert limiter.hit("chat", "user:1").allowed
+        assert limiter.hit("chat", "user:2").allowed
+        assert not limiter.hit("chat", "user:1").allowed
+
+    def test_unknown_group_is_unlimited(self, store, clock):
+        limiter = RateLimiter({"chat": Rule(1, 60)}, store, clock=clock)
+
+        assert limiter.hit("reads", "user:1") is None
+
+    def test_counts_allowed_and_rejected(self, store, clock):
+        metrics.reset()
+        limiter = RateLimiter({"upload": Rule(1, 60)}, store, clock=clock)
+
+        limiter.hit("upload", "ip:1.2.3.4")
+        limiter.hit("upload", "ip:1.2.3.4")
+
+        assert metrics.counters['rate_limit_allowed_total{group="upload"}'] == 1
+        assert metrics.counters['rate_limit_rejected_total{group="upload"}'] == 1
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path, clock):
+    path = str(tmp_path / "ratelimit.db")
+    worker_a = RateLimiter({"chat": Rule(1, 60)}, SQLiteBucketStore(path), clock=clock)
+    worker_b = RateLimiter({"chat": Rule(1, 60)}, SQLiteBucketStore(path), clock=clock)
+
+    assert worker_a.hit("chat", "user:1").allowed
+    assert not worker_b.hit("chat", "user:1").allowed
+
+
+def test_parse_rule():
+    assert parse_rule("20/60") == Rule(20, 60.0)
+
+
+@pytest.mark.parametrize("method,path,group", [
+    ("POST", "/api/login", "auth"),
+    ("POST", "/api/upload", "upload"),
+    ("POST", "/api/chat", "chat"),
+    ("POST", "/api/chat/stream", "chat"),
+    ("GET", "/api/chat/suggestions", "reads"),
+    ("GET", "/api/chat/history", "reads"),
+    ("GET", "/api/sleep", "reads"),
+    ("DELETE", "/api/sleep", None),
+    ("GET", "/", None),
+])
+def test_route_group(method, path, group):
+    assert route_group(method, path) == group
+
+
+@pytest.mark.parametrize("peer,forwarded_for,address", [
+    ("203.0.113.5", None, "203.0.113.5"),
+    ("203.0.113.5", "198.51.100.7", "203.0.113.5"),  # untrusted peer: header ignored
+    ("172.28.0.10", "198.51.100.7", "198.51.100.7"),
+    ("172.28.0.10", "1.2.3.4, 198.51.100.7", "198.51.100.7"),  # forged hop on the left
+    ("172.28.0.10", None, "172.28.0.10"),
+])
+def test_client_address(monkeypatch, peer, forwarded_for, address):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUSTED_PROXIES", rate_limit._parse_networks("172.28.0.10/32"))
+
+    assert rate_limit.client_address(peer, forwarded_for) == address
+
+
+class TestRateLimitMiddleware:
+    """Test the middleware through the API"""
+
+    def test_returns_429_with_retry_after(self, client: TestClient, monkeypatch):
+        monkeypatch.setitem(rate_limit.limiter.rules, "upload", Rule(1, 60))
+        files = {"file": ("notes.txt", BytesIO(b"x"), "text/plain")}
+
+        first = client.post("/api/upload", files=files)
+        second = client.post("/api/upload", files=files)
+
+        assert first.status_code == 400
+        assert second.status_code == 429
+        assert second.headers["Retry-After"] == "60"
+        assert second.headers["X-RateLimit-Remaining"] == "0"
+
+    def test_adds_limit_headers_to_allowed_responses(self, client: TestClient, monkeypatch):
+        monkeypatch.setitem(rate_limit.limiter.rules, "reads", Rule(5, 60))
+
+        response = client.get("/api/sleep")
+
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Limit"] == "5"
+        assert response.headers["X-RateLimit-Remaining"] == "4"
+
+    def test_ungrouped_routes_are_not_limited(self, client: TestClient):
+        response = client.get("/")
+
+        assert "X-RateLimit-Limit" not in response.headers
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.services import metrics
+from app.services.single_flight import SingleFlight
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def slow_load(calls: list, result="rows", delay: float = 0.05):
+    def load():
+        calls.append(1)
+        time.sleep(delay)
+        return result
+    return load
+
+
+class TestThreads:
+    def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight("test")
+        calls: list = []
+        load = slow_load(calls, delay=0.2)
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: flight.do("key", load), range(5)))
+
+        assert results == ["rows"] * 5
+        assert len(calls) == 1
+        assert metrics.counters['singleflight_executions_total{group="test"}'] == 1
+        assert metrics.counters['singleflight_shared_total{group="test"}'] == 4
+
+    def test_error_reaches_every_waiter(self):
+        flight = SingleFlight("test")
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError("database locked")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "key", failing)
+            started.wait()
+            follower = pool.submit(flight.do, "key", failing)
+            for future in (leader, follower):
+                with pytest.raises(ValueError):
+                    future.result()
+
+    def test_finished_load_is_not_reused(self):
+        flight = SingleFlight("test")
+        calls: list = []
+
+        flight.do("key", slow_load(calls, delay=0))
+        flight.do("key", slow_load(calls, delay=0))
+
+        assert len(calls) == 2
+
+
+class TestAsync:
+    @pytest.mark.asyncio
+    async def test_concurrent_awaiters_share_one_execution(self):
+        flight = SingleFlight("test")
+        calls: list = []
+        load = slow_load(calls)
+
+        results = await asyncio.gather(*(flight.run("key", load) for _ in range(5)))
+
+        assert results == ["rows"] * 5
+        assert len(calls) == 1
+        assert metrics.counters['singleflight_shared_total{group="test"}'] == 4
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        flight = SingleFlight("test")
+        calls: list = []
+
+        await asyncio.gather(flight.run("a", slow_load(calls)), flight.run("b", slow_load(calls)))
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_fail_the_others(self):
+        flight = SingleFlight("test")
+        calls: list = []
+        load = slow_load(calls, delay=0.1)
+
+        first = asyncio.ensure_future(flight.run("key", load))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.run("key", load))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "rows"
+        assert len(calls) == 1
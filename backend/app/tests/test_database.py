@@ -0,0 +1,69 @@
+from sqlalchemy import inspect, text
+from sqlmodel import create_engine
+from sqlmodel.pool import StaticPool
+from app import database
+from app.database import SCHEMA_VERSION, ensure_schema, schema_version
+
+
+def file_engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+
+
+def test_new_database_gets_tables_and_version(tmp_path):
+    engine = file_engine(tmp_path)
+
+    assert ensure_schema(engine) is True
+
+    assert schema_version(engine) == SCHEMA_VERSION
+    assert {"user", "sleepentry", "chatmessage"} <= set(inspect(engine).get_table_names())
+    assert (tmp_path / "test.db.lock").exists()
+
+
+def test_current_schema_skips_ddl(tmp_path, monkeypatch):
+    engine = file_engine(tmp_path)
+    ensure_schema(engine)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("create_all should not run")
+    monkeypatch.setattr(database.SQLModel.metadata, "create_all", fail)
+
+    assert ensure_schema(engine) is False
+
+
+def test_stale_version_adds_missing_tables(tmp_path, monkeypatch):
+    engine = file_engine(tmp_path)
+    ensure_schema(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE weeklyinsight"))
+    monkeypatch.setattr(database, "SCHEMA_VERSION", SCHEMA_VERSION + 1)
+
+    assert ensure_schema(engine) is True
+
+    assert "weeklyinsight" in inspect(engine).get_table_names()
+    assert schema_version(engine) == SCHEMA_VERSION + 1
+
+
+def test_upgrade_adds_indexes_to_existing_tables(tmp_path):
+    engine = file_engine(tmp_path)
+    ensure_schema(engine)
+    # The baseline schema: the same tables, unstamped, without the composite indexes
+    added = ["ix_sleepentry_user_id_date", "ix_exerciseentry_user_id_date",
+             "ix_dietentry_user_id_date", "ix_chatmessage_conversation_id_id"]
+    with engine.begin() as conn:
+        for name in added:
+            conn.execute(text(f"DROP INDEX {name}"))
+        conn.execute(text("PRAGMA user_version = 0"))
+
+    assert ensure_schema(engine) is True
+
+    inspector = inspect(engine)
+    indexes = {index["name"] for table in inspector.get_table_names() for index in inspector.get_indexes(table)}
+    assert set(added) <= indexes
+    assert schema_version(engine) == SCHEMA_VERSION
+
+
+def test_in_memory_database_needs_no_lock():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    assert ensure_schema(engine) is True
+    assert schema_version(engine) == SCHEMA_VERSION
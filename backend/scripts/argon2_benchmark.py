@@ -0,0 +1,95 @@
+"""
+Argon2 cost benchmark for WellGenie
+
+Measures password verification latency across memory_cost, time_cost and
+parallelism settings on this machine and recommends the strongest settings
+that stay under a target latency.
+
+Run from the backend directory:
+    uv run python -m scripts.argon2_benchmark --target-ms 250
+
+Apply the result through ARGON2_MEMORY_COST / ARGON2_TIME_COST /
+ARGON2_PARALLELISM. Existing users are rehashed on their next login.
+"""
+import argparse
+import statistics
+import time
+from argon2 import PasswordHasher
+
+DEFAULT_MEMORY_COSTS = [19456, 32768, 65536, 131072]  # KiB
+DEFAULT_TIME_COSTS = [1, 2, 3, 4]
+DEFAULT_PARALLELISMS = [1, 2, 4]
+
+
+def measure(memory_cost: int, time_cost: int, parallelism: int, iterations: int) -> dict:
+    """Return latency statistics (ms) for verifying one password with the given parameters"""
+    hasher = PasswordHasher(memory_cost=memory_cost, time_cost=time_cost, parallelism=parallelism)
+    hashed = hasher.hash("benchmark-password")
+    hasher.verify(hashed, "benchmark-password")  # warm up
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        hasher.verify(hashed, "benchmark-password")
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+
+    return {
+        "memory_cost": memory_cost,
+        "time_cost": time_cost,
+        "parallelism": parallelism,
+        "median_ms": statistics.median(samples),
+        "max_ms": samples[-1],
+    }
+
+
+def recommend(results: list[dict], target_ms: float) -> dict | None:
+    """Pick the costliest settings whose median latency fits the target.
+
+    Cost is memory_cost * time_cost; ties go to the faster configuration.
+    """
+    within_target = [r for r in results if r["median_ms"] <= target_ms]
+    if not within_target:
+        return None
+    return max(within_target, key=lambda r: (r["memory_cost"] * r["time_cost"], -r["median_ms"]))
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Argon2 verification cost")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Target median verify latency")
+    parser.add_argument("--iterations", type=int, default=5, help="Verifications per setting")
+    parser.add_argument("--memory-costs", type=_int_list, default=DEFAULT_MEMORY_COSTS, help="Comma separated KiB values")
+    parser.add_argument("--time-costs", type=_int_list, default=DEFAULT_TIME_COSTS, help="Comma separated iteration counts")
+    parser.add_argument("--parallelisms", type=_int_list, default=DEFAULT_PARALLELISMS, help="Comma separated lane counts")
+    args = parser.parse_args()
+
+    print(f"{'memory_cost':>12} {'time_cost':>10} {'parallelism':>12} {'median_ms':>10} {'max_ms':>8}")
+    results = []
+    for memory_cost in args.memory_costs:
+        for time_cost in args.time_costs:
+            for parallelism in args.parallelisms:
+                result = measure(memory_cost, time_cost, parallelism, args.iterations)
+                results.append(result)
+                print(
+                    f"{memory_cost:>12} {time_cost:>10} {parallelism:>12} "
+                    f"{result['median_ms']:>10.1f} {result['max_ms']:>8.1f}"
+                )
+
+    best = recommend(results, args.target_ms)
+    print()
+    if best is None:
+        print(f"No setting verified under {args.target_ms:.0f} ms; try lower costs.")
+        return
+
+    print(f"Recommended for a {args.target_ms:.0f} ms target ({best['median_ms']:.1f} ms median):")
+    print(f"  ARGON2_MEMORY_COST={best['memory_cost']}")
+    print(f"  ARGON2_TIME_COST={best['time_cost']}")
+    print(f"  ARGON2_PARALLELISM={best['parallelism']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Chat load test for WellGenie
+
+Drives /api/chat (or /api/chat/stream) in-process through httpx's ASGI
+transport with the fake LLM backend, so it measures the throughput and
+tail latency of our own code with the network and Gemini quota removed.
+The fake's latency and error rate stand in for the upstream.
+
+Run from the backend directory:
+    uv run python -m scripts.chat_loadtest --requests 500 --concurrency 50 --latency-ms 300
+
+The response cache is off unless --response-cache is given, so every
+request does the full work; the tool result cache stays on.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+# A mix of fast-path, tool-calling and open-ended questions
+QUESTIONS = [
+    "How much sleep did I get last week?",
+    "How active was I and how did I sleep?",
+    "Should I eat fewer calories?",
+    "Any tips for feeling more rested?",
+]
+
+
+def configure(args) -> None:
+    """Set the environment before the app is imported (settings are read at import)"""
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["FAKE_LLM_JITTER_MS"] = str(args.jitter_ms)
+    os.environ["FAKE_LLM_ERROR_RATE"] = str(args.error_rate)
+    os.environ["CHAT_RESPONSE_CACHE"] = "1" if args.response_cache else "0"
+
+
+def seed(engine) -> None:
+    """One user with four weeks of sleep, exercise and diet entries"""
+    from sqlmodel import Session
+    from app.database import ensure_schema
+    from app.models import DietEntry, ExerciseEntry, SleepEntry, User
+
+    ensure_schema(engine)
+    with Session(engine) as session:
+        session.add(User(id=1, username="loadtest", hashed_password="unused"))
+        today = date.today()
+        for offset in range(28):
+            day = today - timedelta(days=offset)
+            session.add(SleepEntry(user_id=1, date=day, hours=7 + offset % 3 * 0.5, quality="good"))
+            session.add(ExerciseEntry(user_id=1, date=day, steps=8000 + offset * 100,
+                                      duration_min=45, calories_burned=400))
+            session.add(DietEntry(user_id=1, date=day, calories=2100, protein_g=100, carbs_g=250, fat_g=70))
+        session.commit()
+
+
+def percentile(samples: list[float], p: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[p - 1]
+
+
+async def run(args) -> dict:
+    import httpx
+    from sqlmodel import Session, create_engine
+    from app.database import get_session
+    from app.llm.client import create_client, get_client
+    from app.main import app
+    from app.models import User
+    from app.routers.auth import get_current_user
+
+    directory = tempfile.mkdtemp(prefix="chat-loadtest-")
+    engine = create_engine(f"sqlite:///{directory}/loadtest.db", connect_args={"check_same_thread": False})
+    seed(engine)
+    user = User(id=1, username="loadtest", hashed_password="unused")
+    fake = create_client()
+
+    def session_override():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = session_override
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_client] = lambda: fake
+
+    path = "/api/chat/stream" if args.stream else "/api/chat"
+    latencies: list[float] = []
+    failures = 0
+    next_request = 0
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal failures, next_request
+        while next_request < args.requests:
+            index = next_request
+            next_request += 1
+            start = time.perf_counter()
+            response = await client.post(path, json={"message": QUESTIONS[index % len(QUESTIONS)]})
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200 or "event: error" in response.text:
+                failures += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    app.dependency_overrides.clear()
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "failures": failures,
+        "elapsed_s": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test chat against the fake LLM backend")
+    parser.add_argument("--requests", type=int, default=200, help="Total chat requests")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Fake model latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="Uniform +/- jitter on that latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of model calls that fail (0..1)")
+    parser.add_argument("--stream", action="store_true", help="Use /api/chat/stream instead of /api/chat")
+    parser.add_argument("--response-cache", action="store_true", help="Keep the chat response cache on")
+    args = parser.parse_args()
+
+    configure(args)
+    result = asyncio.run(run(args))
+
+    print(f"requests     {result['requests']} ({result['failures']} failed)")
+    print(f"elapsed      {result['elapsed_s']:.2f} s")
+    print(f"throughput   {result['throughput']:.1f} req/s")
+    print(f"latency p50  {result['p50_ms']:.1f} ms")
+    print(f"latency p95  {result['p95_ms']:.1f} ms")
+    print(f"latency p99  {result['p99_ms']:.1f} ms")
+    print(f"latency max  {result['max_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
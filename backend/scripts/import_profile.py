@@ -0,0 +1,67 @@
+"""
+Import-time profile of the WellGenie app
+
+Imports app.main in a fresh interpreter with -X importtime and prints the
+slowest modules by cumulative time, so startup regressions show up before
+they reach a deploy. Fails if the import takes longer than --max-ms or
+pulls in a module listed with --forbid (by default the Gemini SDK, which
+is loaded in the background after startup).
+
+Run from the backend directory:
+    uv run python -m scripts.import_profile --top 15 --max-ms 1500
+"""
+import argparse
+import subprocess
+import sys
+
+
+def profile(target: str) -> list[tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for every module imported by target, in import order"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {target} failed:\n{result.stderr}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the import time of the app")
+    parser.add_argument("--target", default="app.main", help="Module to import")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    parser.add_argument("--max-ms", type=float, help="Fail when the total import takes longer")
+    parser.add_argument("--forbid", action="append", default=None,
+                        help="Fail when this module is imported (repeatable; default google.genai)")
+    args = parser.parse_args()
+    forbidden = args.forbid if args.forbid is not None else ["google.genai"]
+
+    rows = profile(args.target)
+    total_ms = next((cumulative for module, _, cumulative in rows if module == args.target), 0) / 1000
+
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    for module, self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}  {self_us / 1000:>8.1f}  {module}")
+    print(f"\n{len(rows)} modules, import {args.target} took {total_ms:.1f} ms")
+
+    failed = False
+    imported = {module for module, _, _ in rows}
+    for module in forbidden:
+        if module in imported:
+            print(f"FAIL: {module} is imported at startup")
+            failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"FAIL: import took longer than {args.max_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
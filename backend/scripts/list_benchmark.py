@@ -0,0 +1,136 @@
+"""
+Entry list serialization benchmark for WellGenie
+
+Seeds one user with --rows sleep entries in a temporary database and times
+building the /api/sleep body three ways: the old path (ORM objects through
+FastAPI's jsonable_encoder and JSONResponse), Core rows encoded with
+orjson (what a query cache miss does now) and a query cache hit. It then
+times GET /api/sleep end to end through the app, with the query cache off
+and on. CPU time and wall latency are reported per request.
+
+Run from the backend directory:
+    uv run python -m scripts.list_benchmark --rows 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+
+def configure() -> None:
+    """Set the environment before the app is imported (settings are read at import)"""
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+
+
+def seed(engine, rows: int) -> None:
+    from sqlmodel import Session
+    from app.database import ensure_schema
+    from app.models import SleepEntry, User
+
+    ensure_schema(engine)
+    first_day = date.today() - timedelta(days=rows)
+    with Session(engine) as session:
+        session.add(User(id=1, username="benchmark", hashed_password="unused"))
+        session.add_all(
+            SleepEntry(user_id=1, date=first_day + timedelta(days=i), hours=6 + i % 5 * 0.5, quality="good")
+            for i in range(rows)
+        )
+        session.commit()
+
+
+class Timings:
+    def __init__(self):
+        self.wall: list[float] = []
+        self.cpu: list[float] = []
+
+    def __enter__(self):
+        self._wall, self._cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall.append((time.perf_counter() - self._wall) * 1000)
+        self.cpu.append((time.process_time() - self._cpu) * 1000)
+
+    def report(self, label: str) -> None:
+        print(f"{label:<28} wall p50 {statistics.median(self.wall):8.2f} ms   max {max(self.wall):8.2f} ms   "
+              f"cpu p50 {statistics.median(self.cpu):8.2f} ms")
+
+
+def measure(label: str, run, repeat: int) -> None:
+    timings = Timings()
+    for _ in range(repeat):
+        with timings:
+            run()
+    timings.report(label)
+
+
+def orm_body(engine, query) -> bytes:
+    """The previous list path: ORM hydration, jsonable_encoder, JSONResponse"""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from sqlmodel import Session
+
+    with Session(engine) as session:
+        entries = session.exec(query).all()
+        return JSONResponse(jsonable_encoder({"items": entries})).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark entry list serialization")
+    parser.add_argument("--rows", type=int, default=10_000, help="Sleep entries in the response")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per variant")
+    args = parser.parse_args()
+
+    configure()
+    import httpx
+    from sqlmodel import Session, create_engine, select
+    from app.database import get_session
+    from app.main import app
+    from app.models import SleepEntry, User
+    from app.routers.auth import get_current_user
+    from app.services.query_cache import encode_items, query_cache
+
+    directory = tempfile.mkdtemp(prefix="list-benchmark-")
+    engine = create_engine(f"sqlite:///{directory}/benchmark.db", connect_args={"check_same_thread": False})
+    seed(engine, args.rows)
+    query = select(SleepEntry).where(SleepEntry.user_id == 1)
+
+    size = len(encode_items(engine, query))
+    print(f"{args.rows} rows, {size / 1024:.0f} KiB body, {args.repeat} runs each\n")
+    measure("ORM + jsonable_encoder", lambda: orm_body(engine, query), args.repeat)
+    measure("Core rows + orjson", lambda: encode_items(engine, query), args.repeat)
+    query_cache.set(1, "sleep", 0, {}, encode_items(engine, query))
+    measure("query cache hit", lambda: query_cache.get(1, "sleep", 0, {}), args.repeat)
+    query_cache.clear()
+
+    def session_override():
+        with Session(engine) as session:
+            yield session
+
+    user = User(id=1, username="benchmark", hashed_password="unused")
+    app.dependency_overrides[get_session] = session_override
+    app.dependency_overrides[get_current_user] = lambda: user
+
+    async def endpoint():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for label, enabled in (("GET /api/sleep, cache off", False), ("GET /api/sleep, cache on", True)):
+                query_cache.enabled = enabled
+                await client.get("/api/sleep")  # warm-up (and fill the cache when it's on)
+                timings = Timings()
+                for _ in range(args.repeat):
+                    with timings:
+                        response = await client.get("/api/sleep")
+                    assert response.status_code == 200
+                timings.report(label)
+
+    print()
+    asyncio.run(endpoint())
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
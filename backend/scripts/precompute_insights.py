@@ -0,0 +1,47 @@
+"""
+Nightly weekly-insight batch for WellGenie
+
+Computes last week's summary for every active user and stores it, so the
+dashboard and "how was last week?" chat questions are served from the
+database at peak time. With --narratives, also asks the model for a short
+narrative per user, paced by --narrative-rate.
+
+Run from the backend directory, e.g. from cron early on Monday:
+    0 3 * * 1  cd /srv/wellgenie/backend && uv run python -m scripts.precompute_insights --narratives
+"""
+import argparse
+import asyncio
+import time
+from app.database import engine, ensure_schema
+from app.llm.insights import INSIGHTS_NARRATIVE_RATE, INSIGHTS_WORKERS, precompute_weekly_insights, write_narratives
+from app.services.rate_limit import parse_rule
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute last week's insights for active users")
+    parser.add_argument("--workers", type=int, default=INSIGHTS_WORKERS, help="Users computed in parallel")
+    parser.add_argument("--narratives", action="store_true", help="Also write a model narrative per insight")
+    parser.add_argument("--narrative-rate", type=parse_rule, default=INSIGHTS_NARRATIVE_RATE,
+                        help="Model call budget as <requests>/<seconds>")
+    args = parser.parse_args()
+
+    ensure_schema(engine)
+
+    start = time.perf_counter()
+    summary = precompute_weekly_insights(engine, workers=args.workers)
+    print(
+        f"Computed {summary['computed']} of {summary['users']} insights "
+        f"({summary['failed']} failed) in {time.perf_counter() - start:.1f} s"
+    )
+
+    if args.narratives:
+        from app.llm.client import create_client
+
+        client = create_client()
+        start = time.perf_counter()
+        written = asyncio.run(write_narratives(engine, client, args.narrative_rate))
+        print(f"Wrote {written} narratives in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,21 +4,19 @@ Run this to populate your database with sample data for testing
 """
 from datetime import date, timedelta
 from sqlmodel import Session, select
-from app.database import engine
-from app.models import SleepEntry, DietEntry, ExerciseEntry, User, SQLModel
-from passlib.context import CryptContext
+from app.database import engine, ensure_schema
+from app.models import SleepEntry, DietEntry, ExerciseEntry, User, Conversation, ChatMessage, WeeklyInsight
+from app.services.auth import get_password_hash
+from app.services.data_versions import bump_version
 
-# Password hashing
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+# Every data version a user's entries, insights and chats feed into
+DATA_CATEGORIES = ("sleep", "diet", "exercise", "insights")
 
 
 def create_tables():
     """Create all database tables"""
     print("Creating tables...")
-    SQLModel.metadata.create_all(engine)
+    ensure_schema(engine)
     print("✅ Tables created")
 
 
@@ -26,14 +24,17 @@ def clear_existing_data(session: Session):
     """Clear all existing data from tables"""
     print("\nClearing existing data...")
     
-    # Delete all entries
-    for entry in session.exec(select(SleepEntry)).all():
-        session.delete(entry)
-    for entry in session.exec(select(DietEntry)).all():
-        session.delete(entry)
-    for entry in session.exec(select(ExerciseEntry)).all():
-        session.delete(entry)
+    # Delete all entries, and what was derived from them
+    for model in (SleepEntry, DietEntry, ExerciseEntry, WeeklyInsight, ChatMessage, Conversation):
+        for row in session.exec(select(model)).all():
+            session.delete(row)
     for user in session.exec(select(User)).all():
+        # Data versions are kept and bumped, not deleted: SQLite hands the next
+        # user the same id, and a reset version would turn old ETags and cached
+        # results into hits for the new data
+        assert user.id is not None
+        for category in DATA_CATEGORIES:
+            bump_version(session, user.id, category)
         session.delete(user)
     
     session.commit()
@@ -91,6 +92,8 @@ def seed_sleep_data(session: Session):
         sleep_entries.append(entry)
         session.add(entry)
     
+    assert admin_user.id is not None
+    bump_version(session, admin_user.id, "sleep")
     session.commit()
     print(f"✅ Added {len(sleep_entries)} sleep entries")
 
@@ -126,6 +129,8 @@ def seed_diet_data(session: Session):
         diet_entries.append(entry)
         session.add(entry)
     
+    assert admin_user.id is not None
+    bump_version(session, admin_user.id, "diet")
     session.commit()
     print(f"✅ Added {len(diet_entries)} diet entries")
 
@@ -159,6 +164,8 @@ def seed_exercise_data(session: Session):
         exercise_entries.append(entry)
         session.add(entry)
     
+    assert admin_user.id is not None
+    bump_version(session, admin_user.id, "exercise")
     session.commit()
     print(f"✅ Added {len(exercise_entries)} exercise entries")
 
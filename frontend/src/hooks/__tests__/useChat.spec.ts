@@ -0,0 +1,50 @@
+import { renderHook, act, waitFor } from '@testing-library/react';
+import { describe, it, expect, vi, beforeEach } from 'vitest';
+import axios from 'axios';
+import { useChat } from '../useChat';
+
+vi.mock('axios');
+const mockedAxios = axios as vi.Mocked<typeof axios>;
+
+describe('useChat', () => {
+    beforeEach(() => {
+        vi.clearAllMocks();
+        mockedAxios.get.mockResolvedValue({ data: { suggestions: [] } } as never);
+    });
+
+    it('should send the returned conversation_id with the next message', async () => {
+        mockedAxios.post
+            .mockResolvedValueOnce({ data: { message: 'First.', conversation_id: 7 } } as never)
+            .mockResolvedValueOnce({ data: { message: 'Second.', conversation_id: 7 } } as never);
+        const { result } = renderHook(() => useChat());
+        await waitFor(() => expect(mockedAxios.get).toHaveBeenCalled());
+
+        await act(async () => {
+            await result.current.sendMessage('How much sleep did I get last week?');
+        });
+        await act(async () => {
+            await result.current.sendMessage('And the week before?');
+        });
+
+        expect(mockedAxios.post.mock.calls[0][1]).toEqual({ message: 'How much sleep did I get last week?' });
+        expect(mockedAxios.post.mock.calls[1][1]).toEqual({ message: 'And the week before?', conversation_id: 7 });
+        expect(result.current.messages.map((m) => m.text)).toContain('Second.');
+    });
+
+    it('should start a new conversation after clearMessages', async () => {
+        mockedAxios.post.mockResolvedValue({ data: { message: 'Hi.', conversation_id: 3 } } as never);
+        const { result } = renderHook(() => useChat());
+
+        await act(async () => {
+            await result.current.sendMessage('hello');
+        });
+        act(() => {
+            result.current.clearMessages();
+        });
+        await act(async () => {
+            await result.current.sendMessage('hello again');
+        });
+
+        expect(mockedAxios.post.mock.calls[1][1]).toEqual({ message: 'hello again' });
+    });
+});
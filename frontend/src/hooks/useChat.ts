@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { isAxiosError } from 'axios';
 import { apiClient } from '../lib/apiClient';
 
@@ -10,6 +10,7 @@ export type ChatMessage = {
 type ChatResponse = {
   message: string;
   function_called?: string | null;
+  conversation_id: number;
 };
 
 type ApiDetailError = {
@@ -27,6 +28,8 @@ export function useChat() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [suggestions, setSuggestions] = useState<string[]>([]);
+  // Sent back with each message so the backend answers with the earlier turns in mind
+  const conversationId = useRef<number | null>(null);
 
   // Load suggestions on mount
   useEffect(() => {
@@ -58,8 +61,10 @@ export function useChat() {
     try {
       const response = await apiClient.post<ChatResponse>('/api/chat', {
         message: userMessage,
+        ...(conversationId.current !== null ? { conversation_id: conversationId.current } : {}),
       });
       const data = response.data;
+      conversationId.current = data.conversation_id;
 
       // Add bot response
       const botMsg: ChatMessage = {
@@ -110,6 +115,8 @@ export function useChat() {
   };
 
   const clearMessages = () => {
+    // The next message starts a new conversation
+    conversationId.current = null;
     setMessages([
       { from: 'bot', text: 'Hi! Ask me about your health data from last week.' },
     ]);
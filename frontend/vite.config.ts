@@ -18,6 +18,8 @@ export default defineConfig(({ mode }) => {
         '/api': {
           target: proxyTarget,
           changeOrigin: true,
+          // Send the client address so the backend can rate limit per client
+          xfwd: true,
         },
       },
     },
@@ -28,6 +30,8 @@ export default defineConfig(({ mode }) => {
         '/api': {
           target: proxyTarget,
           changeOrigin: true,
+          // Send the client address so the backend can rate limit per client
+          xfwd: true,
         },
       },
     },